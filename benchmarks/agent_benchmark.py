@@ -0,0 +1,262 @@
+"""
+Planner throughput benchmark: drives Agent.run_loop end to end against the
+local mock LLM server and a simulated desktop, and reports steps/sec, p50/p95
+step latency, LLM requests and tokens per goal. This is the baseline for
+planner-side optimizations; use --disable to switch individual ones off.
+
+    python benchmarks/agent_benchmark.py --repeat 3
+    python benchmarks/agent_benchmark.py --disable batching streaming --latency-ms 400
+
+Nothing is launched or typed: actions are applied to an in-memory UI tree.
+"""
+import argparse
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.logger import logger
+from utils.database_manager import DatabaseManager
+from main import Agent
+from skills.model_scheduler import reset_model_scheduler
+from skills.action_scheduler import ActionScheduler
+from skills.actions.base import UI_RESOURCES
+from skills.actions import implementations
+from skills.screen_change import Frame, ScreenChangeDetector, SyntheticFrameSource
+from skills.service_container import ServiceContainer
+from skills.structured_perception import StructuredPerception
+from skills.ui_backend import SyntheticControl, build_synthetic_desktop
+from skills.verifier import Verifier
+from benchmarks.stats import percentile, format_table
+from benchmarks.mock_llm_server import MockLLMServer, ModelBehavior, request_text
+from benchmarks.planner_config import write_config
+
+# Goal -> the actions a competent planner would emit, in order
+SCENARIOS = {
+    "Open Notepad and type Hello World": [
+        {"action": "open_app", "parameters": {"app_name": "Notepad"}, "expect": {"window_open": "Notepad"}},
+        {"action": "type_text", "parameters": {"text": "Hello World"}, "expect": {"focused": "Notepad"}},
+    ],
+    "Open Calculator and then close it again": [
+        {"action": "open_app", "parameters": {"app_name": "Calculator"}, "expect": {"window_open": "Calculator"}},
+        {"action": "close_app", "parameters": {"app_name": "Calculator"}, "expect": {"window_closed": "Calculator"}},
+    ],
+    "Open Chrome and go to github.com": [
+        {"action": "open_app", "parameters": {"app_name": "Chrome"}, "expect": {"window_open": "Chrome"}},
+        {"action": "open_url", "parameters": {"url": "https://github.com"}, "expect": {"window_open": "github"}},
+    ],
+    "Write a hello world python script to hello.py and open it in VS Code": [
+        {"action": "write_file", "parameters": {"file_path": "hello.py", "content": "print('Hello World')"}},
+        {"action": "run_command", "parameters": {"command": "code hello.py"}, "expect": {"window_open": "Visual Studio Code"}},
+    ],
+    # The two writes are independent of each other and run concurrently; a network
+    # call placed after them would wait (it may read what they wrote)
+    "Have OpenClaw draft the weekly report and save the meeting notes and todo list to files": [
+        {"action": "delegate_to_openclaw", "parameters": {"task": "Draft the weekly report"}},
+        {"action": "write_file", "parameters": {"file_path": "notes.txt", "content": "Meeting notes"}},
+        {"action": "write_file", "parameters": {"file_path": "todo.txt", "content": "- send report"}},
+    ],
+}
+
+# Resources each action declares, as the real Executor sees them
+ACTION_RESOURCES = {
+    cls.name: cls.resources for cls in vars(implementations).values()
+    if isinstance(cls, type) and issubclass(cls, implementations.Action) and cls is not implementations.Action
+}
+
+DONE = {"action": "done", "parameters": {}}
+
+class SimulatedDesktop:
+    """Executor stand-in that applies actions to an in-memory UI tree and repaints a synthetic frame."""
+
+    def __init__(self, windows=10, action_ms=50.0, frame_size=(128, 72), concurrency=True):
+        self.template = windows
+        self.action_ms = action_ms
+        self.frame_size = frame_size
+        self.version = 0
+        self.executed = 0
+        self.scheduler = ActionScheduler(enabled=concurrency)
+        self._lock = threading.Lock()
+        self.backend = build_synthetic_desktop(windows=windows)
+        self._initial = list(self.backend.windows)
+
+    def reset(self):
+        self.backend.windows = list(self._initial)
+        self.backend.focused = self._initial[0] if self._initial else None
+        self.version += 1
+
+    def frame(self):
+        width, height = self.frame_size
+        return Frame(width, height, bytes([(self.version * 53) % 256]) * (width * height))
+
+    def _open(self, title):
+        window = SyntheticControl(name=title, class_name="Simulated", handle=0x90000 + self.version)
+        self.backend.windows.append(window)
+        self.backend.focused = window
+
+    def resources_for(self, plan):
+        if plan.get("action") == "write_file":
+            # Per-path resource, as the real WriteFileAction declares it
+            return implementations.WriteFileAction(None).resources_for(implementations.FileParams(**plan["parameters"]))
+        return ACTION_RESOURCES.get(plan.get("action"), UI_RESOURCES)
+
+    def execute_plan(self, plan):
+        return self.scheduler.run(lambda: self._execute(plan), self.resources_for(plan))
+
+    def submit_plan(self, plan):
+        return self.scheduler.submit(lambda: self._execute(plan), self.resources_for(plan))
+
+    def _execute(self, plan):
+        time.sleep(self.action_ms / 1000.0)
+        action = plan.get("action")
+        params = plan.get("parameters") or {}
+        with self._lock:
+            self._apply(action, params)
+            self.version += 1
+            self.executed += 1
+        return True
+
+    def _apply(self, action, params):
+        if action == "open_app":
+            self._open(f"Untitled - {params.get('app_name')}")
+        elif action == "close_app":
+            name = str(params.get("app_name", "")).lower()
+            self.backend.windows = [w for w in self.backend.windows if name not in w.Name.lower()]
+            self.backend.focused = self.backend.windows[0] if self.backend.windows else None
+        elif action == "open_url":
+            self._open(f"{params.get('url')} - Google Chrome")
+        elif action == "run_command" and str(params.get("command", "")).startswith("code "):
+            self._open(f"{params['command'][5:]} - Visual Studio Code")
+
+class TimedVerifier(Verifier):
+    """Verifier that takes `verify_ms` per check, like a model- or vision-backed verification would."""
+
+    def __init__(self, verify_ms=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.verify_ms = verify_ms
+
+    def verify(self, *args, **kwargs):
+        time.sleep(self.verify_ms / 1000.0)
+        return super().verify(*args, **kwargs)
+
+def make_responder(batch):
+    """Answers decomposition and planning prompts from SCENARIOS, based on the goal and history in the prompt."""
+    def respond(request):
+        text = request_text(request)
+        goal_match = re.search(r"GOAL: (.+)", text)
+        script = SCENARIOS.get(goal_match.group(1).strip() if goal_match else "", [])
+        if "senior task planner" in text:
+            return {"steps": [f"{step['action']} {list(step['parameters'].values())[0]}" for step in script]}
+        done_steps = len(re.findall(r"^\d+\. \w+\(.*\) -> success", text, re.MULTILINE))
+        remaining = script[done_steps:]
+        if not remaining:
+            return dict(DONE, thought="Every step of the goal has succeeded.", confidence=0.95)
+        plan = dict(remaining[0])
+        if batch:
+            plan["next_actions"] = remaining[1:] + [DONE]
+        plan.update({"thought": "Following the workflow for this goal.", "confidence": 0.9})
+        return plan
+    return respond
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Agent.run_loop against a mock LLM server.")
+    parser.add_argument("--repeat", type=int, default=2, help="Runs of every scenario goal")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Mock LLM time to first token")
+    parser.add_argument("--jitter-ms", type=float, default=60.0)
+    parser.add_argument("--distribution", choices=["normal", "lognormal", "fixed"], default="lognormal")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--action-ms", type=float, default=50.0, help="Simulated execution time per action")
+    parser.add_argument("--verify-ms", type=float, default=0.0, help="Simulated verification time per action")
+    parser.add_argument("--windows", type=int, default=10)
+    parser.add_argument("--no-batch", action="store_true", help="Mock planner returns one action per call")
+    parser.add_argument("--disable", nargs="*", default=[],
+                        help="Planner features to switch off (plan_cache, decomposition_cache, fast_path, batching, "
+                             "streaming, hedging, relevance, state_delta, pipelining, concurrency)")
+    parser.add_argument("--step-delay", type=float, default=0.0, help="Agent pause between steps (run_loop)")
+    args = parser.parse_args(argv)
+
+    logger.setLevel(logging.WARNING)
+
+    server = MockLLMServer(default=ModelBehavior(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        distribution=args.distribution,
+        rate_limit=args.rate_limit,
+        responses=make_responder(batch=not args.no_batch)
+    ))
+    server.start()
+    workdir = tempfile.mkdtemp(prefix="agent-bench-")
+    try:
+        config_path = write_config(server.url, workdir, {feature: {"enabled": False} for feature in args.disable})
+        reset_model_scheduler()
+        desktop = SimulatedDesktop(windows=args.windows, action_ms=args.action_ms,
+                                   concurrency="concurrency" not in args.disable)
+        # Simulated desktop services; the planner, vision fallback and OpenClaw client are built from the config
+        services = ServiceContainer(config_path=config_path)
+        services.provide("db", DatabaseManager(db_path=os.path.join(workdir, "history.db")))
+        services.provide("perception", StructuredPerception(backend=desktop.backend))
+        services.provide("executor", desktop)
+        services.provide("verifier", TimedVerifier(verify_ms=args.verify_ms, perception=services.get("perception")))
+        services.provide("change_detector", ScreenChangeDetector(source=SyntheticFrameSource(desktop.frame)))
+        agent = Agent(services=services, step_delay=args.step_delay)
+
+        step_ms = []
+        run_step = agent.run_step
+
+        def timed_step(goal, context=None):
+            start = time.perf_counter()
+            result = run_step(goal, context)
+            step_ms.append((time.perf_counter() - start) * 1000)
+            return result
+        agent.run_step = timed_step
+
+        rows = []
+        totals = {"goals": 0, "achieved": 0, "steps": 0, "seconds": 0.0, "tokens": 0, "requests": 0}
+        for run in range(args.repeat):
+            for goal in SCENARIOS:
+                desktop.reset()
+                agent.history.clear()
+                steps_before, tokens_before, requests_before = len(step_ms), server.total_tokens(), server.requests
+                actions_before = desktop.executed
+                start = time.perf_counter()
+                outcome = agent.run_loop(goal)
+                seconds = time.perf_counter() - start
+                steps = len(step_ms) - steps_before
+                tokens = server.total_tokens() - tokens_before
+                requests = server.requests - requests_before
+                achieved = outcome == "Goal achieved."
+                rows.append([run + 1, goal[:40], steps, desktop.executed - actions_before, requests, tokens,
+                             round(seconds * 1000), "yes" if achieved else outcome])
+                totals["goals"] += 1
+                totals["achieved"] += achieved
+                totals["steps"] += steps
+                totals["seconds"] += seconds
+                totals["tokens"] += tokens
+                totals["requests"] += requests
+
+        print(format_table(["run", "goal", "steps", "actions", "llm_calls", "tokens", "ms", "achieved"], rows))
+        print()
+        print(format_table(
+            ["goals", "achieved", "steps/sec", "step_p50_ms", "step_p95_ms", "llm_calls/goal", "tokens/goal"],
+            [[
+                totals["goals"],
+                totals["achieved"],
+                round(totals["steps"] / totals["seconds"], 2) if totals["seconds"] else 0.0,
+                round(percentile(step_ms, 50), 1),
+                round(percentile(step_ms, 95), 1),
+                round(totals["requests"] / totals["goals"], 2),
+                round(totals["tokens"] / totals["goals"])
+            ]]
+        ))
+        return 0 if totals["achieved"] == totals["goals"] else 1
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    sys.exit(main())
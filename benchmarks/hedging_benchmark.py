@@ -0,0 +1,98 @@
+"""
+Hedged-request benchmark: GroqPlanner.plan against the local mock server, with
+a primary model that has a slow tail and 429s, hedging on vs. off.
+
+    python benchmarks/hedging_benchmark.py --steps 40 --slow-rate 0.2 --rate-limit 0.1
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import yaml
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.logger import logger
+from skills.groq_planner import GroqPlanner
+from skills.model_scheduler import reset_model_scheduler
+from skills.structured_perception import StructuredPerception
+from skills.ui_backend import build_synthetic_desktop
+from benchmarks.stats import percentile, format_table
+from benchmarks.mock_llm_server import MockLLMServer, ModelBehavior
+from benchmarks.planner_config import CONFIG_PATH, write_config
+
+def run(label, server, state, args, hedging):
+    with tempfile.TemporaryDirectory() as workdir:
+        config_path = write_config(server.url, workdir, {
+            "hedging": {"enabled": hedging, "initial_delay_ms": args.initial_delay_ms},
+            "plan_cache": {"enabled": False},
+            "decomposition_cache": {"enabled": False}
+        })
+        reset_model_scheduler()
+        planner = GroqPlanner(config_path=config_path)
+        planner.sub_plan = ["benchmark"]  # skip decomposition; we only time plan()
+        planner.current_goal = "benchmark"
+
+        latencies = []
+        failures = 0
+        for _ in range(args.steps):
+            start = time.perf_counter()
+            plan = planner.plan("benchmark", state)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if plan.get("action") == "wait":
+                failures += 1
+        stats = planner.model_racer.stats()
+        planner.model_racer.shutdown()
+
+    return [
+        label,
+        round(percentile(latencies, 50), 1),
+        round(percentile(latencies, 95), 1),
+        round(max(latencies), 1),
+        failures,
+        stats["hedges"],
+        ", ".join(f"{m}={n}" for m, n in sorted(stats["wins"].items()))
+    ]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark hedged model racing in GroqPlanner.")
+    parser.add_argument("--steps", type=int, default=40)
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="Typical latency of every model")
+    parser.add_argument("--slow-rate", type=float, default=0.2, help="Fraction of primary calls that stall")
+    parser.add_argument("--slow-ms", type=float, default=2500.0)
+    parser.add_argument("--rate-limit", type=float, default=0.1, help="Fraction of primary calls answered with 429")
+    parser.add_argument("--initial-delay-ms", type=float, default=400.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    logger.setLevel(logging.WARNING)
+
+    with open(CONFIG_PATH, 'r') as f:
+        primary = yaml.safe_load(f)['llm']['groq']['planner_model']
+    state = StructuredPerception(backend=build_synthetic_desktop(windows=10, seed=args.seed)).capture_state()
+
+    rows = []
+    for label, hedging in (("sequential", False), ("hedged", True)):
+        server = MockLLMServer(
+            models={primary: ModelBehavior(
+                latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 5,
+                slow_rate=args.slow_rate, slow_ms=args.slow_ms, rate_limit=args.rate_limit
+            )},
+            default=ModelBehavior(latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 5),
+            seed=args.seed
+        )
+        server.start()
+        try:
+            rows.append(run(label, server, state, args, hedging))
+        finally:
+            server.stop()
+
+    print(format_table(["mode", "p50_ms", "p95_ms", "max_ms", "failed", "hedges", "wins"], rows))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
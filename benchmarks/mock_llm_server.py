@@ -0,0 +1,327 @@
+"""
+Local stand-in for the LLM APIs the agent calls, for load-testing the planner
+and vision fallback without burning quota. It speaks:
+
+    POST .../chat/completions                       Groq / OpenAI chat-completions
+    POST .../models/<model>:generateContent         Gemini
+    POST .../models/<model>:streamGenerateContent   Gemini, server-sent events
+
+Each model gets a latency distribution, a 429 rate and scripted responses
+(a list that is cycled, or a callable that picks a response per request).
+Chat requests with "stream": true and Gemini streamGenerateContent calls are
+answered as server-sent events, one chunk every stream_chunk_ms.
+
+    python benchmarks/mock_llm_server.py --port 8765 --latency-ms 300 --jitter-ms 100 --rate-limit 0.1
+
+Then set `llm.groq.base_url` / `llm.gemini.base_url` to "http://127.0.0.1:8765"
+in openclaw/config.yaml.
+"""
+import argparse
+import itertools
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_RESPONSE = {
+    "action": "done",
+    "parameters": {},
+    "thought": "Mock planner response. The goal looks complete based on the previous actions, so there is nothing left to do.",
+    "confidence": 0.9
+}
+
+GEMINI_PATH = re.compile(r"/models/(?P<model>[^/:]+):(?P<method>generateContent|streamGenerateContent)")
+
+class ModelBehavior:
+    """
+    How one mock model responds. Latency (time to first token) is drawn from
+    `distribution`: "normal" (latency_ms +/- jitter_ms), "lognormal" (median
+    latency_ms, jitter_ms as the spread) or "fixed"; slow_rate adds a tail of
+    slow_ms responses. `responses` is a list (cycled) or a callable taking the
+    parsed request and returning a string or JSON-able object.
+    """
+
+    def __init__(self, latency_ms=200.0, jitter_ms=0.0, distribution="normal", slow_rate=0.0, slow_ms=0.0,
+                 rate_limit=0.0, retry_after=1, responses=None, stream_chunk_chars=8, stream_chunk_ms=10.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.distribution = distribution
+        self.slow_rate = slow_rate  # fraction of requests that take slow_ms instead (tail latency)
+        self.slow_ms = slow_ms
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.stream_chunk_chars = stream_chunk_chars
+        self.stream_chunk_ms = stream_chunk_ms  # generation time per streamed chunk
+        self._responder = responses if callable(responses) else None
+        self._responses = itertools.cycle(responses or [DEFAULT_RESPONSE]) if not callable(responses) else None
+        self._lock = threading.Lock()
+
+    def next_response(self, request):
+        if self._responder:
+            response = self._responder(request)
+        else:
+            with self._lock:
+                response = next(self._responses)
+        return response if isinstance(response, str) else json.dumps(response)
+
+    def sample_latency(self, rng):
+        if self.slow_rate and rng.random() < self.slow_rate:
+            return self.slow_ms / 1000.0
+        if self.distribution == "fixed":
+            latency = self.latency_ms
+        elif self.distribution == "lognormal":
+            sigma = self.jitter_ms / self.latency_ms if self.latency_ms else 0.0
+            latency = self.latency_ms * math.exp(rng.gauss(0.0, sigma))
+        else:
+            latency = rng.gauss(self.latency_ms, self.jitter_ms)
+        return max(0.0, latency) / 1000.0
+
+def request_text(request):
+    """All prompt text of a chat-completions or Gemini request."""
+    if "messages" in request:
+        return "\n".join(str(m.get("content", "")) for m in request.get("messages", []))
+    parts = []
+    for content in request.get("contents", []) or []:
+        for part in (content.get("parts", []) if isinstance(content, dict) else []):
+            if isinstance(part, dict) and "text" in part:
+                parts.append(part["text"])
+    return "\n".join(parts)
+
+class MockLLMServer:
+    def __init__(self, host="127.0.0.1", port=0, models=None, default=None, seed=0):
+        self.models = dict(models or {})
+        self.default = default or ModelBehavior()
+        self.requests = 0
+        self.rate_limited = 0
+        self.usage = {"prompt_tokens": 0, "completion_tokens": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def behavior(self, model):
+        return self.models.get(model, self.default)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def total_tokens(self):
+        with self._lock:
+            return self.usage["prompt_tokens"] + self.usage["completion_tokens"]
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass  # keep benchmark output clean
+
+            def _send_json(self, status, payload, headers=None):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    return self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+                path = self.path.split("?")[0].rstrip("/")
+                gemini = GEMINI_PATH.search(path)
+                if path.endswith("/chat/completions"):
+                    server._chat_completion(self, request)
+                elif gemini:
+                    server._generate_content(self, request, gemini.group("model"), gemini.group("method") == "streamGenerateContent")
+                else:
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+        return Handler
+
+    def _admit(self, model, request):
+        """Rolls for a 429 and latency; returns (behavior, content, usage) or None when rate limited."""
+        behavior = self.behavior(model)
+        with self._lock:
+            self.requests += 1
+            limited = self._rng.random() < behavior.rate_limit
+            latency = behavior.sample_latency(self._rng)
+            if limited:
+                self.rate_limited += 1
+        if limited:
+            return None
+
+        time.sleep(latency)
+        content = behavior.next_response(request)
+        usage = {
+            "prompt_tokens": len(request_text(request)) // 4,
+            "completion_tokens": len(content) // 4,
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        with self._lock:
+            self.usage["prompt_tokens"] += usage["prompt_tokens"]
+            self.usage["completion_tokens"] += usage["completion_tokens"]
+        return behavior, content, usage
+
+    def _chunks(self, content, behavior):
+        for start in range(0, len(content), behavior.stream_chunk_chars):
+            time.sleep(behavior.stream_chunk_ms / 1000.0)
+            yield content[start:start + behavior.stream_chunk_chars]
+
+    def _generation_delay(self, content, behavior):
+        # Non-streaming callers wait for the whole response to be generated
+        chunks = -(-len(content) // behavior.stream_chunk_chars)
+        time.sleep(chunks * behavior.stream_chunk_ms / 1000.0)
+
+    def _start_events(self, handler):
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Cache-Control", "no-cache")
+        handler.end_headers()
+
+    def _send_event(self, handler, payload):
+        data = payload if isinstance(payload, str) else json.dumps(payload)
+        handler.wfile.write(f"data: {data}\n\n".encode("utf-8"))
+        handler.wfile.flush()
+
+    # --- Groq / OpenAI chat-completions ---
+
+    def _chat_completion(self, handler, request):
+        model = request.get("model", "")
+        admitted = self._admit(model, request)
+        if admitted is None:
+            return handler._send_json(
+                429,
+                {"error": {"message": f"Rate limit reached for model {model}", "type": "tokens", "code": "rate_limit_exceeded"}},
+                {"retry-after": str(self.behavior(model).retry_after)}
+            )
+        behavior, content, usage = admitted
+        completion_id = f"chatcmpl-mock-{self.requests}"
+
+        if request.get("stream"):
+            def chunk(delta, finish_reason=None):
+                return {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+                }
+            self._start_events(handler)
+            try:
+                self._send_event(handler, chunk({"role": "assistant", "content": ""}))
+                for text in self._chunks(content, behavior):
+                    self._send_event(handler, chunk({"content": text}))
+                self._send_event(handler, chunk({}, "stop"))
+                self._send_event(handler, "[DONE]")
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the client closed the stream (e.g. it lost a hedged race)
+            handler.close_connection = True
+            return
+
+        self._generation_delay(content, behavior)
+        handler._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": usage
+        })
+
+    # --- Gemini generateContent ---
+
+    def _generate_content(self, handler, request, model, stream):
+        admitted = self._admit(model, request)
+        if admitted is None:
+            return handler._send_json(
+                429,
+                {"error": {"code": 429, "message": f"Resource has been exhausted for {model}", "status": "RESOURCE_EXHAUSTED"}},
+                {"retry-after": str(self.behavior(model).retry_after)}
+            )
+        behavior, content, usage = admitted
+
+        def response(text, finish_reason=None):
+            candidate = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+            if finish_reason:
+                candidate["finishReason"] = finish_reason
+            return {
+                "candidates": [candidate],
+                "usageMetadata": {
+                    "promptTokenCount": usage["prompt_tokens"],
+                    "candidatesTokenCount": usage["completion_tokens"],
+                    "totalTokenCount": usage["total_tokens"]
+                },
+                "modelVersion": model
+            }
+
+        if stream:
+            self._start_events(handler)
+            try:
+                chunks = list(self._chunks(content, behavior)) or [""]
+                for i, text in enumerate(chunks):
+                    self._send_event(handler, response(text, "STOP" if i == len(chunks) - 1 else None))
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            handler.close_connection = True
+            return
+
+        self._generation_delay(content, behavior)
+        handler._send_json(200, response(content, "STOP"))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a mock Groq/Gemini-compatible LLM server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--distribution", choices=["normal", "lognormal", "fixed"], default="normal")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--script", help="JSON file: {model: [response, ...]} ('*' for the default model)")
+    args = parser.parse_args(argv)
+
+    def behavior(responses=None):
+        return ModelBehavior(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, distribution=args.distribution,
+                             rate_limit=args.rate_limit, responses=responses)
+
+    script = {}
+    if args.script:
+        with open(args.script, 'r') as f:
+            script = json.load(f)
+    server = MockLLMServer(
+        host=args.host,
+        port=args.port,
+        models={model: behavior(responses) for model, responses in script.items() if model != "*"},
+        default=behavior(script.get("*"))
+    )
+    print(f"Mock LLM server listening on {server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Perception benchmark: StructuredPerception.capture_state against synthetic UI trees.
+
+Runs on any OS (no live desktop needed) and reports, per desktop size:
+cold capture latency, warm p50/p95 latency, snapshot JSON size and memory
+allocated per capture. With --max-p95-ms it exits non-zero when any size
+exceeds the budget, so it can gate perf regressions.
+
+    python benchmarks/perception_benchmark.py --windows 10 100 1000 --latency-ms 0.2
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.logger import logger
+from skills.ui_backend import build_synthetic_desktop
+from skills.structured_perception import StructuredPerception
+from benchmarks.stats import percentile, format_table
+
+def churn(backend, run, fraction):
+    """Renames a deterministic slice of windows so the cache has real work to do."""
+    count = int(len(backend.windows) * fraction)
+    if not count:
+        return
+    start = (run * count) % len(backend.windows)
+    for offset in range(count):
+        window = backend.windows[(start + offset) % len(backend.windows)]
+        window.Name = window.Name.split(" *")[0] + f" *{run}"
+
+def bench_size(windows, args):
+    backend = build_synthetic_desktop(
+        windows=windows,
+        fan_out=args.fan_out,
+        depth=args.depth,
+        latency_ms=args.latency_ms,
+        seed=args.seed
+    )
+    perception = StructuredPerception(backend=backend, max_workers=args.workers, deadline_ms=args.deadline_ms)
+
+    start = time.perf_counter()
+    snapshot = perception.capture_state()
+    cold_ms = (time.perf_counter() - start) * 1000
+
+    latencies = []
+    partial = 0
+    for run in range(args.runs):
+        churn(backend, run, args.churn)
+        start = time.perf_counter()
+        snapshot = perception.capture_state()
+        latencies.append((time.perf_counter() - start) * 1000)
+        partial += len(perception.last_refresh["partial"])
+
+    # Allocations are measured separately; tracemalloc slows everything down
+    tracemalloc.start()
+    churn(backend, args.runs, args.churn)
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    measured = perception.capture_state()
+    size_bytes = len(measured.to_json())
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "windows": windows,
+        "cold_ms": round(cold_ms, 2),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "bytes": size_bytes,
+        "alloc_kb": round((current - before) / 1024, 1),
+        "peak_kb": round((peak - before) / 1024, 1),
+        "partial": partial,
+        "depth": perception.scan_policy.depth
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark StructuredPerception.capture_state on synthetic UI trees.")
+    parser.add_argument("--windows", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--fan-out", type=int, default=5)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Injected latency per GetChildren call")
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--churn", type=float, default=0.1, help="Fraction of windows changed between captures")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--deadline-ms", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-p95-ms", type=float, default=None, help="Fail if any size exceeds this p95")
+    args = parser.parse_args(argv)
+
+    logger.setLevel(logging.WARNING)
+
+    results = [bench_size(windows, args) for windows in args.windows]
+    headers = ["windows", "cold_ms", "p50_ms", "p95_ms", "bytes", "alloc_kb", "peak_kb", "partial", "depth"]
+    print(format_table(headers, [[r[h] for h in headers] for r in results]))
+
+    if args.max_p95_ms is not None:
+        over = [r for r in results if r["p95_ms"] > args.max_p95_ms]
+        if over:
+            print(f"FAIL: p95 above {args.max_p95_ms} ms for {[r['windows'] for r in over]} windows")
+            return 1
+        print(f"OK: p95 within {args.max_p95_ms} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+import copy
+import os
+
+import yaml
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'openclaw', 'config.yaml')
+
+def write_config(base_url, workdir, planner_overrides=None):
+    """
+    Writes a copy of the real config with Groq and Gemini pointed at a mock LLM
+    server and a scratch DB, with `planner_overrides` merged into the planner
+    sections. The scheduler's quotas are lifted since the mock server has none.
+    """
+    with open(CONFIG_PATH, 'r') as f:
+        config = copy.deepcopy(yaml.safe_load(f))
+    config['llm']['groq'].update({"api_key": "mock", "base_url": base_url, "max_retries": 0})
+    config['llm'].setdefault('gemini', {}).update({"api_key": "mock", "base_url": base_url})
+    config.setdefault('system', {})['db_path'] = os.path.join(workdir, "memory.db")
+    planner = config.setdefault('planner', {})
+    planner['scheduler'] = {"default_limits": {"rpm": 100000, "tpm": 100000000}, "models": {}}
+    for section, values in (planner_overrides or {}).items():
+        planner.setdefault(section, {}).update(values)
+    path = os.path.join(workdir, "config.yaml")
+    with open(path, 'w') as f:
+        yaml.safe_dump(config, f)
+    return path
@@ -0,0 +1,95 @@
+"""
+Streaming benchmark: time-to-first-action of GroqPlanner.plan with streaming
+(early dispatch via on_partial) vs. waiting for the full JSON response, against
+the local mock server's SSE stream.
+
+    python benchmarks/streaming_benchmark.py --steps 20 --chunk-ms 15
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.logger import logger
+from skills.groq_planner import GroqPlanner
+from skills.model_scheduler import reset_model_scheduler
+from skills.structured_perception import StructuredPerception
+from skills.ui_backend import build_synthetic_desktop
+from benchmarks.stats import percentile, format_table
+from benchmarks.mock_llm_server import MockLLMServer, ModelBehavior
+from benchmarks.planner_config import write_config
+
+RESPONSE = {
+    "action": "open_app",
+    "parameters": {"app_name": "Notepad"},
+    "thought": "Notepad is not open yet and the goal needs a text editor, so the first step is to launch it "
+               "from the Start menu. After that the text can be typed into the editor window.",
+    "confidence": 0.95
+}
+
+def run(label, server, state, args, streaming):
+    with tempfile.TemporaryDirectory() as workdir:
+        config_path = write_config(server.url, workdir, {
+            "streaming": {"enabled": streaming},
+            "hedging": {"enabled": False},
+            "plan_cache": {"enabled": False},
+            "decomposition_cache": {"enabled": False}
+        })
+        reset_model_scheduler()
+        planner = GroqPlanner(config_path=config_path)
+        planner.sub_plan = ["benchmark"]
+        planner.current_goal = "benchmark"
+
+        first_action, full_plan = [], []
+        for _ in range(args.steps):
+            marks = {}
+            start = time.perf_counter()
+            plan = planner.plan("benchmark", state, on_partial=lambda partial: marks.setdefault("first", time.perf_counter()))
+            end = time.perf_counter()
+            assert plan["action"] == RESPONSE["action"], plan
+            first_action.append((marks.get("first", end) - start) * 1000)
+            full_plan.append((end - start) * 1000)
+        planner.model_racer.shutdown()
+
+    return [
+        label,
+        round(percentile(first_action, 50), 1),
+        round(percentile(first_action, 95), 1),
+        round(percentile(full_plan, 50), 1),
+        round(percentile(full_plan, 95), 1)
+    ]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark streamed planning with early action dispatch.")
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Time to first token")
+    parser.add_argument("--chunk-ms", type=float, default=15.0, help="Generation time per streamed chunk")
+    parser.add_argument("--chunk-chars", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    logger.setLevel(logging.WARNING)
+
+    state = StructuredPerception(backend=build_synthetic_desktop(windows=10)).capture_state()
+    server = MockLLMServer(default=ModelBehavior(
+        latency_ms=args.latency_ms,
+        responses=[RESPONSE],
+        stream_chunk_chars=args.chunk_chars,
+        stream_chunk_ms=args.chunk_ms
+    ))
+    server.start()
+    try:
+        rows = [run(label, server, state, args, streaming)
+                for label, streaming in (("full response", False), ("streaming", True))]
+    finally:
+        server.stop()
+
+    print(format_table(["mode", "first_action_p50", "first_action_p95", "plan_p50", "plan_p95"], rows))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
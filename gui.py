@@ -4,9 +4,6 @@ import queue
 import time
 import os
 import sys
-import speech_recognition as sr
-import uiautomation as auto
-from PIL import Image
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -17,6 +14,11 @@ sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
 from main import Agent
 from utils.logger import logger
+from utils.lazy_import import lazy_import
+
+# Loaded when voice input / the agent thread first needs them
+sr = lazy_import("speech_recognition")
+auto = lazy_import("uiautomation")
 
 # --- Configuration ---
 ctk.set_appearance_mode("Dark")
@@ -170,7 +172,7 @@ class AegisApp(ctk.CTk):
                         self.msg_queue.put(("agent_response", str(result)))
                         
                     steps += 1
-                    time.sleep(1)
+                    self.agent.wait_for_settle()
                 
                 self.is_running = False # Ensure flag is reset
                 self.msg_queue.put(("status_update", "IDLE"))
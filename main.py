@@ -3,6 +3,8 @@ import os
 import sys
 import logging
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -12,26 +14,50 @@ load_dotenv()
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
 from utils.logger import logger
-from utils.database_manager import DatabaseManager
-from skills.structured_perception import StructuredPerception
-from skills.groq_planner import GroqPlanner
-from skills.executor import Executor
-from skills.verifier import Verifier
-from skills.vision_fallback import VisionFallback
-from skills.openclaw_client import OpenClawClient
+from skills.service_container import get_services
+from skills.rolling_history import RollingHistory, history_options
+from utils.lazy_import import warm_up
+from skills.ui_wait import wait_until, screen_settled
+from skills.action_scheduler import is_ui_bound, depends_on
 
 class Agent:
-    def __init__(self):
+    def __init__(self, services=None, step_delay=1.0):
+        """Components come from the shared ServiceContainer (benchmarks provide simulated ones)."""
         logger.info("Initializing Aegis OS Agent...")
-        self.perception = StructuredPerception()
-        self.db = DatabaseManager()
-        self.planner = GroqPlanner()
-        self.executor = Executor()
-        self.verifier = Verifier()
-        self.vision_fallback = VisionFallback()
-        self.openclaw = OpenClawClient()
+        self.services = services or get_services()
+        self.db = self.services.get("db")
+        self.planner = self.services.get("planner")
+        # Perception reads installed apps from the background InstalledAppIndex service
+        self.perception = self.services.get("perception")
+        self.executor = self.services.get("executor")
+        self.verifier = self.services.get("verifier")
+        # Cheap frame fingerprints tell us when re-perceiving would be redundant
+        self.change_detector = self.services.get("change_detector")
+        self.step_delay = step_delay  # longest pause between loop steps (seconds)
+        self._last_state = None
+        self._last_fingerprint = None
+        self._last_windows = None
+        # Plans stream in on this thread while the main thread executes the early action
+        self._planning_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="planner")
+        # Next step's plan, requested on that thread while the current step is verified
+        self._speculation = None
         self.max_steps = 25
-        self.history = []
+        # Last few steps in full, older ones folded into a bounded summary
+        self.history = RollingHistory(**history_options(self.planner.config))
+
+        # Heavy SDKs are imported on first use; optionally preload them off the critical path
+        startup_config = self.planner.config['agent'].get('startup', {}) or {}
+        if startup_config.get('warm_up', True):
+            warm_up(startup_config.get('warm_up_modules', []), startup_config.get('warm_up_delay_seconds', 0.0))
+
+    @property
+    def vision_fallback(self):
+        # Only built when structured perception comes up short
+        return self.services.get("vision_fallback")
+
+    @property
+    def openclaw(self):
+        return self.services.get("openclaw")
 
     def run_step(self, goal, context=None):
         """Executes a single step of the agent loop."""
@@ -39,7 +65,16 @@ class Agent:
         
         # 1. Perception
         logger.info("Step 1: Perception")
-        current_state = self.perception.capture_state()
+        fingerprint = self.change_detector.capture()
+        windows = self._window_snapshot()
+        if (self._last_state is not None and not self.change_detector.changed(self._last_fingerprint, fingerprint)
+                and windows is not None and windows == self._last_windows):
+            # Nothing moved on screen and no window came, went or was retitled; reuse it
+            logger.info("Screen unchanged since last capture. Reusing perception state.")
+            current_state = self._last_state
+        else:
+            current_state = self.perception.capture_state()
+            self._last_state, self._last_fingerprint, self._last_windows = current_state, fingerprint, windows
         
         # Incorporate Visual Context if requested
         if context and context.get("use_vision"):
@@ -47,7 +82,8 @@ class Agent:
             visual_description = self.vision_fallback.analyze_screen(
                 query=f"Analyze the screen to help achieve this goal: {goal}. Describe active windows, buttons, and layout."
             )
-            current_state["visual_context"] = visual_description
+            # Snapshots are immutable and shared; derive a copy carrying the description
+            current_state = current_state.replace(visual_context=visual_description)
             logger.info(f"Visual context added: {visual_description[:100]}...")
 
         step_log["perception"] = current_state
@@ -55,7 +91,11 @@ class Agent:
         # 2. Planning
         logger.info("Step 2: Planning")
         # Pass history to planner so it knows what it just did
-        plan = self.planner.plan(goal, current_state, history=self.history)
+        early = {}
+        plan = self._plan(goal, current_state, early)
+        if early and {k: plan.get(k) for k in ("action", "parameters")} != early["plan"]:
+            logger.warning("Final plan differs from the early-dispatched action. Keeping what was executed.")
+            plan = {**plan, **early["plan"]}
 
         step_log["plan"] = plan
         
@@ -66,48 +106,34 @@ class Agent:
         # Check if plan is to terminate or wait
         if plan.get("action") == "wait" or plan.get("action") == "done":
             logger.info("Plan indicates completion or waiting.")
+            # A "done" right after a verified step is as trustworthy as that step
+            if plan.get("action") == "done":
+                self.planner.record_outcome(plan, bool(self.history) and self.history[-1].get("status") == "success")
             # Important: Add to history so future steps know we finished
             self.history.append({"status": "done", "plan": plan})
             return {"status": "done", "message": "Task completed", "log": step_log}
 
         # CRITICAL: Prevent executing the exact same action twice in a row if it was successful
-        if self.history:
-            last_step = self.history[-1]
-            # FIX: Handle inconsistent history structure (done/failed vs success log)
-            # 'success' has plan inside 'log', 'done'/'failed' has plan at top level
-            last_plan = last_step.get("plan") or last_step.get("log", {}).get("plan", {})
-            last_status = last_step.get("status")
-            
-            # If action, target, strategy match, and it was successful, assume we are looping
-            # Note: We are now looser on content matching because sometimes LLM generates slightly different whitespace
-            # or comments, but the INTENT is identical.
-            
-            # 1. Check strict action/target match
-            is_same_action = (
-                last_plan.get("action") == plan.get("action") and 
-                last_plan.get("target") == plan.get("target")
-            )
-            
-            # 2. If it's a write_file action, check if we JUST did this
-            if is_same_action and plan.get("action") == "write_file" and last_status == "success":
-                 logger.warning(f"Duplicate write_file action for '{plan.get('target')}' detected! forcing 'done'.")
-                 return {"status": "done", "message": "Loop detected (duplicate write), task assumed complete", "log": step_log}
-                 
-            # 3. If it's a play_media action, check if we JUST did this
-            if is_same_action and plan.get("action") == "play_media" and last_status == "success":
-                 logger.warning(f"Duplicate play_media action for '{plan.get('target')}' detected! forcing 'done'.")
-                 return {"status": "done", "message": "Loop detected (duplicate media play), task assumed complete", "log": step_log}
-                 
-            # 4. General loop detection for other actions
-            if (last_status == "success" and is_same_action and 
-                last_plan.get("strategy") == plan.get("strategy")):
-                
-                logger.warning("Duplicate action detected! Planner is looping. Forcing 'done'.")
-                return {"status": "done", "message": "Loop detected, task assumed complete", "log": step_log}
+        # (an early-dispatched action already passed this check)
+        loop_message = None if early else self._detect_loop(plan)
+        if loop_message:
+            return {"status": "done", "message": loop_message, "log": step_log}
+
+        # Overlap verification of this step with planning of the next one, unless
+        # more actions follow (batch) or the input state is rebuilt with vision anyway
+        batch = self._batch_actions(plan)
+        pipelined = self.planner.pipelining_enabled and not (context and context.get("use_vision"))
 
         # 3. Execution
         logger.info("Step 3: Execution")
-        execution_result = self.executor.execute_plan(plan)
+        if early:
+            logger.info("Action was dispatched early while the plan was streaming.")
+            pre_execution_fingerprint = early["pre_execution_fingerprint"]
+            execution_result = early["result"]
+            step_log["early_dispatch"] = True
+        else:
+            pre_execution_fingerprint = self.change_detector.capture()
+            execution_result = self.executor.execute_plan(plan)
         step_log["execution"] = execution_result
         
         if not execution_result:
@@ -119,17 +145,151 @@ class Agent:
             
         # 4. Verification
         logger.info("Step 4: Verification")
-        # Wait a bit for UI to update
-        time.sleep(1)
-        new_state = self.perception.capture_state()
-        verified = self.verifier.verify(plan, current_state, new_state)
+        new_state = self._observe_after(pre_execution_fingerprint, current_state, self._reaction_timeout(plan))
+        if pipelined and not batch:
+            self._speculate(goal, new_state, step_log)
+        verified = self.verifier.verify(plan, current_state, new_state) and self.verifier.check_expectations(plan, new_state)
         step_log["verification"] = verified
-        
+        result = self._record_result(goal, plan, verified, step_log)
+
+        # 5. Rest of the batch: run back-to-back while every checkpoint holds;
+        # consecutive actions that need no input or focus are started together
+        index = 1
+        while index <= len(batch) and result["status"] == "success":
+            next_plan = batch[index - 1]
+            if next_plan.get("action") == "done":
+                logger.info("Batch ends with 'done'. Goal complete.")
+                self.history.append({"status": "done", "plan": next_plan})
+                result = {"status": "done", "message": "Task completed", "log": result["log"]}
+                break
+            group = self._concurrent_group(batch, index - 1)
+            last = index + len(group) - 1 == len(batch)
+            if len(group) > 1:
+                logger.info(f"Batch actions {index}-{index + len(group) - 1} run concurrently: {[p.get('action') for p in group]}")
+                result, new_state = self._run_concurrent_checkpoints(goal, group, new_state, index, speculate=pipelined and last)
+            else:
+                logger.info(f"Batch action {index}: {next_plan.get('action')}")
+                result, new_state = self._run_checkpoint(goal, next_plan, new_state, index, speculate=pipelined and last)
+            index += len(group)
+
+        # Only a batch whose every checkpoint held is worth caching
+        self.planner.record_outcome(plan, result["status"] in ("success", "done"))
+        return result
+
+    def _batch_actions(self, plan):
+        """Follow-up actions the planner batched behind the first one (capped by config)."""
+        actions = [a for a in plan.get("next_actions") or [] if isinstance(a, dict) and a.get("action")]
+        return actions[:self.planner.batch_max_actions - 1]
+
+    def _concurrent_group(self, batch, start):
+        """
+        batch[start] plus the consecutive non-UI actions after it that don't
+        depend on any earlier member (see depends_on); batch order is kept.
+        """
+        group = [batch[start]]
+        claimed = [self.executor.resources_for(batch[start])]
+        if is_ui_bound(claimed[0]):
+            return group
+        for plan in batch[start + 1:]:
+            resources = self.executor.resources_for(plan)
+            if (plan.get("action") == "done" or is_ui_bound(resources) or
+                    any(depends_on(resources, earlier) for earlier in claimed)):
+                break
+            group.append(plan)
+            claimed.append(resources)
+        return group
+
+    def _reaction_timeout(self, plan):
+        """How long to wait for the screen to react: up to 1s for UI actions, not at all for the rest."""
+        return 1.0 if is_ui_bound(self.executor.resources_for(plan)) else 0.0
+
+    def _window_snapshot(self):
+        """
+        Handles and titles of the top-level windows, or None if they can't be
+        read. Catches what a screen grab misses: windows opening minimized,
+        hidden, or on a part of the desktop that isn't captured.
+        """
+        try:
+            return frozenset((getattr(w, "NativeWindowHandle", None), getattr(w, "Name", ""))
+                             for w in self.perception.backend.get_top_level_windows())
+        except Exception as e:
+            logger.debug(f"Window snapshot failed: {e}")
+            return None
+
+    def _observe_after(self, pre_execution_fingerprint, current_state, timeout=1.0):
+        """Waits (up to `timeout` seconds) for the UI to react, then re-perceives only if something changed."""
+        screen_changed, fingerprint = self.change_detector.wait_for_change(pre_execution_fingerprint, timeout=timeout)
+        windows = self._window_snapshot()
+        if screen_changed or windows is None or windows != self._last_windows:
+            new_state = self.perception.capture_state()
+        else:
+            logger.info("Screen unchanged after execution. Skipping re-perception.")
+            new_state = current_state
+        self._last_state, self._last_fingerprint, self._last_windows = new_state, fingerprint, windows
+        return new_state
+
+    def _run_checkpoint(self, goal, plan, current_state, index, speculate=False):
+        """Executes and verifies one batched action. Returns (result, state after it)."""
+        step_log = {"timestamp": time.time(), "goal": goal, "perception": current_state, "plan": plan, "batch_index": index}
+        pre_execution_fingerprint = self.change_detector.capture()
+        execution_result = self.executor.execute_plan(plan)
+        step_log["execution"] = execution_result
+        if not execution_result:
+            logger.warning(f"Batch action {index} failed to execute. Re-planning.")
+            self.history.append({"status": "failed", "plan": plan})
+            return {"status": "failed", "message": "Execution failed", "log": step_log}, current_state
+
+        new_state = self._observe_after(pre_execution_fingerprint, current_state, self._reaction_timeout(plan))
+        if speculate:
+            self._speculate(goal, new_state, step_log)
+        verified = self.verifier.verify(plan, current_state, new_state) and self.verifier.check_expectations(plan, new_state)
+        step_log["verification"] = verified
+        return self._record_result(goal, plan, verified, step_log), new_state
+
+    def _run_concurrent_checkpoints(self, goal, plans, current_state, first_index, speculate=False):
+        """
+        Starts a run of batched non-UI actions at once, then checks their
+        checkpoints in batch order, stopping at the first that fails.
+        Returns (result, state after them).
+        """
+        step_logs = [{"timestamp": time.time(), "goal": goal, "perception": current_state, "plan": plan,
+                      "batch_index": first_index + offset, "concurrent": True} for offset, plan in enumerate(plans)]
+        pre_execution_fingerprint = self.change_detector.capture()
+        futures = [self.executor.submit_plan(plan) for plan in plans]
+        for step_log, future in zip(step_logs, futures):
+            try:
+                step_log["execution"] = future.result()
+            except Exception as e:
+                logger.error(f"Batch action {step_log['batch_index']} raised: {e}")
+                step_log["execution"] = False
+
+        # None of them needs the screen, so there is nothing to wait for
+        new_state = self._observe_after(pre_execution_fingerprint, current_state, timeout=0.0)
+        if speculate and all(step_log["execution"] for step_log in step_logs):
+            self._speculate(goal, new_state, *step_logs)
+
+        for plan, step_log in zip(plans, step_logs):
+            if not step_log["execution"]:
+                logger.warning(f"Batch action {step_log['batch_index']} failed to execute. Re-planning.")
+                self.history.append({"status": "failed", "plan": plan})
+                return {"status": "failed", "message": "Execution failed", "log": step_log}, new_state
+            verified = self.verifier.verify(plan, current_state, new_state) and self.verifier.check_expectations(plan, new_state)
+            step_log["verification"] = verified
+            result = self._record_result(goal, plan, verified, step_log)
+            if result["status"] != "success":
+                break
+        return result, new_state
+
+    def _record_result(self, goal, plan, verified, step_log):
         if verified:
             logger.info("Action verified successfully.")
             result = {"status": "success", "message": "Step completed", "log": step_log}
         else:
             logger.warning("Verification failed.")
+            # The next plan was requested assuming this step worked
+            self._discard_speculation()
+            # The planner's picture of the screen may be off; send it a full snapshot next time
+            self.planner.request_state_resync()
             result = {"status": "retry", "message": "Verification failed", "log": step_log}
             
         # Add to history
@@ -145,6 +305,137 @@ class Agent:
         
         return result
 
+    def _plan(self, goal, current_state, early):
+        """
+        Gets the next plan. With a streaming planner, the action is executed as
+        soon as its action and parameters have streamed in, while the model is
+        still writing the rest; `early` then records the plan and its result.
+        Execution stays on this thread (UI automation is thread-affine), the
+        stream is read on the planning thread.
+        """
+        speculative_plan = self._take_speculation(goal, current_state)
+        if speculative_plan is not None:
+            logger.info(f"Using the plan requested during the last verification: {speculative_plan.get('action')}")
+            return speculative_plan
+
+        if not self.planner.streaming_enabled:
+            return self.planner.plan(goal, current_state, history=self.history)
+
+        ready = threading.Event()
+        partial = {}
+
+        def on_partial(partial_plan):
+            partial.update(partial_plan)
+            ready.set()
+
+        planning = self._planning_pool.submit(self.planner.plan, goal, current_state, self.history, on_partial)
+        planning.add_done_callback(lambda _: ready.set())
+        ready.wait()
+
+        if partial and partial.get("action") not in ("wait", "done") and not self._detect_loop(partial):
+            early["plan"] = dict(partial)
+            early["pre_execution_fingerprint"] = self.change_detector.capture()
+            early["result"] = self.executor.execute_plan(early["plan"])
+        return planning.result()
+
+    def _speculate(self, goal, new_state, *step_logs):
+        """
+        Requests the next step's plan on the planning thread while this step is
+        being verified. It assumes verification succeeds (the history gets a
+        provisional success entry per action) and that the post-execution snapshot
+        is the next step's input state; _take_speculation only uses it if both hold.
+        """
+        history = self.history.copy()
+        for step_log in step_logs:
+            history.append({"status": "success", "message": "Step completed", "log": {**step_log, "verification": True}})
+        future = self._planning_pool.submit(self.planner.plan, goal, new_state, history, None, True)
+        self._speculation = {"goal": goal, "state": new_state, "total_steps": history.total_steps,
+                             "future": future, "failed_verification": False}
+
+    def _discard_speculation(self):
+        """Drops the speculative plan (the step it built on failed verification)."""
+        if self._speculation:
+            self._speculation["failed_verification"] = True
+            self._speculation["future"].cancel()
+
+    def _take_speculation(self, goal, current_state):
+        """
+        The speculative plan, if it was requested for exactly this goal, input
+        state and history. Otherwise it is dropped and None is returned.
+        """
+        speculation, self._speculation = self._speculation, None
+        if speculation is None:
+            return None
+        future = speculation["future"]
+        usable = (
+            not speculation["failed_verification"] and
+            speculation["goal"] == goal and
+            speculation["state"] is current_state and
+            self.history.total_steps == speculation["total_steps"] and
+            self.history[-1].get("status") == "success"
+        )
+        if usable:
+            try:
+                plan = future.result()
+            except Exception as e:
+                logger.warning(f"Speculative planning failed: {e}")
+            else:
+                self.planner.adopt_speculative_plan()
+                return plan
+        elif not future.cancel():
+            # The planner is not re-entrant; let the running request finish first
+            logger.info("Discarding the speculative plan (its step failed or the screen moved on).")
+            try:
+                future.result()
+            except Exception:
+                pass
+        self.planner.discard_speculative_plan()
+        if speculation["failed_verification"]:
+            # The speculative request may have consumed the resync the failure asked for
+            self.planner.request_state_resync()
+        return None
+
+    def _detect_loop(self, plan):
+        """Returns a reason if `plan` repeats the last successful action, else None."""
+        if not self.history:
+            return None
+        last_step = self.history[-1]
+        # FIX: Handle inconsistent history structure (done/failed vs success log)
+        # 'success' has plan inside 'log', 'done'/'failed' has plan at top level
+        last_plan = last_step.get("plan") or last_step.get("log", {}).get("plan", {})
+        last_status = last_step.get("status")
+
+        # If action, target, strategy match, and it was successful, assume we are looping
+        # Note: We are now looser on content matching because sometimes LLM generates slightly different whitespace
+        # or comments, but the INTENT is identical.
+
+        # 1. Check strict action/target match
+        is_same_action = (
+            last_plan.get("action") == plan.get("action") and
+            last_plan.get("target") == plan.get("target")
+        )
+
+        # 2. If it's a write_file action, check if we JUST did this
+        if is_same_action and plan.get("action") == "write_file" and last_status == "success":
+            logger.warning(f"Duplicate write_file action for '{plan.get('target')}' detected! forcing 'done'.")
+            return "Loop detected (duplicate write), task assumed complete"
+
+        # 3. If it's a play_media action, check if we JUST did this
+        if is_same_action and plan.get("action") == "play_media" and last_status == "success":
+            logger.warning(f"Duplicate play_media action for '{plan.get('target')}' detected! forcing 'done'.")
+            return "Loop detected (duplicate media play), task assumed complete"
+
+        # 4. General loop detection for other actions
+        if (last_status == "success" and is_same_action and
+            last_plan.get("strategy") == plan.get("strategy")):
+            logger.warning("Duplicate action detected! Planner is looping. Forcing 'done'.")
+            return "Loop detected, task assumed complete"
+        return None
+
+    def wait_for_settle(self):
+        """Pauses between steps until the screen stops changing (at most step_delay seconds)."""
+        wait_until(screen_settled(self.change_detector), timeout=self.step_delay)
+
     def run_loop(self, goal):
         """Runs the agent loop until completion or max steps."""
         logger.info(f"Starting agent loop for goal: {goal}")
@@ -165,14 +456,23 @@ class Agent:
                 # Simple retry logic
             
             steps += 1
-            time.sleep(1)
+            self.wait_for_settle()
             
         return "Max steps reached."
 
 if __name__ == "__main__":
+    args = sys.argv[1:]
+    if "--profile-startup" in args:
+        # Import time per module for a cold start, measured in a fresh interpreter
+        from utils.startup_profiler import profile_startup, format_report
+        print(format_report(*profile_startup()))
+        args.remove("--profile-startup")
+        if not args:
+            sys.exit(0)
+
     agent = Agent()
-    if len(sys.argv) > 1:
-        goal = " ".join(sys.argv[1:])
+    if args:
+        goal = " ".join(args)
     else:
         goal = "Open Notepad and type Hello World"
     
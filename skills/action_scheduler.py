@@ -0,0 +1,76 @@
+import os
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from skills.actions.base import UI_RESOURCES, NETWORK, FILESYSTEM
+
+def is_ui_bound(resources):
+    """True if an action with these resources needs the keyboard, mouse or foreground window."""
+    return bool(UI_RESOURCES & set(resources))
+
+def depends_on(later, earlier):
+    """
+    True if an action needing `later` resources may depend on one needing
+    `earlier` resources that comes before it in a batch, so it must not start
+    until that one has finished:
+    - both hold the same scoped resource (two writes to one file: last writer wins);
+    - a network call follows a file write (a delegated task or message may read it).
+    Plain categories (two writes to different files, two API calls) are independent.
+    """
+    later, earlier = set(later), set(earlier)
+    if {r for r in later if ":" in r} & {r for r in earlier if ":" in r}:
+        return True
+    return NETWORK in later and FILESYSTEM in earlier
+
+class ActionScheduler:
+    """
+    Runs actions according to the resources they declare. UI-bound actions run
+    on the calling thread (UI automation is thread-affine) behind a single input
+    lock, so two of them never interleave keystrokes or fight over focus.
+    Everything else may run on a small thread pool; scoped resources such as
+    "filesystem:<path>" are held exclusively, shared ones (network) are not.
+    """
+
+    def __init__(self, max_workers=4, enabled=True):
+        self.enabled = enabled and max_workers > 1
+        self.input_lock = threading.RLock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="action") if self.enabled else None
+        self._scoped_locks = {}
+        self._scoped_locks_guard = threading.Lock()
+
+    def _locks_for(self, resources):
+        # Sorted, so two actions sharing several scoped resources can't deadlock
+        with self._scoped_locks_guard:
+            return [self._scoped_locks.setdefault(r, threading.Lock()) for r in sorted(resources) if ":" in r]
+
+    def run(self, fn, resources):
+        """Runs `fn` now, on this thread, holding what `resources` call for."""
+        if is_ui_bound(resources):
+            with self.input_lock:
+                return fn()
+        locks = self._locks_for(resources)
+        for lock in locks:
+            lock.acquire()
+        try:
+            return fn()
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def submit(self, fn, resources):
+        """
+        Returns a Future for `fn`. Non-UI work goes to the pool; UI-bound work
+        (or everything, when concurrency is disabled) runs before this returns.
+        """
+        if self._pool is not None and not is_ui_bound(resources):
+            return self._pool.submit(self.run, fn, resources)
+        future = Future()
+        try:
+            future.set_result(self.run(fn, resources))
+        except Exception as e:
+            future.set_exception(e)
+        return future
@@ -1,6 +1,18 @@
 from abc import ABC, abstractmethod
 from pydantic import BaseModel, Field
-from typing import Any, Dict, Optional, Type
+from typing import Any, Dict, FrozenSet, Optional, Type
+
+# Resources an action can declare. Actions needing INPUT or FOCUS are UI-bound:
+# they run one at a time on the agent thread. The rest may run concurrently.
+INPUT = "input"            # keyboard and mouse
+FOCUS = "focus"            # the foreground window
+NETWORK = "network"
+FILESYSTEM = "filesystem"
+UI_RESOURCES = frozenset({INPUT, FOCUS})
+
+def scoped(resource, key):
+    """A resource held exclusively per key, e.g. scoped(FILESYSTEM, path): two writes to one file never overlap."""
+    return f"{resource}:{key}"
 
 class Action(ABC):
     """
@@ -10,6 +22,8 @@ class Action(ABC):
     name: str
     description: str
     parameters_model: Type[BaseModel]
+    # Conservative default: anything undeclared is treated as UI-bound
+    resources: FrozenSet[str] = UI_RESOURCES
 
     @classmethod
     def to_schema(cls) -> Dict[str, Any]:
@@ -20,6 +34,10 @@ class Action(ABC):
             "parameters": cls.parameters_model.model_json_schema()
         }
 
+    def resources_for(self, params: BaseModel) -> FrozenSet[str]:
+        """Resources this call needs; override when they depend on the parameters."""
+        return self.resources
+
     @abstractmethod
     def execute(self, params: BaseModel) -> Dict[str, Any]:
         """
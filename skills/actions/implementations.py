@@ -1,10 +1,10 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, FrozenSet, List, Optional
 from pydantic import BaseModel, Field
-from .base import Action
+from .base import Action, INPUT, FOCUS, NETWORK, FILESYSTEM, scoped
 from utils.logger import logger
+from skills.ui_wait import wait_until, window_focused, control_exists, SLOW_BACKOFF
 import os
 import subprocess
-import time
 
 # --- Parameter Models ---
 
@@ -48,6 +48,7 @@ class OpenAppAction(Action):
     name = "open_app"
     description = "Launches a desktop application. Falls back to Web if available."
     parameters_model = AppParams
+    resources = frozenset({INPUT, FOCUS, NETWORK})  # types into Start search; may fall back to a web page
 
     def __init__(self, app_launcher, browser_controller=None):
         self.app_launcher = app_launcher
@@ -99,6 +100,7 @@ class CloseAppAction(Action):
     name = "close_app"
     description = "Closes a running application."
     parameters_model = AppParams
+    resources = frozenset({FOCUS})
 
     def __init__(self, app_launcher):
         self.app_launcher = app_launcher
@@ -111,6 +113,7 @@ class FocusAppAction(Action):
     name = "focus_app"
     description = "Brings an application window to the foreground."
     parameters_model = AppParams
+    resources = frozenset({FOCUS})
 
     def __init__(self, app_launcher):
         self.app_launcher = app_launcher
@@ -123,6 +126,7 @@ class TypeTextAction(Action):
     name = "type_text"
     description = "Types text at the current cursor location."
     parameters_model = TextParams
+    resources = frozenset({INPUT, FOCUS})
 
     def execute(self, params: TextParams) -> Dict[str, Any]:
         import pyautogui
@@ -133,6 +137,7 @@ class PressKeyAction(Action):
     name = "press_key"
     description = "Presses a specific keyboard key."
     parameters_model = KeyParams
+    resources = frozenset({INPUT, FOCUS})
 
     def execute(self, params: KeyParams) -> Dict[str, Any]:
         import pyautogui
@@ -143,6 +148,7 @@ class ClickElementAction(Action):
     name = "click_element"
     description = "Clicks at specific screen coordinates."
     parameters_model = ClickParams
+    resources = frozenset({INPUT, FOCUS})
 
     def execute(self, params: ClickParams) -> Dict[str, Any]:
         import pyautogui
@@ -153,6 +159,7 @@ class RunCommandAction(Action):
     name = "run_command"
     description = "Executes a shell command. Use 'code <file>' to open VS Code."
     parameters_model = CommandParams
+    resources = frozenset({FOCUS, FILESYSTEM})  # launched programs may open windows
 
     def execute(self, params: CommandParams) -> Dict[str, Any]:
         target = params.command
@@ -179,6 +186,7 @@ class OpenUrlAction(Action):
     name = "open_url"
     description = "Opens a website in the default browser."
     parameters_model = UrlParams
+    resources = frozenset({FOCUS, NETWORK})
 
     def __init__(self, browser_controller):
         self.browser_controller = browser_controller
@@ -191,6 +199,7 @@ class PlayMediaAction(Action):
     name = "play_media"
     description = "Plays media on YouTube or Spotify. Prioritizes Desktop Apps."
     parameters_model = MediaParams
+    resources = frozenset({INPUT, FOCUS, NETWORK})
 
     def __init__(self, app_launcher, browser_controller):
         self.app_launcher = app_launcher
@@ -214,7 +223,8 @@ class PlayMediaAction(Action):
                 # Use the new robust Windows Key search from app_launcher
                 if self.app_launcher.open_app("Spotify"):
                     import pyautogui
-                    time.sleep(5) # Wait for Spotify to fully load/focus
+                    # Wait for Spotify to fully load/focus
+                    wait_until(window_focused("Spotify"), timeout=5)
                     
                     # If generic query and already playing, maybe just ensure it's playing?
                     # But user said "play some random song", so let's search new one.
@@ -222,27 +232,28 @@ class PlayMediaAction(Action):
                     # Spotify Desktop Shortcuts:
                     # Ctrl + L: Focus Search
                     pyautogui.hotkey('ctrl', 'l')
-                    time.sleep(1)
+                    wait_until(control_exists("Search", control_type="EditControl", window_title="Spotify", focused=True,
+                                              max_depth=20, max_nodes=500),
+                               timeout=1, poll_backoff=SLOW_BACKOFF)
                     
                     # Type Query
                     pyautogui.write(query)
-                    time.sleep(1.5)
                     
-                    # Enter to Search
+                    # Enter to Search, wait for the results to render
                     pyautogui.press('enter')
-                    time.sleep(2)
+                    wait_until(control_exists("Top result", window_title="Spotify", max_depth=25, max_nodes=500),
+                               timeout=3.5, poll_backoff=SLOW_BACKOFF)
                     
                     # Move focus to the "Top Result" or "Songs" list
                     # Pressing Tab once usually highlights the "Play" button of the Top Result
                     # Pressing Enter then plays it.
+                    # (pyautogui's per-call pause paces the keystrokes)
                     pyautogui.press('tab')
-                    time.sleep(0.5)
                     pyautogui.press('enter')
                     
                     # Fallback: sometimes focus is weird. 
                     # Try clicking the "Play" button of the first song in list? 
                     # Or try hitting Enter again if the first one didn't work.
-                    time.sleep(1)
                     # If nothing happened, maybe we are still in search bar?
                     # Let's try to force play/pause if we think it worked? 
                     # No, that might pause if it was already playing.
@@ -269,10 +280,19 @@ class SendMessageAction(Action):
     name = "send_message"
     description = "Sends a message via WhatsApp (Desktop or API)."
     parameters_model = MessageParams
+    resources = frozenset({INPUT, FOCUS, NETWORK})
 
-    def __init__(self, desktop_controller, whatsapp_api):
+    def __init__(self, desktop_controller, whatsapp_api, browser_controller=None):
         self.desktop_controller = desktop_controller
         self.whatsapp_api = whatsapp_api
+        self.browser_controller = browser_controller
+
+    def resources_for(self, params: MessageParams) -> FrozenSet[str]:
+        # The Cloud API is a plain HTTPS call; every other route drives a UI
+        strategy = params.strategy.lower()
+        if "whatsapp" in strategy and ("api" in strategy or "cloud" in strategy) and self.whatsapp_api.is_available():
+            return frozenset({NETWORK})
+        return self.resources
 
     def execute(self, params: MessageParams) -> Dict[str, Any]:
         target = params.target
@@ -298,16 +318,11 @@ class SendMessageAction(Action):
             except Exception as e:
                 logger.warning(f"WhatsApp Desktop error: {e}. Falling back to Web.")
 
-            # 3. Fallback to WhatsApp Web
-            # We need a browser controller for this.
-            # Since SendMessageAction didn't have browser_controller injected, we need to add it or import it.
-            # Importing BrowserController locally to avoid changing __init__ signature if possible,
-            # BUT __init__ is the clean way. Let's update __init__.
-            
-            # Since I cannot easily change the __init__ call sites in executor.py without a second edit,
-            # I will instantiate BrowserController here as a fallback.
-            from skills.browser_controller import BrowserController
-            browser = BrowserController()
+            # 3. Fallback to WhatsApp Web, through the injected (shared) browser controller
+            if self.browser_controller is None:
+                from skills.browser_controller import BrowserController
+                self.browser_controller = BrowserController()
+            browser = self.browser_controller
             
             # Use the existing send_whatsapp_message method in BrowserController
             # which handles phone numbers vs contact names via URL hacks or UI automation
@@ -323,10 +338,15 @@ class WriteFileAction(Action):
     name = "write_file"
     description = "Writes content to a file."
     parameters_model = FileParams
+    resources = frozenset({FILESYSTEM})
 
     def __init__(self, filesystem_manager):
         self.filesystem_manager = filesystem_manager
 
+    def resources_for(self, params: FileParams) -> FrozenSet[str]:
+        # Writes to different files may overlap, writes to the same one may not
+        return self.resources | {scoped(FILESYSTEM, os.path.normcase(os.path.expanduser(params.file_path)))}
+
     def execute(self, params: FileParams) -> Dict[str, Any]:
         result_path = self.filesystem_manager.write_file(params.file_path, params.content)
         if result_path:
@@ -337,6 +357,7 @@ class DelegateAction(Action):
     name = "delegate_to_openclaw"
     description = "Delegates a complex task to OpenClaw."
     parameters_model = DelegateParams
+    resources = frozenset({NETWORK})
 
     def __init__(self, openclaw_client):
         self.openclaw_client = openclaw_client
@@ -0,0 +1,214 @@
+import os
+import sys
+import threading
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.logger import logger
+
+SHORTCUT_EXTENSIONS = (".lnk", ".url", ".appref-ms")
+EXECUTABLE_EXTENSIONS = (".exe",)
+
+def default_roots():
+    """Start Menu folders (shortcuts, recursive) and per-user app installs (executables, shallow)."""
+    program_data = os.environ.get("PROGRAMDATA", "C:/ProgramData")
+    app_data = os.environ.get("APPDATA", os.path.expanduser("~/AppData/Roaming"))
+    local_app_data = os.environ.get("LOCALAPPDATA", os.path.expanduser("~/AppData/Local"))
+    return [
+        {"path": os.path.join(program_data, "Microsoft", "Windows", "Start Menu", "Programs"),
+         "source": "start_menu", "extensions": SHORTCUT_EXTENSIONS, "max_depth": 4},
+        {"path": os.path.join(app_data, "Microsoft", "Windows", "Start Menu", "Programs"),
+         "source": "start_menu", "extensions": SHORTCUT_EXTENSIONS, "max_depth": 4},
+        {"path": os.path.join(local_app_data, "Programs"),
+         "source": "app_dir", "extensions": EXECUTABLE_EXTENSIONS, "max_depth": 2},
+        {"path": os.path.join(app_data, "Microsoft", "Internet Explorer", "Quick Launch", "User Pinned", "TaskBar"),
+         "source": "taskbar", "extensions": SHORTCUT_EXTENSIONS, "max_depth": 1},
+    ]
+
+class InstalledAppIndex:
+    """
+    Background index of installed applications.
+    Roots are scanned once on a worker thread and the result is persisted to the
+    local DB; later runs start from the persisted copy immediately. Changes are
+    then applied incrementally from watchdog file events. Readers get prebuilt
+    tuples, so perception never touches the filesystem.
+    """
+
+    def __init__(self, db=None, roots=None, watch=True):
+        self.db = db
+        self.roots = roots if roots is not None else default_roots()
+        self.watch = watch
+        self._entries = {}  # path -> {"name", "source"}
+        self._lock = threading.Lock()
+        self._apps = ()
+        self._taskbar_apps = ()
+        self._observer = None
+        self._scan_thread = None
+        self.ready = threading.Event()
+
+    # --- Read side (hot path) ---
+
+    def get_apps(self):
+        """Installed application names (Start Menu shortcuts and app executables)."""
+        return self._apps
+
+    def get_taskbar_apps(self):
+        """Applications pinned to the taskbar."""
+        return self._taskbar_apps
+
+    # --- Lifecycle ---
+
+    def start(self):
+        """Loads the persisted index, then rescans and starts watching in the background."""
+        if self.db:
+            persisted = self.db.load_installed_apps()
+            if persisted:
+                with self._lock:
+                    self._entries = {row["path"]: {"name": row["name"], "source": row["source"]} for row in persisted}
+                    self._publish()
+                logger.info(f"Loaded {len(persisted)} installed apps from the local index.")
+
+        self._scan_thread = threading.Thread(target=self._scan_and_watch, daemon=True, name="app-index")
+        self._scan_thread.start()
+
+    def stop(self):
+        if self._observer:
+            self._observer.stop()
+            self._observer.join(timeout=2)
+            self._observer = None
+
+    def _scan_and_watch(self):
+        try:
+            self.scan()
+            if self.watch:
+                self._start_watching()
+        except Exception as e:
+            logger.error(f"Installed app indexing failed: {e}")
+        finally:
+            self.ready.set()
+
+    # --- Full scan ---
+
+    def scan(self):
+        """Walks every root and replaces the index (and its persisted copy)."""
+        entries = {}
+        for root in self.roots:
+            if not os.path.isdir(root["path"]):
+                continue
+            base_depth = root["path"].rstrip(os.sep).count(os.sep)
+            for dirpath, dirnames, filenames in os.walk(root["path"]):
+                if dirpath.rstrip(os.sep).count(os.sep) - base_depth + 1 >= root["max_depth"]:
+                    dirnames[:] = []
+                for filename in filenames:
+                    path = os.path.join(dirpath, filename)
+                    entry = self._entry_for(path, root)
+                    if entry:
+                        entries[path] = entry
+
+        with self._lock:
+            self._entries = entries
+            self._publish()
+        if self.db:
+            self.db.save_installed_apps(
+                [{"path": path, "name": e["name"], "source": e["source"]} for path, e in entries.items()]
+            )
+        logger.info(f"Indexed {len(entries)} installed app entries.")
+        return len(entries)
+
+    def _root_for(self, path):
+        for root in self.roots:
+            root_path = os.path.abspath(root["path"])
+            if os.path.abspath(path).startswith(root_path + os.sep):
+                return root
+        return None
+
+    def _within_depth(self, path, root):
+        # A file directly in the root is at depth 1; scan() doesn't descend past max_depth
+        relative = os.path.relpath(os.path.abspath(path), os.path.abspath(root["path"]))
+        return len(relative.split(os.sep)) <= root["max_depth"]
+
+    def _entry_for(self, path, root):
+        if not path.lower().endswith(root["extensions"]) or not self._within_depth(path, root):
+            return None
+        name = os.path.splitext(os.path.basename(path))[0]
+        # Skip the uninstaller/helper noise that ships next to most apps
+        if name.lower().startswith(("uninstall", "unins")):
+            return None
+        return {"name": name, "source": root["source"]}
+
+    def _publish(self):
+        # Called with the lock held. Builds the tuples readers see.
+        apps = sorted({e["name"] for e in self._entries.values() if e["source"] != "taskbar"}, key=str.lower)
+        taskbar = sorted({e["name"] for e in self._entries.values() if e["source"] == "taskbar"}, key=str.lower)
+        self._apps = tuple(apps)
+        self._taskbar_apps = tuple(taskbar)
+
+    # --- Incremental updates ---
+
+    def add_path(self, path):
+        root = self._root_for(path)
+        entry = self._entry_for(path, root) if root else None
+        if not entry:
+            return
+        with self._lock:
+            self._entries[path] = entry
+            self._publish()
+        if self.db:
+            self.db.upsert_installed_app(path, entry["name"], entry["source"])
+
+    def remove_path(self, path):
+        with self._lock:
+            # A removed directory takes everything below it along
+            removed = [p for p in self._entries if p == path or p.startswith(path.rstrip(os.sep) + os.sep)]
+            for p in removed:
+                del self._entries[p]
+            if removed:
+                self._publish()
+        if self.db:
+            for p in removed:
+                self.db.delete_installed_app(p)
+
+    def _start_watching(self):
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            logger.warning("watchdog not installed. Installed app index will not update live.")
+            return
+
+        index = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_created(self, event):
+                if not event.is_directory:
+                    index.add_path(event.src_path)
+
+            def on_deleted(self, event):
+                index.remove_path(event.src_path)
+
+            def on_moved(self, event):
+                index.remove_path(event.src_path)
+                if event.is_directory:
+                    root = index._root_for(event.dest_path)
+                    if root is None:
+                        return
+                    for dirpath, dirnames, filenames in os.walk(event.dest_path):
+                        # Same depth limit as the full scan
+                        if not index._within_depth(os.path.join(dirpath, "_"), root):
+                            dirnames[:] = []
+                            continue
+                        for filename in filenames:
+                            index.add_path(os.path.join(dirpath, filename))
+                else:
+                    index.add_path(event.dest_path)
+
+        observer = Observer()
+        handler = _Handler()
+        for root in self.roots:
+            if os.path.isdir(root["path"]):
+                observer.schedule(handler, root["path"], recursive=root["max_depth"] > 1)
+        observer.daemon = True
+        observer.start()
+        self._observer = observer
+        logger.info("Watching app folders for installs/uninstalls.")
@@ -1,23 +1,31 @@
 import os
 import subprocess
-import time
-import psutil
-import uiautomation as auto
 import logging
+from utils.lazy_import import lazy_import
+from skills.process_table import get_process_table
+from skills.ui_wait import (
+    wait_until, any_of, window_appears, process_exists, focus_changed, control_exists, SLOW_BACKOFF
+)
+
+# Imported on first use, not at startup
+psutil = lazy_import("psutil")
+auto = lazy_import("uiautomation")
 
 class AppLauncher:
-    def __init__(self, logger=None):
+    def __init__(self, logger=None, process_table=None):
         self.logger = logger or logging.getLogger(__name__)
+        # Shared, incrementally refreshed name -> PIDs index
+        self.process_table = process_table or get_process_table()
 
     def open_app(self, app_name, app_path=None):
         self.logger.info(f"Opening app: {app_name}")
         
         # Check if already running
-        for proc in psutil.process_iter(['name']):
-            if app_name.lower() in proc.info['name'].lower():
-                self.logger.info(f"{app_name} is already running. Focusing...")
-                self.focus_app(app_name)
-                return True
+        self.process_table.refresh()
+        if self.process_table.is_running(app_name):
+            self.logger.info(f"{app_name} is already running. Focusing...")
+            self.focus_app(app_name)
+            return True
 
         # Launch
         try:
@@ -29,38 +37,35 @@ class AppLauncher:
                 if app_name.lower() == "whatsapp":
                     self.logger.info("Using protocol handler for WhatsApp")
                     os.system("start whatsapp:")
-                    time.sleep(3) # Wait for UWP app to launch
+                    self._wait_for_launch("WhatsApp", timeout=3)
                     return True
                 
                 # Specific check for Spotify to use protocol handler
                 if app_name.lower() == "spotify":
                     self.logger.info("Using protocol handler for Spotify")
                     os.system("start spotify:")
-                    time.sleep(3) # Wait for Spotify to launch
+                    self._wait_for_launch("Spotify", timeout=3)
                     return True
 
                 # Robust Windows Key Search Strategy
                 self.logger.info(f"Attempting to launch {app_name} via Windows Search...")
                 import pyautogui
                 
-                # Press Windows key
+                # Press Windows key, wait for the start menu to take focus
+                start_menu_opened = focus_changed()
                 pyautogui.press('win')
-                time.sleep(1) # Wait for start menu
+                wait_until(start_menu_opened, timeout=1)
                 
-                # Type app name
+                # Type app name, wait for it to show up in the search results
                 pyautogui.write(app_name)
-                time.sleep(1.5) # Wait for search results
+                wait_until(control_exists(app_name, window_title="Search", max_depth=8), timeout=1.5, poll_backoff=SLOW_BACKOFF)
                 
                 # Press Enter to launch best match
                 pyautogui.press('enter')
                 
-                # Wait for it to open
-                time.sleep(3)
-                
-                # Verify if it opened (optional check via process list)
-                for proc in psutil.process_iter(['name']):
-                    if app_name.lower() in proc.info['name'].lower():
-                        return True
+                # Wait for it to open (returns as soon as its window or process shows up)
+                if self._wait_for_launch(app_name, timeout=3):
+                    return True
                         
                 # If process check fails, we might still have succeeded (some apps have different process names)
                 # But let's assume success if no error occurred.
@@ -71,18 +76,38 @@ class AppLauncher:
                 # os.startfile(app_name) # Requires valid path or registered app
             
             # Wait for it to open
-            time.sleep(2)
+            self._wait_for_launch(app_name, timeout=2)
             return True
         except Exception as e:
             self.logger.error(f"Failed to open app {app_name}: {e}")
             return False
 
+    def _wait_for_launch(self, app_name, timeout):
+        """Waits until a window or process for `app_name` appears (or `timeout`)."""
+        return wait_until(
+            any_of(window_appears(app_name), process_exists(app_name, self.process_table)),
+            timeout=timeout,
+            poll_backoff=SLOW_BACKOFF
+        )
+
     def close_app(self, app_name):
         self.logger.info(f"Closing app: {app_name}")
-        for proc in psutil.process_iter(['name']):
-            if app_name.lower() in proc.info['name'].lower():
-                proc.kill()
-                return True
+        self.process_table.refresh(force=True)
+        for pid in sorted(self.process_table.find(app_name)):
+            try:
+                process = psutil.Process(pid)
+                # The table may be stale: make sure the PID wasn't reused by an unrelated process
+                if not (self.process_table.is_same_process(pid, process.create_time()) and
+                        self.process_table.matches(app_name, process.name())):
+                    self.logger.warning(f"PID {pid} is no longer {app_name}; not killing it")
+                    self.process_table.discard(pid)
+                    continue
+                process.kill()
+            except psutil.NoSuchProcess:
+                self.process_table.discard(pid)
+                continue
+            self.process_table.discard(pid)
+            return True
         return False
 
     def focus_app(self, app_name):
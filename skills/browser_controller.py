@@ -1,11 +1,20 @@
 import webbrowser
-import time
 import urllib.parse
 import urllib.request
 import re
 import threading
-import uiautomation as auto
+import time
 from utils.logger import logger
+from utils.lazy_import import lazy_import
+from skills.ui_wait import wait_until, any_of, focus_changed, window_focused, control_exists, search_results_show, PollBackoff, SLOW_BACKOFF
+
+auto = lazy_import("uiautomation")  # imported on first use, not at startup
+
+def _site_name(url):
+    """'https://www.youtube.com/watch?v=x' -> 'youtube' (browser window titles carry the page title)."""
+    host = urllib.parse.urlparse(url if "//" in url else "//" + url).hostname or url
+    parts = [p for p in host.split(".") if p not in ("www", "web", "open", "m")]
+    return parts[0] if parts else host
 
 class BrowserController:
     def __init__(self):
@@ -15,8 +24,10 @@ class BrowserController:
         """Opens a URL in the default browser."""
         logger.info(f"Opening URL: {url}")
         try:
+            browser_focused = focus_changed()
             webbrowser.open(url)
-            time.sleep(2) # Wait for browser to launch
+            # Wait for the browser to come to the front (a new window, or an existing one raising its tab)
+            wait_until(any_of(browser_focused, window_focused(_site_name(url))), timeout=2)
             return True
         except Exception as e:
             logger.error(f"Failed to open URL {url}: {e}")
@@ -64,7 +75,6 @@ class BrowserController:
         Uses UIAutomation to search for various labels like "Skip Ad", "Skip Ads", etc.
         """
         logger.info("Monitoring for YouTube ads...")
-        start_time = time.time()
         max_duration = 45 # Wait up to 45 seconds (some ads are unskippable for 15s+)
         
         try:
@@ -75,62 +85,66 @@ class BrowserController:
                 logger.warning("No foreground window found for ad skipping.")
                 return
 
-            while time.time() - start_time < max_duration:
+            def find_skip_button():
+                # Refresh window handle in case user switched tabs/windows
+                nonlocal browser_window
+                if not browser_window.Exists(0, 0):
+                    browser_window = auto.GetForegroundControl()
                 # Search for ANY control with "Skip Ad" in the name (case-insensitive)
                 # Use FindFirst instead of GetFirstChildControl for depth control
-                skip_button = browser_window.FindFirst(
+                button = browser_window.FindFirst(
                     auto.TreeScope.Descendants,
                     lambda c, d: isinstance(c.Name, str) and "skip" in c.Name.lower() and "ad" in c.Name.lower()
                 )
+                return button if button and button.Exists(0, 0) else None
+
+            # Polled every 0.5-2 s to stay light on CPU; returns as soon as the button shows up
+            skip_button = wait_until(
+                find_skip_button,
+                timeout=max_duration,
+                poll_backoff=PollBackoff(initial=0.5, factor=1.5, maximum=2.0),
+                description="YouTube skip-ad button"
+            )
+            
+            if skip_button:
+                logger.info(f"Ad detected! Found control '{skip_button.Name}'. Clicking...")
                 
-                if skip_button and skip_button.Exists(0, 0):
-                    logger.info(f"Ad detected! Found control '{skip_button.Name}'. Clicking...")
-                    
-                    # PRIORITY 1: Try Invoke Pattern (Does not move mouse, works in background)
-                    try:
-                        invoke_pattern = skip_button.GetInvokePattern()
-                        if invoke_pattern:
-                            invoke_pattern.Invoke()
-                            logger.info("Ad skipped via Invoke Pattern (Silent).")
-                            return
-                    except Exception as e:
-                        logger.debug(f"Invoke Pattern failed: {e}")
-
-                    # PRIORITY 2: Try Legacy IAccessible Pattern (Does default action, usually click)
-                    try:
-                        legacy_pattern = skip_button.GetLegacyIAccessiblePattern()
-                        if legacy_pattern and legacy_pattern.DefaultAction:
-                            legacy_pattern.DoDefaultAction()
-                            logger.info("Ad skipped via Legacy Pattern (Silent).")
-                            return
-                    except Exception as e:
-                        logger.debug(f"Legacy Pattern failed: {e}")
-
-                    # PRIORITY 3: Standard Click (Moves mouse)
-                    # Only do this if we are ALREADY in the browser to avoid stealing focus from another app
-                    if browser_window.HasKeyboardFocus:
-                         try:
-                            skip_button.Click(simulateMove=False) # Try click without moving mouse if possible
-                            logger.info("Ad skipped via Standard Click.")
-                            return
-                         except Exception as e:
-                            logger.warning(f"Standard Click failed: {e}")
-                    else:
-                         logger.info("Skipping physical click because browser is not focused (avoiding interruption).")
-                         # We found the ad but couldn't silently skip it. 
-                         # Better to do nothing than to steal focus while user is typing.
-                         
-                    return
-                
-                # Check every 2 seconds to be less CPU intensive
-                time.sleep(2)
-                
-                # Refresh window handle in case user switched tabs/windows?
-                # Actually, better to re-acquire foreground if we lost it?
-                # For now, let's just re-check if we still have a valid window
-                if not browser_window.Exists(0, 0):
-                     browser_window = auto.GetForegroundControl()
-                
+                # PRIORITY 1: Try Invoke Pattern (Does not move mouse, works in background)
+                try:
+                    invoke_pattern = skip_button.GetInvokePattern()
+                    if invoke_pattern:
+                        invoke_pattern.Invoke()
+                        logger.info("Ad skipped via Invoke Pattern (Silent).")
+                        return
+                except Exception as e:
+                    logger.debug(f"Invoke Pattern failed: {e}")
+
+                # PRIORITY 2: Try Legacy IAccessible Pattern (Does default action, usually click)
+                try:
+                    legacy_pattern = skip_button.GetLegacyIAccessiblePattern()
+                    if legacy_pattern and legacy_pattern.DefaultAction:
+                        legacy_pattern.DoDefaultAction()
+                        logger.info("Ad skipped via Legacy Pattern (Silent).")
+                        return
+                except Exception as e:
+                    logger.debug(f"Legacy Pattern failed: {e}")
+
+                # PRIORITY 3: Standard Click (Moves mouse)
+                # Only do this if we are ALREADY in the browser to avoid stealing focus from another app
+                if browser_window.HasKeyboardFocus:
+                     try:
+                        skip_button.Click(simulateMove=False) # Try click without moving mouse if possible
+                        logger.info("Ad skipped via Standard Click.")
+                        return
+                     except Exception as e:
+                        logger.warning(f"Standard Click failed: {e}")
+                else:
+                     logger.info("Skipping physical click because browser is not focused (avoiding interruption).")
+                     # We found the ad but couldn't silently skip it. 
+                     # Better to do nothing than to steal focus while user is typing.
+                     
+                return
+            
             logger.info("No skippable ad detected within timeout.")
             
         except Exception as e:
@@ -148,6 +162,40 @@ class BrowserController:
             logger.error(f"Failed to play Spotify for query '{query}': {e}")
             return False
 
+    def _wait_for_whatsapp_control(self, name, control_type=None, timeout=5, focused=False):
+        """
+        Waits for a control in the WhatsApp Web page. Only the page document is
+        matched, so the browser's own controls ("Address and search bar") can't
+        satisfy it. Web content sits deep in the tree, but every node is a UIA
+        call, so each poll is capped.
+        """
+        return wait_until(
+            control_exists(name, control_type=control_type, window_title="WhatsApp", within="DocumentControl",
+                           focused=focused, max_depth=30, max_nodes=800),
+            timeout=timeout,
+            poll_backoff=SLOW_BACKOFF
+        )
+
+    def _wait_for_whatsapp_search(self, type_query, target, settle=3, timeout=8):
+        """
+        Runs `type_query` and waits until the page's chat list has been
+        filtered to show `target`. A recent chat with that name is often
+        listed already, so its mere presence proves nothing. Returns False if
+        the search never shows it; if the list can't be read, just waits
+        `settle` seconds as before.
+        """
+        try:
+            results = search_results_show(target, window_title="WhatsApp", within="DocumentControl",
+                                          max_depth=30, max_nodes=800)
+        except Exception as e:
+            logger.debug(f"Could not read the WhatsApp chat list: {e}")
+            results = None
+        type_query()
+        if results is None or not results.baseline:
+            time.sleep(settle)
+            return True
+        return bool(wait_until(results, timeout=timeout, poll_backoff=SLOW_BACKOFF))
+
     def send_whatsapp_message(self, target, message):
         """
         Opens WhatsApp Web to send a message.
@@ -167,8 +215,8 @@ class BrowserController:
                 url = f"https://web.whatsapp.com/send?phone={clean_phone}&text={encoded_message}"
                 self.open_url(url)
                 
-                # Wait for page load and send button
-                time.sleep(15)
+                # Wait for page load: the message box appears once the chat is ready
+                self._wait_for_whatsapp_control("Type a message", control_type="EditControl", timeout=15)
                 
                 # Press Enter to send (the text is already pre-filled by the URL)
                 import pyautogui
@@ -181,24 +229,24 @@ class BrowserController:
                 
                 import pyautogui
                 
-                # Wait for WhatsApp Web to load
-                time.sleep(15) 
+                # Wait for WhatsApp Web to load (the chat list's search box shows up in the page)
+                self._wait_for_whatsapp_control("Search", control_type="EditControl", timeout=15)
                 
                 # Focus the search box (Ctrl + Alt + / is the shortcut)
                 pyautogui.hotkey('ctrl', 'alt', '/')
-                time.sleep(2) 
+                self._wait_for_whatsapp_control("Search", control_type="EditControl", timeout=2, focused=True)
                 
-                # Type the name
-                pyautogui.write(target)
-                time.sleep(3) # Wait for search results
+                # Type the name, wait for the search to filter the chat list down to the contact
+                if not self._wait_for_whatsapp_search(lambda: pyautogui.write(target), target):
+                    logger.warning(f"WhatsApp search never showed '{target}'. Not sending.")
+                    return False
                 
-                # Select contact
+                # Select contact, wait for the chat's message box
                 pyautogui.press('enter') 
-                time.sleep(2) 
+                self._wait_for_whatsapp_control("Type a message", control_type="EditControl", timeout=2)
                 
-                # Type message
+                # Type message and send (pyautogui.write returns once every key is sent)
                 pyautogui.write(message)
-                time.sleep(1)
                 pyautogui.press('enter') # Send
                 
                 return True
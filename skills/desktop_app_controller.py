@@ -1,21 +1,25 @@
 import os
 import time
-import pyautogui
-import pyperclip
 from utils.logger import logger
+from utils.lazy_import import lazy_import
 from skills.app_launcher import AppLauncher
+from skills.ui_wait import wait_until, control_exists, search_results_show, clipboard_contains, PollBackoff, SLOW_BACKOFF
+
+# Only needed once a WhatsApp Desktop message is actually sent
+pyautogui = lazy_import("pyautogui")
+pyperclip = lazy_import("pyperclip")
 
 class DesktopAppController:
-    def __init__(self):
-        self.app_launcher = AppLauncher()
+    def __init__(self, app_launcher=None):
+        self.app_launcher = app_launcher or AppLauncher()
 
     def _safe_paste(self, text):
         """Safely pastes text using clipboard to avoid slow typing."""
         try:
             pyperclip.copy(text)
-            time.sleep(0.1) # Wait for clipboard to update
+            wait_until(clipboard_contains(text), timeout=0.5, poll_backoff=PollBackoff(initial=0.01, maximum=0.1))
+            # pyautogui's own PAUSE after each call lets the paste land
             pyautogui.hotkey('ctrl', 'v')
-            time.sleep(0.1)
         except Exception as e:
             logger.error(f"Clipboard paste failed: {e}")
             # Fallback to typing if paste fails
@@ -39,12 +43,34 @@ class DesktopAppController:
 
     def _wait_for_focus(self, timeout=5.0):
         """Waits for WhatsApp to become the foreground window."""
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            if self._is_focused():
-                return True
-            time.sleep(0.5)
-        return False
+        return bool(wait_until(self._is_focused, timeout=timeout, description="WhatsApp to be focused"))
+
+    def _wait_for_control(self, name, control_type=None, timeout=1.0, focused=False):
+        """Waits for a control in the WhatsApp Desktop window (each poll is capped; every node is a UIA call)."""
+        return wait_until(
+            control_exists(name, control_type=control_type, window_title="WhatsApp", focused=focused,
+                           max_depth=20, max_nodes=500),
+            timeout=timeout,
+            poll_backoff=SLOW_BACKOFF
+        )
+
+    def _wait_for_search(self, type_query, target, settle=1.0, timeout=3.0):
+        """
+        Runs `type_query` and waits until the search results have replaced the
+        chat list and show `target` (a recent chat with that name is usually
+        listed before searching). Returns False if they never do; if the list
+        can't be read, just waits `settle` seconds as before.
+        """
+        try:
+            results = search_results_show(target, window_title="WhatsApp", max_depth=20, max_nodes=500)
+        except Exception as e:
+            logger.debug(f"Could not read the WhatsApp chat list: {e}")
+            results = None
+        type_query()
+        if results is None or not results.baseline:
+            time.sleep(settle)
+            return True
+        return bool(wait_until(results, timeout=timeout, poll_backoff=SLOW_BACKOFF))
 
     def send_whatsapp_desktop_message(self, target, message):
         """
@@ -64,18 +90,18 @@ class DesktopAppController:
         try:
             # 2. Search for contact
             # "Reset" state to ensure no other chat/search is open
+            # (pyautogui pauses briefly after every call, which paces these keystrokes)
             pyautogui.press('esc')
-            time.sleep(0.1)
             pyautogui.press('esc') 
-            time.sleep(0.2)
             
             # Use Ctrl+N (New Chat) which is more reliable for finding people than Ctrl+F (Find in chat)
             pyautogui.hotkey('ctrl', 'n')
-            time.sleep(0.5)
+            self._wait_for_control("Search", control_type="EditControl", timeout=0.5, focused=True)
             
-            # Paste contact name/number (Faster than typing)
-            self._safe_paste(target)
-            time.sleep(1.0) # Wait for search results
+            # Paste contact name/number (Faster than typing), wait for the search results to show it
+            if not self._wait_for_search(lambda: self._safe_paste(target), target):
+                logger.warning(f"WhatsApp search never showed '{target}'. Aborting.")
+                return False
             
             if not self._is_focused():
                 logger.warning("WhatsApp lost focus during search. Aborting.")
@@ -83,13 +109,11 @@ class DesktopAppController:
 
             # Select first result
             pyautogui.press('down')
-            time.sleep(0.1)
             pyautogui.press('enter')
-            time.sleep(0.5) # Wait for chat to open
+            self._wait_for_control("Type a message", timeout=0.5) # Wait for chat to open
             
             # 3. Type and send message
             self._safe_paste(message)
-            time.sleep(0.1)
             pyautogui.press('enter')
             
             logger.info("Message sent via WhatsApp Desktop")
@@ -1,4 +1,3 @@
-import time
 import os
 import sys
 
@@ -6,14 +5,10 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from utils.logger import logger
-from skills.app_launcher import AppLauncher
-from skills.structured_perception import StructuredPerception
-from skills.browser_controller import BrowserController
-from skills.filesystem_manager import FilesystemManager
-from skills.openclaw_client import OpenClawClient
-from skills.desktop_app_controller import DesktopAppController
-from skills.whatsapp_api_client import WhatsAppAPIClient
+from skills.service_container import get_services
 from skills.actions.registry import ActionRegistry
+from skills.actions.base import UI_RESOURCES
+from skills.action_scheduler import ActionScheduler
 from skills.actions.implementations import (
     OpenAppAction, CloseAppAction, FocusAppAction, TypeTextAction, PressKeyAction,
     ClickElementAction, RunCommandAction, OpenUrlAction, PlayMediaAction,
@@ -21,20 +16,27 @@ from skills.actions.implementations import (
 )
 
 class Executor:
-    def __init__(self):
-        # Initialize Services
-        self.app_launcher = AppLauncher()
-        self.perception = StructuredPerception()
-        self.browser_controller = BrowserController()
-        self.filesystem_manager = FilesystemManager()
-        self.openclaw = OpenClawClient()
-        self.desktop_controller = DesktopAppController()
-        self.whatsapp_api = WhatsAppAPIClient()
+    def __init__(self, services=None):
+        # Shared services: built once per process, not once per component
+        self.services = services or get_services()
+        self.app_launcher = self.services.get("app_launcher")
+        self.browser_controller = self.services.get("browser_controller")
+        self.filesystem_manager = self.services.get("filesystem_manager")
+        self.openclaw = self.services.get("openclaw")
+        self.desktop_controller = self.services.get("desktop_controller")
+        self.whatsapp_api = self.services.get("whatsapp_api")
 
         # Initialize Registry
         self.registry = ActionRegistry()
         self._register_actions()
 
+        # UI-bound actions run one at a time behind the input lock; the rest may overlap
+        concurrency = (self.services.get("config").get('executor', {}) or {}).get('concurrency', {}) or {}
+        self.scheduler = ActionScheduler(
+            max_workers=concurrency.get('max_workers', 4),
+            enabled=concurrency.get('enabled', True)
+        )
+
     def _register_actions(self):
         """Registers all available actions with their dependencies."""
         self.registry.register(OpenAppAction(self.app_launcher, self.browser_controller))
@@ -46,12 +48,33 @@ class Executor:
         self.registry.register(RunCommandAction())
         self.registry.register(OpenUrlAction(self.browser_controller))
         self.registry.register(PlayMediaAction(self.app_launcher, self.browser_controller))
-        self.registry.register(SendMessageAction(self.desktop_controller, self.whatsapp_api))
+        self.registry.register(SendMessageAction(self.desktop_controller, self.whatsapp_api, self.browser_controller))
         self.registry.register(WriteFileAction(self.filesystem_manager))
         self.registry.register(DelegateAction(self.openclaw))
 
+    def resources_for(self, plan):
+        """Resources the plan's action declares (UI-bound if the plan can't be resolved)."""
+        action = self.registry.get_action(plan.get("action"))
+        if not action:
+            return UI_RESOURCES
+        try:
+            return action.resources_for(action.parameters_model(**self._map_legacy_params(plan.get("action"), plan)))
+        except Exception:
+            return action.resources
+
     def execute_plan(self, plan):
         """Executes the given plan using the Action Registry."""
+        return self.scheduler.run(lambda: self._execute(plan), self.resources_for(plan))
+
+    def submit_plan(self, plan):
+        """
+        Starts the plan and returns a Future of execute_plan's result. Actions
+        that need no input or focus run on the scheduler's pool; UI-bound ones
+        complete on this thread before it returns.
+        """
+        return self.scheduler.submit(lambda: self._execute(plan), self.resources_for(plan))
+
+    def _execute(self, plan):
         logger.info(f"Executing plan: {plan}")
         
         action_name = plan.get("action")
@@ -132,8 +155,14 @@ class Executor:
         """
         Uses the Planner (LLM) to analyze the traceback and suggest a fix.
         """
-        from skills.groq_planner import GroqPlanner
-        planner = GroqPlanner() # Re-instantiate to avoid circular deps if any
+        # The shared planner: no re-parsing config.yaml or rebuilding schemas per error
+        planner = self.services.get("planner")
+
+        # The planner's ModelScheduler is process-wide, so this sees the same
+        # rate-limit and circuit state as the main loop. Don't pile onto a throttled API.
+        if not planner.scheduler.route(planner.models):
+            logger.warning("Skipping self-healing: all models are throttled or unhealthy.")
+            return None
         
         goal = f"Fix error '{str(error)}' when executing action '{action}' on target '{target}'"
         current_state = {"error": str(error), "failed_plan": plan}
@@ -0,0 +1,253 @@
+import os
+import re
+import sys
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.logger import logger
+
+# Words that mean the goal has more than one intent ("open notepad and type ...")
+COMPOUND_WORDS = {"and", "then", "after", "before", "with", "type", "write", "search", "send", "play", "in", "on", "to"}
+# Nouns that usually mean content inside an app, not an app ("open TTDE notes" is a classroom workflow)
+CONTENT_WORDS = {"notes", "class", "classroom", "file", "files", "document", "documents", "email", "emails",
+                 "message", "messages", "folder", "project", "assignment", "homework", "chat"}
+
+# Words that make "close all windows" / "start it" a request about something other than one app
+QUANTIFIER_WORDS = {"all", "every", "everything", "it", "this", "that", "them", "something", "anything"}
+# Single words that name a task or a thing, not an installed app ("run tests", "start timer")
+GENERIC_NOUNS = {"tests", "test", "timer", "alarm", "server", "build", "script", "program", "programs", "game",
+                 "music", "video", "song", "windows", "window", "apps", "tabs", "tab", "computer", "pc"}
+# Without a scheme or "www.", a host must end in one of these to count as a URL
+COMMON_TLDS = {"com", "org", "net", "edu", "gov", "io", "dev", "ai", "app", "co", "me", "tv", "gg", "so", "xyz",
+               "info", "biz", "ly", "us", "uk", "in", "de", "fr", "es", "it", "nl", "ca", "au", "jp", "ru", "br"}
+# "notes.txt" and "main.py" are files, not domains
+FILE_EXTENSIONS = {"txt", "py", "pdf", "md", "doc", "docx", "xls", "xlsx", "csv", "ppt", "pptx", "json", "yaml",
+                   "yml", "xml", "html", "htm", "js", "ts", "css", "java", "c", "cpp", "h", "cs", "go", "rs", "rb",
+                   "php", "sh", "bat", "ps1", "exe", "msi", "lnk", "zip", "rar", "7z", "png", "jpg", "jpeg", "gif",
+                   "bmp", "svg", "mp3", "mp4", "wav", "mkv", "avi", "log", "ini", "cfg", "toml", "ipynb"}
+
+_APP = r"(?:the\s+)?(?P<app>[\w][\w .+&'-]{0,40}?)(?:\s+(?:app|application|window))?"
+_URL = r"(?P<url>https?://\S+|(?:[\w-]+\.)+[a-z]{2,}(?::\d+)?(?:/\S*)?)"
+_POLITE = r"(?:please\s+|can you\s+|could you\s+)?"
+# "open chrome please", "close spotify for me"
+_TRAILING = r"(?:,?\s+(?:please|for me|now|thanks|thank you))*"
+
+# Media commands about what's already playing, not something to search for ("play next", "play it again")
+PLAYBACK_WORDS = {"next", "previous", "prev", "again", "back", "pause", "resume", "random", "more", "something"}
+# Confidence of an app rule whose name matches nothing on this machine (below the default threshold)
+UNRESOLVED_APP_CONFIDENCE = 0.6
+
+class IntentRule:
+    """One goal pattern mapped to an action and a parameter builder."""
+
+    def __init__(self, action, verbs, pattern, build, confidence):
+        self.action = action
+        self.verbs = verbs  # first words this rule can start with ("" = any)
+        self.regex = re.compile(rf"^{_POLITE}{pattern}{_TRAILING}[\s.!]*$", re.IGNORECASE)
+        self.build = build
+        self.confidence = confidence
+
+def _app_params(match):
+    app = match.group("app").strip(" '\"")
+    words = app.lower().split()
+    if not words or len(words) > 4 or COMPOUND_WORDS.intersection(words) or QUANTIFIER_WORDS.intersection(words):
+        return None
+    if "." in app and app.rsplit(".", 1)[-1].lower() in FILE_EXTENSIONS:
+        return None
+    return {"app_name": app}
+
+def _looks_like_content(app):
+    """Names that usually mean content or a task rather than an app, unless one is installed under that name."""
+    words = app.lower().split()
+    return bool(CONTENT_WORDS.intersection(words)) or (len(words) == 1 and words[0] in GENERIC_NOUNS)
+
+def _url_params(match):
+    url = match.group("url")
+    if re.match(r"https?://", url, re.IGNORECASE):
+        return {"url": url}
+    host = re.split(r"[:/]", url, 1)[0].lower()
+    tld = host.rsplit(".", 1)[-1]
+    if tld in FILE_EXTENSIONS or not (host.startswith("www.") or tld in COMMON_TLDS):
+        return None
+    return {"url": "https://" + url}
+
+def _media_params(match):
+    query = match.group("query").strip(" '\"")
+    words = query.lower().split()
+    if not words or QUANTIFIER_WORDS.intersection(words) or all(w in PLAYBACK_WORDS for w in words):
+        return None
+    return {"query": query, "strategy": (match.group("platform") or "youtube").lower()}
+
+def _file_params(match):
+    return {"file_path": match.group("path"), "content": match.group("content")}
+
+DEFAULT_RULES = [
+    # Most specific first: a URL beats "open <app>"
+    IntentRule("open_url", ["open", "go", "visit", "browse", "navigate", ""],
+               rf"(?:(?:open|go to|visit|browse to|navigate to)\s+)?{_URL}", _url_params, 0.97),
+    IntentRule("play_media", ["play"],
+               r"play\s+(?P<query>.+?)(?:\s+on\s+(?P<platform>youtube|spotify))?", _media_params, 0.95),
+    IntentRule("write_file", ["write", "save", "put"],
+               r"(?:write|save|put)\s+[\"'](?P<content>[^\"']+)[\"']\s+(?:to|into|in)\s+(?:a\s+)?(?:file\s+)?"
+               r"(?P<path>[\w./\\:~-]+\.\w+)", _file_params, 0.95),
+    IntentRule("write_file", ["create", "make"],
+               r"(?:create|make)\s+(?:a\s+)?file\s+(?:called\s+|named\s+)?(?P<path>[\w./\\:~-]+\.\w+)\s+"
+               r"(?:with|containing)\s+(?:(?:the\s+)?(?:content|text)\s+)?[\"'](?P<content>[^\"']+)[\"']", _file_params, 0.95),
+    IntentRule("close_app", ["close", "quit", "exit", "kill"],
+               rf"(?:close|quit|exit|kill)\s+{_APP}", _app_params, 0.93),
+    IntentRule("focus_app", ["focus", "switch", "bring"],
+               rf"(?:focus(?:\s+on)?|switch\s+to|bring\s+up)\s+{_APP}", _app_params, 0.93),
+    # "run" usually means a command or a script, not an app; left to the LLM
+    IntentRule("open_app", ["open", "launch", "start"],
+               rf"(?:open|launch|start)\s+{_APP}", _app_params, 0.93),
+]
+
+def _words(text):
+    return re.findall(r"[\w+&'-]+", text.lower())
+
+class AppResolver:
+    """
+    Tells whether a name refers to an app on this machine: an installed or
+    taskbar app (InstalledAppIndex), a known alias or running process
+    (ProcessTable), or the app part of an open window's title. A name
+    resolves when all its words appear in one of those names ("chrome" ->
+    "Google Chrome"). Sources that aren't available are skipped.
+    """
+
+    def __init__(self, app_index=None, process_table=None, backend=None):
+        self.app_index = app_index
+        self.process_table = process_table
+        self.backend = backend
+
+    def _installed(self, name):
+        if self.app_index is None:
+            return False
+        words = set(_words(name))
+        return any(words <= set(_words(app)) for app in self.app_index.get_apps() + self.app_index.get_taskbar_apps())
+
+    def _running(self, name):
+        from skills.process_table import get_process_table, normalize_name
+        table = self.process_table or get_process_table()
+        if normalize_name(name) in table.aliases:
+            return True
+        table.refresh()
+        return bool(table.find_exact(name))
+
+    def _window_open(self, name):
+        from skills.ui_wait import get_default_backend
+        words = set(_words(name))
+        for window in (self.backend or get_default_backend()).get_top_level_windows():
+            # "New Tab - Google Chrome": only the part after the last " - " names the app
+            if words <= set(_words((getattr(window, "Name", "") or "").rsplit(" - ", 1)[-1])):
+                return True
+        return False
+
+    def resolves(self, name):
+        if not _words(name):
+            return False
+        for source in (self._installed, self._running, self._window_open):
+            try:
+                if source(name):
+                    return True
+            except Exception as e:
+                logger.debug(f"Fast path: app lookup failed ({e})")
+        return False
+
+def _history_plan(step):
+    return step.get("plan") or step.get("log", {}).get("plan", {}) or {}
+
+class FastPathPlanner:
+    """
+    Deterministic planner for simple single-intent goals ("open notepad",
+    "close chrome", "play lofi on spotify", "go to github.com"). Rules are
+    compiled once and indexed by the goal's first word; only rules whose
+    action is in the given action classes are kept, and the parameters are
+    validated against that action's parameters_model. App names must resolve
+    against `app_resolver` ("start over" names no app). Returns None when no
+    rule matches confidently, so the LLM planner takes over.
+    """
+
+    def __init__(self, action_classes, rules=None, min_confidence=0.9, app_resolver=None):
+        self.min_confidence = min_confidence
+        self.app_resolver = app_resolver or AppResolver()
+        self.models = {cls.name: cls.parameters_model for cls in action_classes}
+        self._index = {}
+        for rule in rules or DEFAULT_RULES:
+            if rule.action not in self.models:
+                continue
+            for verb in rule.verbs:
+                self._index.setdefault(verb, []).append(rule)
+        self.hits = 0
+        self.misses = 0
+
+    def match(self, goal):
+        """Best (confidence, plan) for the goal, or None."""
+        goal = " ".join(str(goal or "").split())
+        words = goal.lower().split()
+        if not words:
+            return None
+        if words[0] in ("please", "can", "could"):
+            words = words[2:] if words[0] != "please" else words[1:]
+        first = words[0] if words else ""
+
+        for rule in self._index.get(first, []) + self._index.get("", []):
+            match = rule.regex.match(goal)
+            if not match:
+                continue
+            params = rule.build(match)
+            if params is None:
+                continue
+            confidence = rule.confidence
+            app = params.get("app_name")
+            if app is not None and not self.app_resolver.resolves(app):
+                if _looks_like_content(app):
+                    continue
+                confidence = UNRESOLVED_APP_CONFIDENCE
+            try:
+                params = self.models[rule.action](**params).model_dump()
+            except Exception:
+                continue
+            return confidence, {"action": rule.action, "parameters": params}
+        return None
+
+    def plan(self, goal, history=None):
+        start = time.perf_counter()
+        matched = self.match(goal)
+        if not matched or matched[0] < self.min_confidence:
+            self.misses += 1
+            return None
+        confidence, plan = matched
+
+        # Loop guard: once the matched action has succeeded the goal is done;
+        # if it already failed, let the LLM find another way.
+        for step in reversed(history or []):
+            previous = _history_plan(step)
+            if previous.get("action") != plan["action"] or previous.get("parameters") != plan["parameters"]:
+                continue
+            if step.get("status") == "success":
+                plan = {"action": "done", "parameters": {}, "thought": f"Fast path: {plan['action']} already succeeded."}
+                break
+            logger.info(f"Fast path: '{plan['action']}' already failed for this goal. Deferring to the LLM.")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"Fast path planned '{plan['action']}' in {elapsed_ms:.2f} ms (no LLM call)")
+        plan.setdefault("thought", f"Fast path: goal matched the {plan['action']} pattern.")
+        plan.update({
+            "confidence": confidence,
+            "source": "fast_path"
+        })
+        return plan
+
+if __name__ == "__main__":
+    from skills.actions.implementations import (
+        OpenAppAction, CloseAppAction, FocusAppAction, OpenUrlAction, PlayMediaAction, WriteFileAction
+    )
+    planner = FastPathPlanner([OpenAppAction, CloseAppAction, FocusAppAction, OpenUrlAction, PlayMediaAction, WriteFileAction])
+    for goal in ["Open Notepad", "close chrome", "go to github.com", "play lofi beats on spotify",
+                 "write 'hello' to notes.txt", "Open Notepad and type Hello World"]:
+        print(goal, "->", planner.plan(goal))
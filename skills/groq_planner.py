@@ -1,30 +1,130 @@
 import os
 import yaml
-from groq import Groq
 import json
 import sys
+import threading
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from utils.logger import logger
+from utils.lazy_import import lazy_import
 from skills.actions.registry import ActionRegistry
+from skills.snapshot import dumps_state
+from skills.snapshot_diff import SnapshotDeltaEncoder
+from skills.relevance_ranker import RelevanceRanker
+from skills.plan_cache import PlanCache, normalize_goal
+from skills.model_racer import HedgedModelRacer, RaceWithdrawn
+from skills.model_scheduler import get_model_scheduler, estimate_tokens, is_rate_limit
+from skills.streaming_json import IncrementalJSONObjectParser
+from skills.fast_path_planner import FastPathPlanner, AppResolver
+from skills.prompt_builder import PromptBuilder
+from skills.rolling_history import RollingHistory, history_options
+from utils.persistent_cache import PersistentLRUCache
+
+# The SDK is imported when the first plan needs the LLM (fast-path goals never do)
+groq = lazy_import("groq")
+
+class StreamAbandoned(RaceWithdrawn):
+    """Raised inside a losing stream once another model's plan has been taken."""
 
 class GroqPlanner:
-    def __init__(self, config_path="d:/Ceaser-AI/openclaw/config.yaml"):
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+    def __init__(self, config_path="d:/Ceaser-AI/openclaw/config.yaml", config=None, app_index=None):
+        # An already-parsed config (e.g. the ServiceContainer's) skips re-reading the file
+        if config is None:
+            with open(config_path, 'r') as f:
+                config = yaml.safe_load(f)
+        self.config = config
         
         self.api_key = os.getenv("GROQ_API_KEY") or self.config['llm']['groq']['api_key']
+        self._client = None
+        self._client_options = None
+        self._client_lock = threading.Lock()
         if self.api_key == "${GROQ_API_KEY}":
             logger.warning("GROQ_API_KEY not set in environment or config. Using mock mode.")
-            self.client = None
         else:
-            self.client = Groq(api_key=self.api_key)
+            # base_url/timeout/max_retries are optional (e.g. to point at a local mock server)
+            groq_config = self.config['llm']['groq']
+            client_options = {key: groq_config[key] for key in ("base_url", "timeout", "max_retries") if groq_config.get(key) is not None}
+            # 429s are handled by the shared ModelScheduler, not by SDK-level retries
+            client_options.setdefault("max_retries", 0)
+            self._client_options = client_options
             
         # Sub-Planning State
         self.current_goal = None
         self.sub_plan = []
+        # Detail window / byte budget for the PREVIOUS ACTIONS section
+        self.history_options = history_options(self.config)
+
+        # State delta encoding: one full baseline per goal, then only what changed
+        delta_config = self.config.get('planner', {}).get('state_delta', {})
+        self.state_delta_enabled = delta_config.get('enabled', True)
+        self.state_encoder = SnapshotDeltaEncoder(
+            resync_every=delta_config.get('resync_every', 5),
+            max_delta_ratio=delta_config.get('max_delta_ratio', 0.5)
+        )
+
+        # Verified plans are replayed for repeated goal/state/history combinations
+        cache_config = self.config.get('planner', {}).get('plan_cache', {})
+        self.plan_cache = None
+        if cache_config.get('enabled', True):
+            self.plan_cache = PlanCache(
+                db_path=self.config.get('system', {}).get('db_path', "d:/Ceaser-AI/openclaw/memory.db"),
+                max_entries=cache_config.get('max_entries', 256),
+                ttl_seconds=cache_config.get('ttl_hours', 168) * 3600
+            )
+
+        # Goal decompositions are memoized on disk per (model, normalized goal)
+        decomposition_config = self.config.get('planner', {}).get('decomposition_cache', {})
+        self.decomposition_cache = None
+        if decomposition_config.get('enabled', True):
+            self.decomposition_cache = PersistentLRUCache(
+                db_path=self.config.get('system', {}).get('db_path', "d:/Ceaser-AI/openclaw/memory.db"),
+                table="goal_decompositions",
+                max_entries=decomposition_config.get('max_entries', 512)
+            )
+
+        # Hedged requests: a slow primary model gets raced against the next one
+        hedging_config = self.config.get('planner', {}).get('hedging', {})
+        self.model_racer = HedgedModelRacer(
+            max_in_flight=hedging_config.get('max_in_flight', 2) if hedging_config.get('enabled', True) else 1,
+            percentile=hedging_config.get('percentile', 90),
+            initial_delay_ms=hedging_config.get('initial_delay_ms', 1500),
+            min_delay_ms=hedging_config.get('min_delay_ms', 250),
+            max_delay_ms=hedging_config.get('max_delay_ms', 6000)
+        )
+        self.last_model = None
+
+        # Streaming: action + parameters are handed out before the model finishes "thought"
+        self.streaming_enabled = self.config.get('planner', {}).get('streaming', {}).get('enabled', True)
+
+        # Batching: one call may return several actions, each with a post-condition checkpoint
+        batching_config = self.config.get('planner', {}).get('batching', {})
+        self.batch_max_actions = max(1, batching_config.get('max_actions', 5)) if batching_config.get('enabled', True) else 1
+
+        # Pipelining: the Agent requests the next plan while the current step is being verified
+        self.pipelining_enabled = self.config.get('planner', {}).get('pipelining', {}).get('enabled', True)
+
+        # Rate limits, back-off and circuit breakers, shared process-wide
+        self.scheduler = get_model_scheduler(self.config)
+        # Fallback models in order of preference
+        self.models = [
+            self.config['llm']['groq']['planner_model'], # Primary (e.g. llama-3.3-70b)
+            "llama-3.1-70b-versatile",                   # Backup 1 (High reasoning)
+            "llama-3.1-8b-instant",                      # Backup 2 (Super fast)
+            "gemma2-9b-it"                               # Backup 3 (Google's model on Groq)
+        ]
+
+        # Goal-relevance ranking caps how much of the desktop goes into the prompt
+        relevance_config = self.config.get('planner', {}).get('relevance', {})
+        self.ranker = None
+        if relevance_config.get('enabled', True):
+            self.ranker = RelevanceRanker(
+                max_windows=relevance_config.get('max_windows', 8),
+                max_controls_per_window=relevance_config.get('max_controls_per_window', 15),
+                token_budget=relevance_config.get('token_budget', 1500),
+                max_installed_apps=relevance_config.get('max_installed_apps', 20)
+            )
         
         # Load Action Schemas from Registry
         self.registry = ActionRegistry()
@@ -62,9 +162,36 @@ class GroqPlanner:
             SendMessageAction, WriteFileAction, DelegateAction
         ]
         self.action_schemas = [cls.to_schema() for cls in self.action_classes]
+        # Static prompt prefix (schemas, instructions) is serialized once, here
+        self.prompt_builder = PromptBuilder(self.action_schemas, self.batch_max_actions)
+        self.last_prompt_report = None
+
+        # Rule-based fast path for simple single-intent goals (no LLM call)
+        fast_path_config = self.config.get('planner', {}).get('fast_path', {})
+        self.fast_path = None
+        if fast_path_config.get('enabled', True):
+            # App names are checked against installed apps (app_index), processes and open windows
+            self.fast_path = FastPathPlanner(self.action_classes, min_confidence=fast_path_config.get('min_confidence', 0.9),
+                                             app_resolver=AppResolver(app_index=app_index))
+
+    @property
+    def client(self):
+        """The Groq client, created on first use (None in mock mode)."""
+        if self._client is None and self._client_options is not None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = groq.Groq(api_key=self.api_key, **self._client_options)
+        return self._client
 
     def _decompose_goal(self, goal):
         """Breaks down a high-level goal into logical sub-steps using LLM."""
+        cache_key = f"{self.config['llm']['groq']['planner_model']}|{normalize_goal(goal)}"
+        if self.decomposition_cache:
+            cached = self.decomposition_cache.get(cache_key)
+            if cached:
+                logger.info(f"Decomposition cache hit ({self.decomposition_cache.stats()})")
+                return cached
+
         logger.info(f"Decomposing high-level goal: {goal}")
         prompt = f"""
 GOAL: {goal}
@@ -80,36 +207,72 @@ Examples:
 Return ONLY a valid JSON list of strings.
 Example: ["Step 1", "Step 2", "Step 3"]
 """
+        messages = [{"role": "user", "content": prompt}]
+        healthy = self.scheduler.route(self.models, estimate_tokens(messages))
+        if not healthy:
+            logger.warning("All planner models are throttled. Skipping decomposition.")
+            return [goal]
+        model = healthy[0]
         try:
-            completion = self.client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model=self.config['llm']['groq']['planner_model'],
+            completion = self.scheduler.call(model, lambda: self.client.chat.completions.create(
+                messages=messages,
+                model=model,
                 response_format={"type": "json_object"}
-            )
+            ), estimate_tokens(messages))
             # The model might return {"steps": [...]} or just [...] depending on training
             # Let's ask for an object to be safe
             content = completion.choices[0].message.content
             data = json.loads(content)
             if isinstance(data, list):
-                return data
+                steps = data
             elif "steps" in data:
-                return data["steps"]
+                steps = data["steps"]
             else:
                 # Fallback
                 return [goal]
+            if self.decomposition_cache:
+                self.decomposition_cache.put(cache_key, steps)
+            return steps
         except Exception as e:
             logger.error(f"Decomposition failed: {e}")
             return [goal] # Fallback to single step
 
-    def plan(self, goal, current_state, history=None):
-        if not self.client:
-            logger.info("Generating mock plan (no API key)...")
-            return self._mock_plan(goal, current_state)
-
+    def plan(self, goal, current_state, history=None, on_partial=None, speculative=False):
+        """
+        Returns the next action plan. With streaming enabled, on_partial (if
+        given) is called once with {"action", "parameters"} as soon as both
+        are complete, while the rest of the response is still arriving. The
+        returned plan always carries that same action and parameters.
+        A `speculative` plan is cached separately until adopt_speculative_plan().
+        """
         # --- SUB-PLANNING LOGIC ---
         # If the goal has changed significantly, reset the sub-plan
         if goal != self.current_goal:
             self.current_goal = goal
+            self.state_encoder.reset()
+            # Decomposed lazily, only once we actually need the LLM
+            self.sub_plan = None
+
+        # --- FAST PATH ---
+        if self.fast_path:
+            fast_plan = self.fast_path.plan(goal, history)
+            if fast_plan:
+                return fast_plan
+
+        if not self.client:
+            logger.info("Generating mock plan (no API key)...")
+            return self._mock_plan(goal, current_state)
+
+        # --- PLAN CACHE ---
+        cache_key = None
+        if self.plan_cache:
+            cache_key = self.plan_cache.make_key(goal, current_state, history)
+            cached_plan = self.plan_cache.lookup(cache_key, speculative)
+            if cached_plan:
+                logger.info(f"Plan cache hit: {cached_plan.get('action')} (skipping LLM)")
+                return cached_plan
+
+        if self.sub_plan is None:
             # Heuristic: If goal is short (< 5 words) and ambiguous, try to decompose
             # Or if it contains keywords like "notes", "project", "research"
             if len(goal.split()) < 10 or "notes" in goal.lower() or "class" in goal.lower():
@@ -122,13 +285,10 @@ Example: ["Step 1", "Step 2", "Step 3"]
         
         history_str = ""
         if history:
-            history_str = "PREVIOUS ACTIONS:\n"
-            for i, step in enumerate(history[-5:]): # Last 5 steps
-                # FIX: Handle inconsistent history structure
-                plan = step.get("plan") or step.get("log", {}).get("plan", {})
-                action = plan.get("action", "unknown")
-                status = step.get("status", "unknown")
-                history_str += f"{i+1}. {action} -> {status}\n"
+            if not isinstance(history, RollingHistory):
+                # Plain step lists (older callers) get the same rolling summary and byte budget
+                history = RollingHistory(history, **self.history_options)
+            history_str = history.render(self.sub_plan)
         
         # Check history for duplicate actions to prevent loops
         if history:
@@ -142,96 +302,156 @@ Example: ["Step 1", "Step 2", "Step 3"]
                   # Append instruction to strongly encourage finishing if it looks like we just did the main task
                   history_str += "\nNOTE: The last action was successful. If this completed the user's request, you MUST output {'action': 'done'}."
 
-        # Inject Sub-Plan context
-        sub_plan_str = "STRATEGIC WORKFLOW (Follow this guide):\n"
-        for i, step in enumerate(self.sub_plan):
-            sub_plan_str += f"{i+1}. {step}\n"
+        # Drop windows/controls that have nothing to do with the goal
+        omitted_str = ""
+        if self.ranker:
+            current_state, relevance = self.ranker.prune(goal, self.sub_plan, current_state)
+            dropped = relevance["dropped_windows"]
+            if dropped or relevance["dropped_controls"]:
+                logger.info(f"Relevance ranking dropped {len(dropped)} windows and "
+                            f"{relevance['dropped_controls']} controls ({relevance['elapsed_ms']} ms)")
+                omitted_str = (f"\n(Omitted as not relevant to the goal: {len(dropped)} windows "
+                               f"{dropped[:10]}, {relevance['dropped_controls']} controls.)")
 
-        # Serialize schemas for prompt
-        schemas_str = json.dumps(self.action_schemas, indent=2)
-
-        prompt = f"""
-GOAL: {goal}
-
-{sub_plan_str}
-
-{history_str}
+        # Current state: full snapshot, or changes against this goal's baseline
+        baseline_json = None
+        if self.state_delta_enabled:
+            baseline_json, delta, resynced = self.state_encoder.encode(current_state)
+            if resynced:
+                state_str = "Identical to BASELINE STATE (captured this step)."
+            elif not delta:
+                state_str = "No changes since BASELINE STATE."
+            else:
+                state_str = f"CHANGES SINCE BASELINE STATE:\n{json.dumps(delta, separators=(',', ':'))}"
+        else:
+            state_str = dumps_state(current_state)
 
-CURRENT STATE:
-{json.dumps(current_state, indent=2)}
+        # Stable prefix first (system + schemas + notes), then goal, baseline, and this step
+        messages, self.last_prompt_report = self.prompt_builder.build(
+            goal, self.sub_plan, history_str, state_str + omitted_str, baseline_json
+        )
+        logger.debug(f"Prompt sections (est. tokens): {self.last_prompt_report['sections']}")
+        prompt_tokens = self.last_prompt_report["total_tokens"]
 
-AVAILABLE ACTIONS (Strict Schema):
-{schemas_str}
+        # Healthiest models first; throttled or circuit-broken ones are skipped
+        models_to_try = self.scheduler.route(self.models, prompt_tokens)
+        if not models_to_try:
+            wait_s = self.scheduler.next_available_in(self.models, prompt_tokens)
+            logger.error(f"All models throttled or unhealthy. Next one available in {wait_s:.1f}s.")
+            return {"action": "wait", "target": "Rate limit fallback failed"}
 
-INSTRUCTIONS:
-You are an autonomous desktop agent. Based on the goal, previous actions, and current state, determine the next best action.
-CRITICAL: If the goal has been fully achieved based on the PREVIOUS ACTIONS (e.g., message sent, file written), you MUST return action "done". DO NOT REPEAT COMPLETED ACTIONS.
-
-You MUST return a valid JSON object matching this structure:
-{{
-  "action": "action_name_from_schema",
-  "parameters": {{
-    "param_name": "value"
-  }},
-  "thought": "Reasoning for this action",
-  "confidence": 0.0-1.0
-}}
-
-Example:
-{{
-  "action": "open_app",
-  "parameters": {{
-    "app_name": "Notepad"
-  }},
-  "thought": "Opening Notepad to write the file.",
-  "confidence": 0.95
-}}
-
-Usage Notes:
-- write_file: PREFER THIS for "write code" requests.
-- run_command: Use "code <filename>" to open VS Code.
-- done: When goal is complete. Use action "done" with parameters {{}}.
+        # Which racing model's plan was taken (by early dispatch or by finishing first)
+        race = {"lock": threading.Lock(), "claimed_by": None}
 
-"""
-        
-        # Define fallback models in order of preference
-        models_to_try = [
-            self.config['llm']['groq']['planner_model'], # Primary (e.g. llama-3.3-70b)
-            "llama-3.1-70b-versatile",                   # Backup 1 (High reasoning)
-            "llama-3.1-8b-instant",                      # Backup 2 (Super fast)
-            "gemma2-9b-it"                               # Backup 3 (Google's model on Groq)
-        ]
-
-        for model in models_to_try:
+        def request_plan(model):
             try:
                 logger.info(f"Attempting planning with model: {model}")
-                completion = self.client.chat.completions.create(
-                    messages=[
-                        {"role": "system", "content": "You are a helpful desktop assistant that outputs structured JSON."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    model=model,
-                    response_format={"type": "json_object"}
-                )
-                
-                response_content = completion.choices[0].message.content
-                logger.debug(f"Planner response: {response_content}")
-                return json.loads(response_content)
-                
-            except Exception as e:
-                # Check for Rate Limit Error (429)
-                error_msg = str(e).lower()
-                if "429" in error_msg or "rate limit" in error_msg:
-                    logger.warning(f"Rate limit hit for model {model}. Switching to next available model...")
-                    continue # Try next model
+                if self.streaming_enabled:
+                    result = self._stream_plan(model, messages, prompt_tokens, race, on_partial)
                 else:
+                    completion = self.scheduler.call(model, lambda: self.client.chat.completions.create(
+                        messages=messages,
+                        model=model,
+                        response_format={"type": "json_object"}
+                    ), prompt_tokens)
+                    response_content = completion.choices[0].message.content
+                    logger.debug(f"Planner response ({model}): {response_content}")
+                    result = json.loads(response_content)
+                if not isinstance(result, dict) or "action" not in result:
+                    raise ValueError(f"Response is not a plan: {str(result)[:200]}")
+                return result
+            except StreamAbandoned:
+                raise
+            except Exception as e:
+                # Rate limits are logged (and backed off) by the scheduler
+                if not is_rate_limit(e):
                     logger.error(f"Error during planning with {model}: {e}")
-                    # If it's not a rate limit (e.g. auth error, bad request), we might still want to try another model 
-                    # OR fail fast. For robustness, let's try the next one if it's a server error.
+                raise
+
+        # Any failure (rate limit, server error, invalid JSON) moves on to the next model
+        result, model = self.model_racer.race(models_to_try, request_plan)
+        if result is None:
+            logger.error("All models failed or rate limited.")
+            return {"action": "wait", "target": "Rate limit fallback failed"}
+
+        self.last_model = model
+        logger.info(f"Plan produced by {model} (race stats: {self.model_racer.stats()})")
+        if self.plan_cache:
+            self.plan_cache.stage(cache_key, result, speculative)
+        return result
+
+    def _stream_plan(self, model, messages, prompt_tokens, race, on_partial):
+        """
+        Streams one model's plan through an incremental parser. The first
+        racing stream to complete action + parameters claims the race (and
+        fires on_partial); the others stop reading and close their stream.
+        """
+        # Groq's JSON mode can't be combined with streaming; the prompt asks for
+        # JSON and the parser skips anything before the opening brace.
+        stream = self.scheduler.call(model, lambda: self.client.chat.completions.create(
+            messages=messages,
+            model=model,
+            stream=True
+        ), prompt_tokens)
+        parser = IncrementalJSONObjectParser()
+
+        def claim():
+            with race["lock"]:
+                if race["claimed_by"] is None:
+                    race["claimed_by"] = model
+                return race["claimed_by"] == model
+
+        try:
+            for chunk in stream:
+                if race["claimed_by"] not in (None, model):
+                    raise StreamAbandoned(f"{model} lost the race to {race['claimed_by']}")
+                content = chunk.choices[0].delta.content if chunk.choices else None
+                if not content:
                     continue
+                completed = parser.feed(content)
+                early = on_partial and race["claimed_by"] != model and "action" in parser.members and "parameters" in parser.members
+                if early and ("action" in completed or "parameters" in completed):
+                    if not claim():
+                        raise StreamAbandoned(f"{model} lost the race to {race['claimed_by']}")
+                    partial = {"action": parser.members["action"], "parameters": parser.members["parameters"]}
+                    logger.info(f"Early dispatch of '{partial['action']}' from {model} (still streaming)")
+                    on_partial(partial)
+                if parser.complete:
+                    break
+        except StreamAbandoned:
+            raise
+        except Exception as e:
+            if race["claimed_by"] != model:
+                raise
+            # The action is already running; finish with what we have
+            logger.warning(f"Stream from {model} failed after early dispatch: {e}")
+        finally:
+            stream.close()
+
+        logger.debug(f"Planner response ({model}, streamed): {parser.text}")
+        if not parser.complete and race["claimed_by"] != model:
+            raise ValueError(f"Incomplete JSON plan from {model}: {parser.text[:200]}")
+        if not claim():
+            raise StreamAbandoned(f"{model} finished after {race['claimed_by']} was taken")
+        return parser.members
+
+    def record_outcome(self, plan, verified):
+        """Tells the plan cache whether the last plan verified; only verified plans are served later."""
+        if self.plan_cache:
+            self.plan_cache.record_outcome(plan, verified)
+
+    def adopt_speculative_plan(self):
+        """The Agent is executing the speculative plan; record_outcome() now applies to it."""
+        if self.plan_cache:
+            self.plan_cache.adopt_speculative()
+
+    def discard_speculative_plan(self):
+        if self.plan_cache:
+            self.plan_cache.discard_speculative()
 
-        logger.error("All models failed or rate limited.")
-        return {"action": "wait", "target": "Rate limit fallback failed"}
+    def request_state_resync(self):
+        """Sends a full state snapshot (new baseline) on the next planning call."""
+        self.state_encoder.request_resync()
 
     def _mock_plan(self, goal, current_state):
         # Simple heuristic fallback for testing without API key
@@ -0,0 +1,113 @@
+import os
+import sys
+import math
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.logger import logger
+
+class RaceWithdrawn(Exception):
+    """Raised by a call that stepped aside because another in-flight call has already won."""
+
+class HedgedModelRacer:
+    """
+    Hedged requests across an ordered list of models. The first model is called
+    right away; if it has not answered after its hedge delay (a percentile of
+    its recent latencies) the next model is fired in parallel, and so on. A
+    failed call fires the next model immediately. The first valid result wins,
+    queued calls are cancelled and in-flight ones are abandoned (their results
+    are discarded when they eventually return).
+    """
+
+    def __init__(self, max_in_flight=2, percentile=90, initial_delay_ms=1500,
+                 min_delay_ms=250, max_delay_ms=6000, window=50, max_workers=8):
+        self.max_in_flight = max(1, max_in_flight)
+        self.percentile = percentile
+        self.initial_delay_ms = initial_delay_ms
+        self.min_delay_ms = min_delay_ms
+        self.max_delay_ms = max_delay_ms
+        self.window = window
+        self.wins = Counter()
+        self.hedges = 0
+        self.last_winner = None
+        self._latencies = {}  # model -> deque of successful call latencies (ms)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="model-race")
+
+    def hedge_delay_ms(self, model):
+        """Nearest-rank percentile of the model's recent latencies, clamped."""
+        with self._lock:
+            samples = sorted(self._latencies.get(model, ()))
+        if not samples:
+            return self.initial_delay_ms
+        rank = max(1, math.ceil(self.percentile / 100.0 * len(samples)))
+        return min(self.max_delay_ms, max(self.min_delay_ms, samples[rank - 1]))
+
+    def _record_latency(self, model, ms):
+        with self._lock:
+            self._latencies.setdefault(model, deque(maxlen=self.window)).append(ms)
+
+    def race(self, models, call):
+        """
+        Runs call(model) with hedging. call must return a valid result or raise.
+        Returns (result, winning_model), or (None, None) if every model failed.
+        """
+        queue = list(models)
+        pending = {}  # future -> (model, started_at)
+        hedge_at = None
+
+        def launch():
+            model = queue.pop(0)
+            pending[self._pool.submit(call, model)] = (model, time.perf_counter())
+            return time.perf_counter() + self.hedge_delay_ms(model) / 1000.0
+
+        while queue or pending:
+            if queue and (not pending or (len(pending) < self.max_in_flight and time.perf_counter() >= hedge_at)):
+                if pending:
+                    self.hedges += 1
+                    logger.info(f"No answer after hedge delay. Also trying {queue[0]}...")
+                hedge_at = launch()
+                continue
+
+            timeout = None
+            if queue and len(pending) < self.max_in_flight:
+                timeout = max(0.0, hedge_at - time.perf_counter())
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                model, started_at = pending.pop(future)
+                try:
+                    result = future.result()
+                except RaceWithdrawn as e:
+                    # The winner is still in flight; stop launching replacements
+                    logger.debug(f"Model {model} withdrew: {e}")
+                    queue.clear()
+                    continue
+                except Exception as e:
+                    logger.debug(f"Model {model} failed: {e}")
+                    # Don't wait out the hedge delay after a hard failure
+                    hedge_at = time.perf_counter()
+                    continue
+                self._record_latency(model, (time.perf_counter() - started_at) * 1000)
+                for loser in pending:
+                    loser.cancel()
+                self.wins[model] += 1
+                self.last_winner = model
+                return result, model
+
+        return None, None
+
+    def stats(self):
+        return {
+            "wins": dict(self.wins),
+            "hedges": self.hedges,
+            "delays_ms": {model: round(self.hedge_delay_ms(model), 1) for model in list(self._latencies)}
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
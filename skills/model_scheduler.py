@@ -0,0 +1,247 @@
+import os
+import sys
+import threading
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.logger import logger
+
+class TokenBucket:
+    """Classic token bucket: `capacity` units, refilled continuously at `per_minute`."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = float(per_minute) / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, amount, now):
+        self._refill(now)
+        self.tokens -= amount  # may go negative; the debt is repaid by refill
+
+    def wait_time(self, amount, now):
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate) if self.rate else float("inf")
+
+class ModelState:
+    """Budgets, back-off and health of one model."""
+
+    def __init__(self, rpm, tpm):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.blocked_until = 0.0  # from retry-after
+        # closed -> open -> (cool-down over) half_open -> (trial call) probing -> closed/open
+        self.circuit = "closed"
+        self.circuit_until = 0.0
+        self.consecutive_failures = 0
+        self.latency_ms = None  # EWMA of successful calls
+        self.successes = 0
+        self.failures = 0
+        self.rate_limited = 0
+
+def is_rate_limit(error):
+    if getattr(error, "status_code", None) == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message
+
+def retry_after_seconds(error):
+    """Reads retry-after from the HTTP response attached to SDK errors, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+class ModelScheduler:
+    """
+    Per-model request/token budgets, retry-after back-off and a circuit
+    breaker, shared by everything that calls the LLM. `route()` orders the
+    candidate models by health so callers try the best one first instead of
+    re-hitting a model that was throttled a moment ago.
+    """
+
+    def __init__(self, limits=None, default_rpm=30, default_tpm=6000, failure_threshold=3,
+                 cooldown_seconds=30.0, default_retry_after=5.0, latency_target_ms=None, smoothing=0.3):
+        self.limits = dict(limits or {})
+        self.default_rpm = default_rpm
+        self.default_tpm = default_tpm
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.default_retry_after = default_retry_after
+        self.latency_target_ms = latency_target_ms
+        self.smoothing = smoothing
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def _state(self, model):
+        state = self._models.get(model)
+        if state is None:
+            limits = self.limits.get(model, {})
+            state = ModelState(limits.get("rpm", self.default_rpm), limits.get("tpm", self.default_tpm))
+            self._models[model] = state
+        return state
+
+    def _wait_time(self, state, tokens, now):
+        """Seconds until the model can take this call (0 = now)."""
+        waits = [state.blocked_until - now, state.requests.wait_time(1, now), state.tokens.wait_time(tokens, now)]
+        if state.circuit == "open":
+            waits.append(state.circuit_until - now)
+        elif state.circuit == "probing":
+            return float("inf")  # the trial call is still in flight
+        return max(0.0, *waits)
+
+    def route(self, models, estimated_tokens=0, latency_target_ms=None):
+        """
+        Models that can be called right now, best first: those whose latency
+        fits the target, then fewer recent failures, then caller preference.
+        """
+        target = latency_target_ms or self.latency_target_ms
+        now = time.monotonic()
+        ranked = []
+        with self._lock:
+            for index, model in enumerate(models):
+                state = self._state(model)
+                if state.circuit == "open" and now >= state.circuit_until:
+                    state.circuit = "half_open"
+                if state.circuit == "half_open":
+                    # Cool-down over: allow a single trial call
+                    wait = max(0.0, state.blocked_until - now)
+                else:
+                    wait = self._wait_time(state, estimated_tokens, now)
+                if wait > 0:
+                    continue
+                too_slow = bool(target and state.latency_ms and state.latency_ms > target)
+                ranked.append((too_slow, state.consecutive_failures, index, model))
+        ranked.sort()
+        order = [model for _, _, _, model in ranked]
+        skipped = [m for m in models if m not in order]
+        if skipped:
+            logger.debug(f"Scheduler skipping throttled/unhealthy models: {skipped}")
+        return order
+
+    def next_available_in(self, models, estimated_tokens=0):
+        """Seconds until the first of `models` becomes callable."""
+        now = time.monotonic()
+        with self._lock:
+            waits = [self._wait_time(self._state(m), estimated_tokens, now) for m in models]
+        return min(waits) if waits else 0.0
+
+    def acquire(self, model, estimated_tokens=0):
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(model)
+            if state.circuit == "half_open":
+                state.circuit = "probing"
+            state.requests.take(1, now)
+            state.tokens.take(estimated_tokens, now)
+
+    def record_success(self, model, latency_ms, estimated_tokens=0, used_tokens=None):
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(model)
+            if used_tokens is not None:
+                # Settle the estimate against what the API actually billed
+                state.tokens.take(used_tokens - estimated_tokens, now)
+            state.successes += 1
+            state.consecutive_failures = 0
+            if state.circuit != "closed":
+                logger.info(f"Circuit for {model} closed again.")
+            state.circuit = "closed"
+            if state.latency_ms is None:
+                state.latency_ms = latency_ms
+            else:
+                state.latency_ms += self.smoothing * (latency_ms - state.latency_ms)
+
+    def record_failure(self, model, error):
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(model)
+            state.failures += 1
+            if is_rate_limit(error):
+                state.rate_limited += 1
+                wait = retry_after_seconds(error) or self.default_retry_after
+                state.blocked_until = max(state.blocked_until, now + wait)
+                if state.circuit == "probing":
+                    state.circuit = "open"
+                    state.circuit_until = state.blocked_until
+                logger.warning(f"{model} rate limited. Backing off for {wait:.1f}s.")
+                return
+            state.consecutive_failures += 1
+            if state.circuit == "probing" or state.consecutive_failures >= self.failure_threshold:
+                state.circuit = "open"
+                state.circuit_until = now + self.cooldown_seconds
+                logger.warning(f"Circuit for {model} opened after {state.consecutive_failures} failures "
+                               f"({self.cooldown_seconds:.0f}s cool-down).")
+
+    def call(self, model, fn, estimated_tokens=0):
+        """Runs fn() as a call to `model`, keeping budgets and health up to date."""
+        self.acquire(model, estimated_tokens)
+        start = time.perf_counter()
+        try:
+            completion = fn()
+        except Exception as e:
+            self.record_failure(model, e)
+            raise
+        usage = getattr(completion, "usage", None)
+        self.record_success(
+            model,
+            (time.perf_counter() - start) * 1000,
+            estimated_tokens,
+            getattr(usage, "total_tokens", None)
+        )
+        return completion
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                model: {
+                    "circuit": state.circuit,
+                    "blocked_for_s": round(max(0.0, state.blocked_until - now), 1),
+                    "latency_ms": round(state.latency_ms, 1) if state.latency_ms is not None else None,
+                    "successes": state.successes,
+                    "failures": state.failures,
+                    "rate_limited": state.rate_limited
+                }
+                for model, state in self._models.items()
+            }
+
+def estimate_tokens(messages, chars_per_token=4):
+    return sum(len(str(m.get("content", ""))) for m in messages) // chars_per_token
+
+_shared_scheduler = None
+_shared_lock = threading.Lock()
+
+def get_model_scheduler(config=None):
+    """Process-wide ModelScheduler, configured from planner.scheduler on first use."""
+    global _shared_scheduler
+    with _shared_lock:
+        if _shared_scheduler is None:
+            settings = ((config or {}).get('planner', {}) or {}).get('scheduler', {}) or {}
+            default_limits = settings.get('default_limits', {})
+            _shared_scheduler = ModelScheduler(
+                limits=settings.get('models', {}),
+                default_rpm=default_limits.get('rpm', 30),
+                default_tpm=default_limits.get('tpm', 6000),
+                failure_threshold=settings.get('failure_threshold', 3),
+                cooldown_seconds=settings.get('cooldown_seconds', 30),
+                default_retry_after=settings.get('default_retry_after_seconds', 5),
+                latency_target_ms=settings.get('latency_target_ms')
+            )
+        return _shared_scheduler
+
+def reset_model_scheduler():
+    """Drops the shared scheduler (benchmarks run several independent configurations)."""
+    global _shared_scheduler
+    with _shared_lock:
+        _shared_scheduler = None
@@ -0,0 +1,50 @@
+import threading
+import time
+
+class WindowCache:
+    """
+    Persistent per-window cache for StructuredPerception.
+    Each entry is keyed by the window's native handle and stores the WindowInfo
+    built on the last read together with the signature (title, child count, scan
+    mode) it was built from. A window is only re-read when its signature changes
+    or, if the caller passes max_age, when the entry is older than that.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, key, signature, max_age=None):
+        """Returns the cached window info if the signature still matches, else None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry["signature"] == signature:
+                if max_age is None or time.monotonic() - entry["stored_at"] <= max_age:
+                    return entry["info"]
+        return None
+
+    def peek(self, key):
+        """Returns the cached window info regardless of signature, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry["info"] if entry else None
+
+    def store(self, key, signature, info):
+        with self._lock:
+            self._entries[key] = {"signature": signature, "info": info, "stored_at": time.monotonic()}
+
+    def prune(self, live_keys):
+        """Drops entries for windows that no longer exist. Returns the removed titles."""
+        removed = []
+        with self._lock:
+            for key in list(self._entries):
+                if key not in live_keys:
+                    removed.append(self._entries.pop(key)["info"].title)
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,113 @@
+import copy
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.logger import logger
+from utils.persistent_cache import PersistentLRUCache
+
+def normalize_goal(goal):
+    """Case, whitespace and punctuation folded: "Open  Notepad!" -> "open notepad"."""
+    goal = re.sub(r"[^\w\s]", " ", str(goal or "").lower())
+    return " ".join(goal.split())
+
+def _app_of_title(title):
+    # Window titles usually end with the application name ("notes.txt - Notepad").
+    # Keep only that part so the fingerprint ignores document names and counters.
+    title = str(title or "").lower()
+    app = title.rsplit(" - ", 1)[-1]
+    return re.sub(r"\d+", "#", app).strip()
+
+def state_fingerprint(state):
+    """Stable digest of the perception fields that matter for planning."""
+    if not state or state.get("error"):
+        return "error"
+    focused = (state.get("system", {}) or {}).get("focused_app")
+    apps = sorted({_app_of_title(w.get("title")) for w in state.get("open_windows", []) or []})
+    payload = {"focused": _app_of_title(focused), "apps": apps}
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+def history_fingerprint(history, depth=3):
+    """The last `depth` actions with their parameters and outcome."""
+    recent = []
+    for step in list(history or [])[-depth:]:
+        plan = step.get("plan") or step.get("log", {}).get("plan", {}) or {}
+        recent.append([
+            plan.get("action"),
+            plan.get("parameters") or plan.get("target"),
+            step.get("status")
+        ])
+    return hashlib.sha1(json.dumps(recent, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+class PlanCache:
+    """
+    Persistent plan cache keyed by (normalized goal, state fingerprint, recent
+    history). Freshly generated plans are only staged; they become servable once
+    the Agent reports that they verified successfully. A cached plan that fails
+    verification is evicted. A plan requested speculatively (for the next step,
+    while the current one is still being verified) is staged in its own slot
+    and only takes over once the Agent adopts it.
+    """
+
+    def __init__(self, db_path, max_entries=256, ttl_seconds=7 * 24 * 3600, history_depth=3):
+        self.history_depth = history_depth
+        self.store = PersistentLRUCache(db_path, "plan_cache", max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._staged = None  # (key, plan, served_from_cache)
+        self._speculative = None  # same, for a plan the Agent has not adopted yet
+        self._lock = threading.Lock()
+
+    def make_key(self, goal, state, history):
+        return "|".join([
+            normalize_goal(goal),
+            state_fingerprint(state),
+            history_fingerprint(history, self.history_depth)
+        ])
+
+    def lookup(self, key, speculative=False):
+        plan = self.store.get(key)
+        if plan is None:
+            return None
+        self._set_staged((key, plan, True), speculative)
+        return copy.deepcopy(plan)
+
+    def stage(self, key, plan, speculative=False):
+        """Remembers a freshly generated plan until its outcome is known."""
+        self._set_staged((key, copy.deepcopy(plan), False), speculative)
+
+    def _set_staged(self, entry, speculative):
+        with self._lock:
+            if speculative:
+                self._speculative = entry
+            else:
+                self._staged = entry
+
+    def adopt_speculative(self):
+        """The speculative plan is being executed; its outcome is the next one recorded."""
+        with self._lock:
+            if self._speculative:
+                self._staged, self._speculative = self._speculative, None
+
+    def discard_speculative(self):
+        with self._lock:
+            self._speculative = None
+
+    def record_outcome(self, plan, verified):
+        with self._lock:
+            staged, self._staged = self._staged, None
+        if not staged:
+            return
+        key, staged_plan, served_from_cache = staged
+        if staged_plan.get("action") != (plan or {}).get("action"):
+            return
+        if verified and not served_from_cache:
+            self.store.put(key, staged_plan)
+            logger.debug(f"Cached verified plan for key {key[:40]}...")
+        elif not verified and served_from_cache:
+            logger.info("Cached plan failed verification. Evicting it.")
+            self.store.delete(key)
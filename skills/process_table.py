@@ -0,0 +1,157 @@
+import bisect
+import threading
+import time
+import logging
+from utils.lazy_import import lazy_import
+
+psutil = lazy_import("psutil")  # imported on the first refresh
+
+# Friendly app names -> executable names (without .exe)
+DEFAULT_ALIASES = {
+    "google chrome": ["chrome"],
+    "microsoft edge": ["msedge"],
+    "edge": ["msedge"],
+    "vs code": ["code"],
+    "vscode": ["code"],
+    "visual studio code": ["code"],
+    "word": ["winword"],
+    "microsoft word": ["winword"],
+    "powerpoint": ["powerpnt"],
+    "file explorer": ["explorer"],
+    "calculator": ["calculatorapp", "calc"],
+    "teams": ["ms-teams", "teams"],
+    "task manager": ["taskmgr"],
+    "command prompt": ["cmd"],
+    "terminal": ["windowsterminal", "wt"],
+}
+
+def normalize_name(name):
+    name = (name or "").strip().lower()
+    if name.endswith(".exe"):
+        name = name[:-4]
+    return name
+
+class ProcessTable:
+    """
+    Shared name -> PIDs index of running processes.
+    Entries are keyed on (pid, create time), so a PID the OS hands to a new
+    process counts as a new process rather than keeping the old name. A
+    refresh reads each PID's creation time (cheap) and only reads names for
+    new keys; exited ones are dropped. Refreshes are rate-limited to
+    `refresh_interval` seconds unless forced.
+    """
+
+    def __init__(self, refresh_interval=0.5, aliases=None, logger=None):
+        self.refresh_interval = refresh_interval
+        self.aliases = dict(DEFAULT_ALIASES)
+        self.aliases.update(aliases or {})
+        self.logger = logger or logging.getLogger(__name__)
+        self._entries = {}  # pid -> (create time, normalized name)
+        self._index = {}  # normalized name -> set of pids
+        self._sorted_names = []
+        self._sorted_dirty = False
+        self._last_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self, force=False):
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._last_refresh and now - self._last_refresh < self.refresh_interval:
+                return
+            self._last_refresh = now
+
+            current = set(psutil.pids())
+            for pid in set(self._entries) - current:
+                self._remove(pid)
+            for pid in current:
+                try:
+                    process = psutil.Process(pid)
+                    created = process.create_time()
+                    entry = self._entries.get(pid)
+                    if entry is not None and entry[0] == created:
+                        continue
+                    name = normalize_name(process.name())
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    self._remove(pid)
+                    continue
+                self._remove(pid)  # a reused PID: forget the process that had it
+                self._entries[pid] = (created, name)
+                pids = self._index.setdefault(name, set())
+                if not pids:
+                    self._sorted_dirty = True
+                pids.add(pid)
+
+    def _remove(self, pid):
+        entry = self._entries.pop(pid, None)
+        if entry is None:
+            return
+        name = entry[1]
+        pids = self._index.get(name)
+        if pids:
+            pids.discard(pid)
+            if not pids:
+                del self._index[name]
+                self._sorted_dirty = True
+
+    def discard(self, pid):
+        """Forgets a PID we know has exited (e.g. after killing it)."""
+        with self._lock:
+            self._remove(pid)
+
+    # --- Lookups ---
+
+    def find_exact(self, name):
+        with self._lock:
+            return set(self._index.get(normalize_name(name), ()))
+
+    def find_alias(self, name):
+        pids = set()
+        for exe in self.aliases.get(normalize_name(name), ()):
+            pids |= self.find_exact(exe)
+        return pids
+
+    def find_prefix(self, prefix):
+        prefix = normalize_name(prefix)
+        if not prefix:
+            return set()
+        with self._lock:
+            if self._sorted_dirty:
+                self._sorted_names = sorted(self._index)
+                self._sorted_dirty = False
+            pids = set()
+            start = bisect.bisect_left(self._sorted_names, prefix)
+            for name in self._sorted_names[start:]:
+                if not name.startswith(prefix):
+                    break
+                pids |= self._index[name]
+            return pids
+
+    def find(self, name):
+        """Exact executable name, then alias, then prefix match. Returns a set of PIDs."""
+        return self.find_exact(name) or self.find_alias(name) or self.find_prefix(name)
+
+    def is_running(self, name):
+        return bool(self.find(name))
+
+    def matches(self, name, process_name):
+        """True if a process called `process_name` is one `find(name)` would look for."""
+        name, process_name = normalize_name(name), normalize_name(process_name)
+        return (process_name == name or process_name in self.aliases.get(name, ()) or
+                bool(name) and process_name.startswith(name))
+
+    def is_same_process(self, pid, create_time):
+        """True if `pid` is still the process this table indexed (not a reuse of its PID)."""
+        with self._lock:
+            entry = self._entries.get(pid)
+            return entry is not None and entry[0] == create_time
+
+_shared_table = None
+_shared_lock = threading.Lock()
+
+def get_process_table():
+    """Process-wide ProcessTable instance."""
+    global _shared_table
+    with _shared_lock:
+        if _shared_table is None:
+            _shared_table = ProcessTable()
+        return _shared_table
@@ -0,0 +1,110 @@
+import json
+import threading
+from collections import OrderedDict
+
+SYSTEM_ROLE = "You are a helpful desktop assistant that outputs structured JSON."
+
+INSTRUCTIONS = """INSTRUCTIONS:
+You are an autonomous desktop agent. Based on the goal, previous actions, and current state, determine the next best action.
+CRITICAL: If the goal has been fully achieved based on the PREVIOUS ACTIONS (e.g., message sent, file written), you MUST return action "done". DO NOT REPEAT COMPLETED ACTIONS.
+
+You MUST return a valid JSON object matching this structure:
+{"action": "action_name_from_schema", "parameters": {"param_name": "value"}, "thought": "Reasoning for this action", "confidence": 0.0-1.0}
+
+Example:
+{"action": "open_app", "parameters": {"app_name": "Notepad"}, "thought": "Opening Notepad to write the file.", "confidence": 0.95}
+
+Usage Notes:
+- write_file: PREFER THIS for "write code" requests.
+- run_command: Use "code <filename>" to open VS Code.
+- done: When goal is complete. Use action "done" with parameters {}."""
+
+BATCHING_NOTES = """Batching (optional):
+- If you are confident that further actions follow without needing to look at the screen in between (e.g. open an app, then type into it), list them in "next_actions" (at most {max_follow_ups}), in order.
+- Give every action an "expect" object with post-conditions that must hold after it runs: "window_open", "window_closed" and/or "focused" (window title substrings). Execution stops and you are asked again as soon as a check fails.
+- End the batch with {{"action": "done", "parameters": {{}}}} if it completes the goal.
+- Keep "thought" last.
+Example batch for "Open Notepad and type Hello World":
+{{"action": "open_app", "parameters": {{"app_name": "Notepad"}}, "expect": {{"window_open": "Notepad"}}, "next_actions": [{{"action": "type_text", "parameters": {{"text": "Hello World"}}, "expect": {{"focused": "Notepad"}}}}, {{"action": "done", "parameters": {{}}}}], "thought": "Notepad opens reliably, then the text can be typed straight away.", "confidence": 0.9}}"""
+
+class PromptBuilder:
+    """
+    Assembles planner messages with the most stable content first, so
+    provider-side prefix caching can reuse as much as possible:
+
+        system   static prefix: role, action schemas, instructions (built once)
+        user     goal + strategic workflow (stable for the whole goal)
+        user     baseline state, when delta encoding is on (stable until a resync)
+        user     previous actions + current state (changes every step)
+
+    Rendered per-goal sections are memoized, and every build reports an
+    estimated token count per section.
+    """
+
+    def __init__(self, action_schemas, batch_max_actions=1, chars_per_token=4, cache_size=32):
+        self.chars_per_token = chars_per_token
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+        schemas_str = json.dumps(action_schemas, separators=(",", ":"))
+        sections = [SYSTEM_ROLE, f"AVAILABLE ACTIONS (Strict Schema):\n{schemas_str}", INSTRUCTIONS]
+        if batch_max_actions > 1:
+            sections.append(BATCHING_NOTES.format(max_follow_ups=batch_max_actions - 1))
+        self.prefix = "\n\n".join(sections)
+        self.system_message = {"role": "system", "content": self.prefix}
+
+    def tokens(self, text):
+        return len(text) // self.chars_per_token
+
+    def _cached(self, key, render):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+        value = render()
+        with self._lock:
+            self._cache[key] = value
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return value
+
+    def _goal_message(self, goal, sub_plan):
+        def render():
+            workflow = "".join(f"{i+1}. {step}\n" for i, step in enumerate(sub_plan or []))
+            return {"role": "user", "content": f"GOAL: {goal}\n\nSTRATEGIC WORKFLOW (Follow this guide):\n{workflow}"}
+        return self._cached(("goal", goal, tuple(sub_plan or ())), render)
+
+    def _baseline_message(self, baseline_json):
+        return self._cached(("baseline", baseline_json), lambda: {
+            "role": "user",
+            "content": f"BASELINE STATE (full snapshot; later steps report changes against it):\n{baseline_json}"
+        })
+
+    def build(self, goal, sub_plan, history_str, state_str, baseline_json=None):
+        """Returns (messages, report) where report holds per-section token estimates."""
+        goal_message = self._goal_message(goal, sub_plan)
+        step_content = f"{history_str}\nCURRENT STATE:\n{state_str}\n\nReturn the next action as JSON."
+        messages = [self.system_message, goal_message]
+        sections = {
+            "prefix": self.tokens(self.prefix),
+            "goal": self.tokens(goal_message["content"])
+        }
+        if baseline_json is not None:
+            baseline_message = self._baseline_message(baseline_json)
+            messages.append(baseline_message)
+            sections["baseline"] = self.tokens(baseline_message["content"])
+        messages.append({"role": "user", "content": step_content})
+        sections["history"] = self.tokens(history_str)
+        sections["state"] = self.tokens(state_str)
+
+        report = {
+            "sections": sections,
+            "total_tokens": sum(self.tokens(m["content"]) for m in messages),
+            "cache": {"hits": self.hits, "misses": self.misses}
+        }
+        return messages, report
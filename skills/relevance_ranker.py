@@ -0,0 +1,175 @@
+import math
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from skills.snapshot import dumps_state
+
+_TOKEN_RE = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+_STOPWORDS = {
+    "a", "an", "and", "the", "to", "of", "in", "on", "for", "with", "at", "by",
+    "from", "is", "it", "my", "me", "i", "please", "then", "this", "that"
+}
+
+def tokenize(text):
+    """Lowercase word tokens. Splits camelCase/PascalCase automation IDs and drops stopwords."""
+    tokens = []
+    for token in _TOKEN_RE.findall(str(text or "")):
+        token = token.lower()
+        if token in _STOPWORDS:
+            continue
+        # Crude plural folding so "notes" matches "Note"
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+class _BM25:
+    def __init__(self, docs, k1, b):
+        self.k1 = k1
+        self.b = b
+        self.docs = [Counter(doc) for doc in docs]
+        self.lengths = [len(doc) for doc in docs]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if docs else 0.0
+        df = Counter()
+        for doc in self.docs:
+            df.update(doc.keys())
+        n = len(docs)
+        self.idf = {term: math.log(1 + (n - freq + 0.5) / (freq + 0.5)) for term, freq in df.items()}
+
+    def score(self, query, index):
+        doc = self.docs[index]
+        if not doc:
+            return 0.0
+        norm = self.k1 * (1 - self.b + self.b * self.lengths[index] / (self.avg_length or 1.0))
+        total = 0.0
+        for term in query:
+            tf = doc.get(term)
+            if tf:
+                total += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+        return total
+
+class RelevanceRanker:
+    """
+    Caps the perception payload sent to the planner.
+    Windows and their controls are scored with BM25 against the goal and the
+    current sub-plan (titles, class names, control labels and automation IDs).
+    The focused window is always kept. Only the top-K windows, the top controls
+    per window, and as much as fits in the token budget survive; everything
+    else is reported as dropped.
+    """
+
+    def __init__(self, max_windows=8, max_controls_per_window=15, token_budget=1500,
+                 max_installed_apps=20, chars_per_token=4, k1=1.2, b=0.75):
+        self.max_windows = max_windows
+        self.max_installed_apps = max_installed_apps
+        self.max_controls_per_window = max_controls_per_window
+        self.token_budget = token_budget
+        self.chars_per_token = chars_per_token
+        self.k1 = k1
+        self.b = b
+
+    def estimate_tokens(self, record):
+        return len(dumps_state(record)) // self.chars_per_token + 1
+
+    def prune(self, goal, sub_plan, state):
+        """Returns (pruned_state, report)."""
+        start = time.perf_counter()
+        windows = list(state.get("open_windows", []) or [])
+        installed_apps = list(state.get("installed_apps", []) or [])
+        report = {"dropped_windows": [], "dropped_controls": 0, "dropped_installed_apps": 0,
+                  "estimated_tokens": 0, "elapsed_ms": 0.0}
+        if not windows and len(installed_apps) <= self.max_installed_apps:
+            return state, report
+
+        query = tokenize(goal)
+        for step in sub_plan or []:
+            query.extend(tokenize(step))
+        query = list(dict.fromkeys(query))
+
+        # 0. Installed apps: keep the best name matches only
+        if len(installed_apps) > self.max_installed_apps:
+            app_index = _BM25([tokenize(app) for app in installed_apps], self.k1, self.b)
+            scores = [app_index.score(query, i) for i in range(len(installed_apps))]
+            keep = sorted(
+                (i for i in range(len(installed_apps)) if scores[i] > 0),
+                key=lambda i: -scores[i]
+            )[:self.max_installed_apps]
+            report["dropped_installed_apps"] = len(installed_apps) - len(keep)
+            installed_apps = [installed_apps[i] for i in sorted(keep)]
+
+        focused = (state.get("system", {}) or {}).get("focused_app")
+
+        # 1. Rank windows
+        window_docs = []
+        for window in windows:
+            text = [window.get("title"), window.get("class_name")]
+            for control in window.get("controls", []):
+                text.extend([control.get("label"), control.get("automation_id")])
+            window_docs.append(tokenize(" ".join(str(t) for t in text if t)))
+        window_index = _BM25(window_docs, self.k1, self.b)
+        ranked = sorted(
+            range(len(windows)),
+            key=lambda i: (windows[i].get("title") != focused, -window_index.score(query, i), i)
+        )
+
+        # 2. Keep the top-K windows, each with its best controls, within the token budget
+        kept = {}
+        budget = self.token_budget
+        for rank, i in enumerate(ranked):
+            window = windows[i]
+            is_focused = window.get("title") == focused
+            if rank >= self.max_windows and not is_focused:
+                report["dropped_windows"].append(window.get("title"))
+                continue
+
+            window = self._prune_controls(window, query, report)
+            cost = self.estimate_tokens(window)
+            if cost > budget and not is_focused:
+                # Try the window without its controls before dropping it entirely
+                bare = self._with_controls(window, [])
+                bare_cost = self.estimate_tokens(bare)
+                if bare_cost > budget:
+                    report["dropped_windows"].append(window.get("title"))
+                    report["dropped_controls"] += len(window.get("controls", []))
+                    continue
+                report["dropped_controls"] += len(window.get("controls", []))
+                window, cost = bare, bare_cost
+            budget -= cost
+            kept[i] = window
+
+        # Preserve the original (z-order) ordering of surviving windows
+        pruned_windows = [kept[i] for i in sorted(kept)]
+        report["estimated_tokens"] = self.token_budget - budget
+        report["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+        if hasattr(state, "replace"):
+            pruned = state.replace(open_windows=pruned_windows, installed_apps=installed_apps)
+        else:
+            pruned = dict(state)
+            pruned["open_windows"] = pruned_windows
+            pruned["installed_apps"] = installed_apps
+        return pruned, report
+
+    def _prune_controls(self, window, query, report):
+        controls = list(window.get("controls", []) or [])
+        if len(controls) <= self.max_controls_per_window:
+            return window
+        docs = [tokenize(f"{c.get('label') or ''} {c.get('automation_id') or ''} {c.get('type') or ''}") for c in controls]
+        index = _BM25(docs, self.k1, self.b)
+        ranked = sorted(range(len(controls)), key=lambda i: (-index.score(query, i), i))
+        keep = sorted(ranked[:self.max_controls_per_window])
+        report["dropped_controls"] += len(controls) - len(keep)
+        return self._with_controls(window, [controls[i] for i in keep])
+
+    def _with_controls(self, window, controls):
+        if hasattr(window, "replace"):
+            return window.replace(controls=controls)
+        window = dict(window)
+        window["controls"] = controls
+        return window
@@ -0,0 +1,220 @@
+import re
+from collections import OrderedDict, deque
+
+# Parameter that best identifies what an action touched, per summary category
+SUMMARY_KEYS = [
+    ("apps", "app_name"),
+    ("files", "file_path"),
+    ("urls", "url"),
+    ("commands", "command"),
+    ("media", "query"),
+    ("contacts", "target"),
+]
+# Parameter shown when an action is listed as done/failed, in order of preference
+LABEL_KEYS = ["app_name", "file_path", "url", "command", "query", "target", "task", "key", "text", "coordinates"]
+
+def step_plan(step):
+    """The plan of a history entry ('success'/'retry' keep it in 'log', 'done'/'failed' at the top)."""
+    return step.get("plan") or step.get("log", {}).get("plan", {}) or {}
+
+def _clip(value, limit):
+    text = " ".join(str(value).split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+def _words(text):
+    return re.findall(r"[\w.:/-]+", str(text).lower())
+
+def _subjects(plan):
+    params = plan.get("parameters") or {}
+    return [str(params[key]).lower() for _, key in SUMMARY_KEYS if params.get(key)]
+
+def history_options(config):
+    """RollingHistory keyword arguments from the `agent.history` config section."""
+    history_config = (config or {}).get('agent', {}).get('history', {}) or {}
+    return {
+        "detail_steps": history_config.get('detail_steps', 8),
+        "max_bytes": history_config.get('max_bytes', 2048),
+        "summary_items": history_config.get('summary_items', 8)
+    }
+
+def _remember(items, key, limit):
+    """Most-recently-touched ordering, capped at `limit` entries."""
+    items[key] = items.pop(key, 0) + 1
+    while len(items) > limit:
+        items.popitem(last=False)
+
+class RollingHistory:
+    """
+    Bounded step history for the Agent.
+    The last `detail_steps` entries are kept as full step logs; older ones are
+    folded into a running summary (apps, files, URLs and commands touched,
+    actions done and failed) and dropped. `render` turns both into the
+    planner's PREVIOUS ACTIONS section within `max_bytes`.
+    Behaves like a list of the detailed steps (append, len, indexing,
+    iteration), so existing `history[-1]` style callers keep working.
+    """
+
+    def __init__(self, steps=None, detail_steps=8, max_bytes=2048, summary_items=8, value_chars=60):
+        self.detail_steps = max(1, detail_steps)
+        self.max_bytes = max_bytes
+        self.summary_items = summary_items
+        self.value_chars = value_chars
+        self._steps = deque()
+        self.total_steps = 0
+        self._reset_summary()
+        for step in steps or []:
+            self.append(step)
+
+    def _reset_summary(self):
+        self.folded = 0
+        self.folded_status = {}
+        self.touched = {category: OrderedDict() for category, _ in SUMMARY_KEYS}
+        self.done = OrderedDict()
+        self.failed = OrderedDict()
+        self.done_subjects = OrderedDict()
+
+    # --- list-like API ---
+
+    def append(self, step):
+        self._steps.append(step)
+        self.total_steps += 1
+        while len(self._steps) > self.detail_steps:
+            self._fold(self._steps.popleft())
+
+    def extend(self, steps):
+        for step in steps:
+            self.append(step)
+
+    def copy(self):
+        """Independent copy: appending to it leaves this history untouched (step dicts are shared)."""
+        clone = RollingHistory(detail_steps=self.detail_steps, max_bytes=self.max_bytes,
+                               summary_items=self.summary_items, value_chars=self.value_chars)
+        clone._steps = deque(self._steps)
+        clone.total_steps = self.total_steps
+        clone.folded = self.folded
+        clone.folded_status = dict(self.folded_status)
+        clone.touched = {category: OrderedDict(items) for category, items in self.touched.items()}
+        clone.done = OrderedDict(self.done)
+        clone.failed = OrderedDict(self.failed)
+        clone.done_subjects = OrderedDict(self.done_subjects)
+        return clone
+
+    def clear(self):
+        self._steps.clear()
+        self.total_steps = 0
+        self._reset_summary()
+
+    def __len__(self):
+        return len(self._steps)
+
+    def __iter__(self):
+        return iter(self._steps)
+
+    def __reversed__(self):
+        return reversed(self._steps)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._steps)[index]
+        return self._steps[index]
+
+    def __repr__(self):
+        return f"RollingHistory({self.total_steps} steps, {len(self._steps)} detailed, {self.folded} folded)"
+
+    # --- summary ---
+
+    def _label(self, plan):
+        params = plan.get("parameters") or {}
+        for key in LABEL_KEYS:
+            if params.get(key) not in (None, ""):
+                return f"{plan.get('action', 'unknown')} {_clip(params[key], self.value_chars)}"
+        return str(plan.get("action", "unknown"))
+
+    def _fold(self, step):
+        plan = step_plan(step)
+        status = step.get("status", "unknown")
+        self.folded += 1
+        self.folded_status[status] = self.folded_status.get(status, 0) + 1
+        params = plan.get("parameters") or {}
+        for category, key in SUMMARY_KEYS:
+            if params.get(key) not in (None, ""):
+                _remember(self.touched[category], _clip(params[key], self.value_chars), self.summary_items)
+        if plan.get("action") in (None, "done", "wait"):
+            return
+        if status in ("success", "done"):
+            _remember(self.done, self._label(plan), self.summary_items)
+            for subject in _subjects(plan):
+                _remember(self.done_subjects, subject, self.summary_items)
+        else:
+            _remember(self.failed, self._label(plan), self.summary_items)
+
+    def completed_workflow(self, sub_plan):
+        """1-based indices of workflow items whose subject (app, file, URL, ...) a successful action covered."""
+        subjects = set(self.done_subjects)
+        for step in self._steps:
+            if step.get("status") in ("success", "done"):
+                subjects.update(_subjects(step_plan(step)))
+
+        completed = []
+        for i, item in enumerate(sub_plan or []):
+            words = set(_words(item))
+            if any(set(_words(subject)) <= words for subject in subjects if _words(subject)):
+                completed.append(i + 1)
+        return completed
+
+    def _summary_lines(self):
+        if not self.folded:
+            return []
+        statuses = ", ".join(f"{count} {status}" for status, count in sorted(self.folded_status.items()))
+        lines = [f"EARLIER STEPS ({self.folded} summarized: {statuses}):"]
+        for category, _ in SUMMARY_KEYS:
+            if self.touched[category]:
+                lines.append(f"- {category}: {', '.join(reversed(self.touched[category]))}")
+        if self.done:
+            lines.append("- done: " + ", ".join(
+                label + (f" (x{count})" if count > 1 else "") for label, count in reversed(self.done.items())
+            ))
+        if self.failed:
+            lines.append("- failed: " + ", ".join(
+                label + (f" (x{count})" if count > 1 else "") for label, count in reversed(self.failed.items())
+            ))
+        return lines
+
+    def _detail_lines(self):
+        lines = []
+        first = self.total_steps - len(self._steps) + 1
+        for offset, step in enumerate(self._steps):
+            plan = step_plan(step)
+            params = plan.get("parameters") or {}
+            args = ", ".join(f"{key}={_clip(value, self.value_chars)}" for key, value in params.items())
+            status = step.get("status", "unknown")
+            line = f"{first + offset}. {plan.get('action', 'unknown')}({args}) -> {status}"
+            if status not in ("success", "done") and step.get("message"):
+                line += f" ({_clip(step['message'], self.value_chars)})"
+            lines.append(line)
+        return lines
+
+    def render(self, sub_plan=None, max_bytes=None):
+        """PREVIOUS ACTIONS text for the planner, at most `max_bytes` UTF-8 bytes ("" when empty)."""
+        if not self.total_steps:
+            return ""
+        budget = max_bytes or self.max_bytes
+        summary = self._summary_lines()
+        completed = self.completed_workflow(sub_plan)
+        if completed:
+            summary.append(f"WORKFLOW ITEMS ALREADY DONE: {', '.join(map(str, completed))}")
+        details = self._detail_lines()
+
+        def text():
+            return "\n".join(summary + ["PREVIOUS ACTIONS:"] + details) + "\n"
+
+        # Over budget: drop the oldest detailed lines first (keeping the latest), then summary lines
+        while len(text().encode("utf-8")) > budget and len(details) > 1:
+            details.pop(0)
+        while len(text().encode("utf-8")) > budget and summary:
+            summary.pop()
+        rendered = text()
+        encoded = rendered.encode("utf-8")
+        if len(encoded) > budget:
+            rendered = encoded[:max(0, budget - 4)].decode("utf-8", errors="ignore") + "...\n"
+        return rendered
@@ -0,0 +1,53 @@
+import threading
+
+class ScanPolicy:
+    """
+    Decides how much of each window StructuredPerception reads.
+
+    - The focused window gets a breadth-first scan down to `depth` levels,
+      capped at `node_budget` visited nodes.
+    - Background windows get `background_mode` scans: "title" (title, process
+      and class only, no children) or "shallow" (first-level controls, the
+      legacy behaviour).
+    - `depth` adapts to measured capture latency: it drops by one when the
+      smoothed latency exceeds `target_ms` and grows by one when it falls
+      below half of it, within [min_depth, max_depth].
+    """
+
+    def __init__(self, depth=3, min_depth=1, max_depth=6, node_budget=200,
+                 background_mode="title", target_ms=350, smoothing=0.3, deep_max_age=2.0):
+        self.depth = depth
+        self.min_depth = min_depth
+        self.max_depth = max_depth
+        self.node_budget = node_budget
+        self.background_mode = background_mode
+        self.target_ms = target_ms
+        self.smoothing = smoothing
+        # Deep scans only see first-level child counts in their cache signature,
+        # so they are also refreshed after this many seconds.
+        self.deep_max_age = deep_max_age
+        self.latency_ms = None
+        self._lock = threading.Lock()
+
+    def mode_for(self, is_focused):
+        """Returns (mode, depth, node_budget) for a window."""
+        if is_focused:
+            return "deep", self.depth, self.node_budget
+        if self.background_mode == "shallow":
+            return "shallow", 1, None
+        return "title", 0, 0
+
+    def record_latency(self, elapsed_ms):
+        with self._lock:
+            if self.latency_ms is None:
+                self.latency_ms = elapsed_ms
+            else:
+                self.latency_ms += self.smoothing * (elapsed_ms - self.latency_ms)
+
+            if not self.target_ms:
+                return self.depth
+            if self.latency_ms > self.target_ms and self.depth > self.min_depth:
+                self.depth -= 1
+            elif self.latency_ms < self.target_ms / 2 and self.depth < self.max_depth:
+                self.depth += 1
+            return self.depth
@@ -0,0 +1,146 @@
+import os
+import sys
+import time
+from abc import ABC, abstractmethod
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.logger import logger
+
+class Frame:
+    """Downscaled 8-bit grayscale frame, row-major."""
+    __slots__ = ("width", "height", "pixels")
+
+    def __init__(self, width, height, pixels):
+        self.width = width
+        self.height = height
+        self.pixels = bytes(pixels)
+
+class FrameSource(ABC):
+    @abstractmethod
+    def grab(self, width, height):
+        """Returns the current screen as a Frame of the given size."""
+        pass
+
+class ScreenshotFrameSource(FrameSource):
+    """Grabs the whole desktop (every monitor) through Pillow's ImageGrab."""
+
+    def __init__(self):
+        # Pillow is imported on the first grab, not while the Agent is being built
+        self._image = None
+        self._grab = None
+
+    def grab(self, width, height):
+        if self._grab is None:
+            from PIL import Image, ImageGrab
+            self._image, self._grab = Image, ImageGrab.grab
+        image = self._grab(all_screens=True).convert("L").resize((width, height), self._image.BOX)
+        return Frame(width, height, image.tobytes())
+
+class SyntheticFrameSource(FrameSource):
+    """
+    Replays prepared frames (for benchmarks). Each grab returns the next frame;
+    the last one repeats once the sequence runs out. `frames` may also be a
+    callable returning the current Frame.
+    """
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.grabs = 0
+
+    def grab(self, width, height):
+        self.grabs += 1
+        if callable(self.frames):
+            return self.frames()
+        return self.frames[min(self.grabs - 1, len(self.frames) - 1)]
+
+class ScreenChangeDetector:
+    """
+    Cheap "did the screen change?" check.
+    Frames are downscaled to a small grayscale image and reduced to a grid of
+    block means. Two fingerprints differ when at least `min_changed_blocks`
+    blocks moved by more than `tolerance` gray levels, which ignores noise like
+    a blinking caret but catches windows opening, closing or repainting.
+    """
+
+    def __init__(self, source=None, size=(128, 72), grid=(16, 9), tolerance=6, min_changed_blocks=1):
+        self.size = size
+        self.grid = grid
+        self.tolerance = tolerance
+        self.min_changed_blocks = min_changed_blocks
+        if source is None:
+            try:
+                source = ScreenshotFrameSource()
+            except Exception as e:
+                logger.warning(f"Screen capture unavailable ({e}). Change detection disabled.")
+        self.source = source
+
+    def fingerprint(self, frame):
+        cols, rows = self.grid
+        block_w = frame.width // cols
+        block_h = frame.height // rows
+        pixels = frame.pixels
+        means = []
+        for row in range(rows):
+            for col in range(cols):
+                total = 0
+                for y in range(row * block_h, (row + 1) * block_h):
+                    offset = y * frame.width + col * block_w
+                    total += sum(pixels[offset:offset + block_w])
+                means.append(total // (block_w * block_h))
+        return tuple(means)
+
+    def capture(self):
+        """Returns the current screen fingerprint, or None if the screen can't be read."""
+        if self.source is None:
+            return None
+        try:
+            return self.fingerprint(self.source.grab(*self.size))
+        except Exception as e:
+            logger.debug(f"Frame grab failed: {e}")
+            return None
+
+    def changed(self, before, after):
+        # Unknown fingerprints count as a change so callers fall back to full perception
+        if before is None or after is None:
+            return True
+        changed_blocks = 0
+        for a, b in zip(before, after):
+            if abs(a - b) > self.tolerance:
+                changed_blocks += 1
+                if changed_blocks >= self.min_changed_blocks:
+                    return True
+        return False
+
+    def wait_for_change(self, baseline, timeout=1.0, poll_interval=0.05, settle=0.15):
+        """
+        Polls until the screen differs from `baseline`, then until it holds still
+        for `settle` seconds (so we don't perceive mid-animation), or `timeout`.
+        Returns (changed, fingerprint).
+        """
+        deadline = time.monotonic() + timeout
+        current = self.capture()
+        if baseline is None or current is None:
+            # Can't tell: behave like the old fixed wait
+            time.sleep(timeout)
+            return True, self.capture()
+
+        # 1. Wait for the first change
+        while not self.changed(baseline, current):
+            if time.monotonic() >= deadline:
+                return False, current
+            time.sleep(poll_interval)
+            current = self.capture()
+
+        # 2. Wait for the screen to settle
+        stable_since = time.monotonic()
+        while time.monotonic() < deadline and time.monotonic() - stable_since < settle:
+            time.sleep(poll_interval)
+            latest = self.capture()
+            if latest is None:
+                break
+            if self.changed(current, latest):
+                stable_since = time.monotonic()
+            current = latest
+        return True, current
@@ -0,0 +1,163 @@
+import os
+import sys
+import threading
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.logger import logger
+
+DEFAULT_CONFIG_PATH = "d:/Ceaser-AI/openclaw/config.yaml"
+
+class ServiceContainer:
+    """
+    Builds shared services lazily, exactly once, and hands the same instance
+    to everyone who asks (Agent, Executor, Verifier, actions, self-healing).
+    Factories take the container, so dependencies are resolved through it too.
+    Services can be replaced up front with `provide` (benchmarks pass
+    simulated perception/executors this way).
+    """
+
+    def __init__(self, config_path=DEFAULT_CONFIG_PATH):
+        self.config_path = config_path
+        self._factories = {}
+        self._instances = {}
+        self._building = set()
+        self._lock = threading.RLock()
+        self.build_ms = {}  # how long each service took to construct
+        self._register_defaults()
+
+    def register(self, name, factory):
+        """Registers (or replaces) the factory for `name`; factory(container) -> instance."""
+        with self._lock:
+            self._factories[name] = factory
+
+    def provide(self, name, instance):
+        """Uses a ready-made instance for `name` instead of building one."""
+        with self._lock:
+            self._instances[name] = instance
+
+    def has(self, name):
+        return name in self._instances
+
+    def get(self, name):
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            if name in self._instances:
+                return self._instances[name]
+            if name not in self._factories:
+                raise KeyError(f"Unknown service: {name}")
+            if name in self._building:
+                raise RuntimeError(f"Circular service dependency while building '{name}'")
+            self._building.add(name)
+            try:
+                start = time.perf_counter()
+                instance = self._factories[name](self)
+                self.build_ms[name] = round((time.perf_counter() - start) * 1000, 1)
+            finally:
+                self._building.discard(name)
+            self._instances[name] = instance
+            logger.debug(f"Built service '{name}' in {self.build_ms[name]} ms")
+            return instance
+
+    def __getattr__(self, name):
+        # services.planner reads the same as services.get("planner")
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self.get(name)
+        except KeyError:
+            raise AttributeError(name)
+
+    def _register_defaults(self):
+        # Imports stay inside the factories so only services that are used get loaded
+        def config(c):
+            import yaml
+            with open(c.config_path, 'r') as f:
+                return yaml.safe_load(f)
+
+        def db(c):
+            from utils.database_manager import DatabaseManager
+            return DatabaseManager()
+
+        def planner(c):
+            from skills.groq_planner import GroqPlanner
+            return GroqPlanner(config_path=c.config_path, config=c.get("config"), app_index=c.get("app_index"))
+
+        def app_index(c):
+            from skills.app_index import InstalledAppIndex
+            index = InstalledAppIndex(db=c.get("db"))
+            index.start()
+            return index
+
+        def perception(c):
+            from skills.structured_perception import StructuredPerception
+            # Bound each perception pass by the configured structured-reasoning latency target
+            return StructuredPerception(
+                deadline_ms=c.get("config")['agent'].get('structured_reasoning_latency_target_ms'),
+                app_index=c.get("app_index")
+            )
+
+        def app_launcher(c):
+            from skills.app_launcher import AppLauncher
+            return AppLauncher()
+
+        def browser_controller(c):
+            from skills.browser_controller import BrowserController
+            return BrowserController()
+
+        def filesystem_manager(c):
+            from skills.filesystem_manager import FilesystemManager
+            return FilesystemManager()
+
+        def openclaw(c):
+            from skills.openclaw_client import OpenClawClient
+            return OpenClawClient(config_path=c.config_path)
+
+        def desktop_controller(c):
+            from skills.desktop_app_controller import DesktopAppController
+            return DesktopAppController(app_launcher=c.get("app_launcher"))
+
+        def whatsapp_api(c):
+            from skills.whatsapp_api_client import WhatsAppAPIClient
+            return WhatsAppAPIClient()
+
+        def executor(c):
+            from skills.executor import Executor
+            return Executor(services=c)
+
+        def verifier(c):
+            from skills.verifier import Verifier
+            return Verifier(perception=c.get("perception"))
+
+        def vision_fallback(c):
+            from skills.vision_fallback import VisionFallback
+            return VisionFallback(config_path=c.config_path)
+
+        def change_detector(c):
+            from skills.screen_change import ScreenChangeDetector
+            return ScreenChangeDetector()
+
+        for factory in (config, db, planner, app_index, perception, app_launcher, browser_controller, filesystem_manager,
+                        openclaw, desktop_controller, whatsapp_api, executor, verifier, vision_fallback,
+                        change_detector):
+            self.register(factory.__name__, factory)
+
+_services = None
+_services_lock = threading.Lock()
+
+def get_services(config_path=DEFAULT_CONFIG_PATH):
+    """The process-wide ServiceContainer (created on first use)."""
+    global _services
+    with _services_lock:
+        if _services is None:
+            _services = ServiceContainer(config_path=config_path)
+        return _services
+
+def reset_services():
+    global _services
+    with _services_lock:
+        _services = None
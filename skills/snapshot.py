@@ -0,0 +1,156 @@
+import json
+from collections.abc import Mapping
+from types import MappingProxyType
+
+class _Record(Mapping):
+    """
+    Immutable, slotted record with a read-only dict view.
+    Records are shared between snapshots (unchanged windows are reused as-is),
+    so nothing may mutate them after construction. The plain-dict and JSON
+    forms are built on first use and cached on the instance.
+    """
+    __slots__ = ("_dict", "_json")
+    _keys = ()
+
+    def _init(self, **fields):
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, "_dict", None)
+        object.__setattr__(self, "_json", {})
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def _visible_keys(self):
+        return self._keys
+
+    # --- Mapping interface (keeps dict-style consumers working) ---
+
+    def __getitem__(self, key):
+        if key not in self._visible_keys():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self._visible_keys())
+
+    def __len__(self):
+        return len(self._visible_keys())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    # --- Serialization ---
+
+    def to_dict(self):
+        """Plain nested dict form. Cached; treat the result as read-only."""
+        if self._dict is None:
+            object.__setattr__(self, "_dict", {key: _plain(self[key]) for key in self._visible_keys()})
+        return self._dict
+
+    def to_json(self, indent=None):
+        """JSON form, serialized once per indent setting."""
+        cached = self._json.get(indent)
+        if cached is None:
+            separators = (",", ":") if indent is None else None
+            cached = json.dumps(self.to_dict(), indent=indent, separators=separators)
+            self._json[indent] = cached
+        return cached
+
+    def replace(self, **changes):
+        """Returns a copy with the given fields changed."""
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return type(self)(**fields)
+
+def _plain(value):
+    if isinstance(value, _Record):
+        return value.to_dict()
+    if isinstance(value, (tuple, list)):
+        return [_plain(item) for item in value]
+    if isinstance(value, Mapping):
+        return {key: _plain(item) for key, item in value.items()}
+    return value
+
+class ControlInfo(_Record):
+    __slots__ = ("type", "label", "automation_id")
+    _keys = ("type", "label", "automation_id")
+
+    def __init__(self, type, label, automation_id):
+        self._init(type=type, label=label, automation_id=automation_id)
+
+class WindowInfo(_Record):
+    __slots__ = ("title", "process_id", "class_name", "controls", "partial", "handle")
+    _keys = ("title", "process_id", "class_name", "controls")
+
+    def __init__(self, title, process_id=None, class_name=None, controls=(), partial=False, handle=None):
+        self._init(
+            title=title,
+            process_id=process_id,
+            class_name=class_name,
+            controls=tuple(controls),
+            partial=partial,
+            handle=handle
+        )
+
+    def _visible_keys(self):
+        # "partial" only shows up when the scan missed the deadline
+        return self._keys + ("partial",) if self.partial else self._keys
+
+class Snapshot(_Record):
+    """
+    One perception pass. The dict view matches the legacy state layout:
+    system / open_windows / taskbar_apps / installed_apps, plus visual_context
+    or error when present.
+    """
+    __slots__ = ("os", "time", "focused_app", "open_windows", "taskbar_apps", "installed_apps",
+                 "visual_context", "error", "system")
+    _keys = ("system", "open_windows", "taskbar_apps", "installed_apps")
+
+    def __init__(self, os=None, time=None, focused_app=None, open_windows=(), taskbar_apps=(),
+                 installed_apps=(), visual_context=None, error=None, system=None):
+        self._init(
+            os=os,
+            time=time,
+            focused_app=focused_app,
+            open_windows=tuple(open_windows),
+            taskbar_apps=tuple(taskbar_apps),
+            installed_apps=tuple(installed_apps),
+            visual_context=visual_context,
+            error=error,
+            system=MappingProxyType({"os": os, "time": time, "focused_app": focused_app})
+        )
+
+    @classmethod
+    def failed(cls, error):
+        return cls(error=str(error))
+
+    def _visible_keys(self):
+        if self.error is not None:
+            return ("error",)
+        if self.visual_context is not None:
+            return self._keys + ("visual_context",)
+        return self._keys
+
+    def replace(self, **changes):
+        changes.pop("system", None)
+        fields = {name: getattr(self, name) for name in self.__slots__ if name != "system"}
+        fields.update(changes)
+        return Snapshot(**fields)
+
+def json_default(obj):
+    """`default=` hook for json.dumps on structures that embed snapshots."""
+    if isinstance(obj, _Record):
+        return obj.to_dict()
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps_state(state, indent=None):
+    """Serializes a perception state, reusing the snapshot's cached JSON when possible."""
+    if isinstance(state, _Record):
+        return state.to_json(indent=indent)
+    return json.dumps(state, indent=indent, default=json_default)
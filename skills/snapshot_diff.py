@@ -0,0 +1,147 @@
+import json
+import os
+import sys
+from collections.abc import Mapping
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from skills.snapshot import dumps_state
+
+def _as_dict(record):
+    return record.to_dict() if hasattr(record, "to_dict") else dict(record)
+
+def _window_key(window):
+    # Snapshots carry the native handle; plain dict states only have the title
+    return getattr(window, "handle", None) or window.get("title")
+
+def _control_key(control):
+    return (control.get("type"), control.get("label"), control.get("automation_id"))
+
+def _diff_window(old, new):
+    """Returns the changes between two versions of one window, or None if identical."""
+    if old is new:
+        return None
+    old_dict, new_dict = _as_dict(old), _as_dict(new)
+    if old_dict == new_dict:
+        return None
+
+    change = {"title": new_dict.get("title")}
+    for field, value in new_dict.items():
+        if field != "controls" and old_dict.get(field) != value:
+            change[field] = value
+    if old_dict.get("title") != new_dict.get("title"):
+        change["previous_title"] = old_dict.get("title")
+
+    old_controls = {_control_key(c): c for c in old_dict.get("controls", [])}
+    new_controls = {_control_key(c): c for c in new_dict.get("controls", [])}
+    added = [c for key, c in new_controls.items() if key not in old_controls]
+    removed = [c for key, c in old_controls.items() if key not in new_controls]
+    if added:
+        change["added_controls"] = added
+    if removed:
+        change["removed_controls"] = removed
+    return change
+
+def diff_snapshots(base, current):
+    """
+    Structural diff between two perception states.
+    Returns a dict holding only what changed: system fields, added/removed/changed
+    windows (with added/removed controls), and replaced app lists. Empty dict
+    means no change. Windows shared between snapshots are skipped by identity.
+    """
+    delta = {}
+
+    old_system = base.get("system", {}) or {}
+    new_system = current.get("system", {}) or {}
+    system_changes = {k: v for k, v in new_system.items() if old_system.get(k) != v}
+    if system_changes:
+        delta["system"] = system_changes
+
+    old_windows = {_window_key(w): w for w in base.get("open_windows", [])}
+    new_windows = {_window_key(w): w for w in current.get("open_windows", [])}
+
+    added = [_as_dict(w) for key, w in new_windows.items() if key not in old_windows]
+    removed = [old_windows[key].get("title") for key in old_windows if key not in new_windows]
+    changed = []
+    for key, window in new_windows.items():
+        if key in old_windows:
+            change = _diff_window(old_windows[key], window)
+            if change:
+                changed.append(change)
+
+    if added:
+        delta["added_windows"] = added
+    if removed:
+        delta["removed_windows"] = removed
+    if changed:
+        delta["changed_windows"] = changed
+
+    for field in ("taskbar_apps", "installed_apps", "visual_context", "error"):
+        old_value, new_value = base.get(field), current.get(field)
+        if isinstance(old_value, tuple):
+            old_value = list(old_value)
+        if isinstance(new_value, tuple):
+            new_value = list(new_value)
+        if old_value != new_value:
+            delta[field] = new_value
+
+    return delta
+
+class SnapshotDeltaEncoder:
+    """
+    Encodes perception states for planner prompts as one full baseline per goal
+    followed by deltas against that baseline.
+
+    The chat API is stateless, so the baseline still travels with every request,
+    but as its own message that stays byte-identical between steps. That keeps it
+    inside the prompt prefix the provider can cache, while the per-step part of
+    the prompt only carries what changed. A fresh baseline is taken on a new goal,
+    every `resync_every` steps, when requested, or when the delta stops paying off.
+    """
+
+    def __init__(self, resync_every=5, max_delta_ratio=0.5):
+        self.resync_every = resync_every
+        self.max_delta_ratio = max_delta_ratio
+        self.baseline = None
+        self.baseline_json = None
+        self.steps_since_resync = 0
+        self._resync_requested = False
+
+    def reset(self):
+        """Forgets the baseline (new goal)."""
+        self.baseline = None
+        self.baseline_json = None
+        self.steps_since_resync = 0
+        self._resync_requested = False
+
+    def request_resync(self):
+        """Forces a full baseline on the next encode."""
+        self._resync_requested = True
+
+    def encode(self, state):
+        """
+        Returns (baseline_json, delta, resynced).
+        `delta` is None when the baseline was just taken from this state.
+        """
+        if not isinstance(state, Mapping):
+            state = {"state": state}
+
+        needs_resync = (
+            self.baseline is None
+            or self._resync_requested
+            or self.steps_since_resync >= self.resync_every
+        )
+
+        if not needs_resync:
+            delta = diff_snapshots(self.baseline, state)
+            # If most of the screen changed, a new baseline is cheaper than the delta
+            if len(json.dumps(delta)) <= self.max_delta_ratio * len(self.baseline_json):
+                self.steps_since_resync += 1
+                return self.baseline_json, delta, False
+
+        self.baseline = state
+        self.baseline_json = dumps_state(state)
+        self.steps_since_resync = 0
+        self._resync_requested = False
+        return self.baseline_json, None, True
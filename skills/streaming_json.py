@@ -0,0 +1,91 @@
+import json
+
+class IncrementalJSONObjectParser:
+    """
+    Parses a JSON object that arrives in chunks and reports each top-level
+    member as soon as its value is complete, e.g. "action" and "parameters"
+    long before the model has finished writing "thought". Text before the
+    opening brace (stray prose, code fences) is ignored.
+    """
+
+    def __init__(self):
+        self.members = {}
+        self.complete = False
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._state = "start"  # start -> key -> colon -> value -> after -> key ... -> done
+        self._key_start = None
+        self._key = None
+        self._value_start = None
+
+    def _emit(self, text, end):
+        self.members[self._key] = json.loads(text[self._value_start:end])
+        self._state = "after"
+        return self._key
+
+    def feed(self, chunk):
+        """Consumes a chunk; returns the keys whose values completed in it."""
+        self.text += chunk
+        text = self.text
+        completed = []
+        for i in range(self._pos, len(text)):
+            char = text[i]
+            if self.complete:
+                break
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._state == "key":
+                        self._key = json.loads(text[self._key_start:i + 1])
+                        self._state = "colon"
+                    elif self._depth == 1 and self._state == "value":
+                        completed.append(self._emit(text, i + 1))
+                continue
+
+            if self._state == "start":
+                if char == "{":
+                    self._depth = 1
+                    self._state = "key"
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._state == "key":
+                    self._key_start = i
+                elif self._depth == 1 and self._state == "value" and self._value_start is None:
+                    self._value_start = i
+            elif char in "{[":
+                if self._depth == 1 and self._state == "value" and self._value_start is None:
+                    self._value_start = i
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._state == "value":
+                    # A nested object/array value just closed
+                    completed.append(self._emit(text, i + 1))
+                elif self._depth == 0:
+                    if self._state == "value" and self._value_start is not None:
+                        completed.append(self._emit(text, i))
+                    self._state = "done"
+                    self.complete = True
+            elif self._depth == 1:
+                if char == ":" and self._state == "colon":
+                    self._state = "value"
+                    self._value_start = None
+                elif char == ",":
+                    if self._state == "value" and self._value_start is not None:
+                        # Numbers, true/false/null end at the delimiter
+                        completed.append(self._emit(text, i))
+                    self._state = "key"
+                elif not char.isspace() and self._state == "value" and self._value_start is None:
+                    self._value_start = i
+        self._pos = len(text)
+        return completed
@@ -1,89 +1,265 @@
-import uiautomation as auto
-import psutil
 import platform
 import datetime
 import os
 import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import wait
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from utils.logger import logger
+from utils.daemon_pool import DaemonThreadPool
+from skills.ui_backend import create_default_backend
+from skills.perception_cache import WindowCache
+from skills.snapshot import Snapshot, WindowInfo, ControlInfo
+from skills.scan_policy import ScanPolicy
+
+# Control types worth reporting to the planner
+INTERACTIVE_CONTROL_TYPES = {
+    "ButtonControl", "EditControl", "ListControl", "MenuItemControl",
+    "HyperlinkControl", "TabItemControl", "CheckBoxControl", "ComboBoxControl",
+    "RadioButtonControl", "ListItemControl"
+}
 
 class StructuredPerception:
-    def __init__(self):
+    def __init__(self, backend=None, max_workers=8, deadline_ms=None, app_index=None, scan_policy=None):
         self.os_info = {
             "os": platform.system() + " " + platform.release(),
             "version": platform.version()
         }
+        self.backend = backend or create_default_backend()
+        # Window/control cache that survives between captures
+        self.cache = WindowCache()
+        # Which windows the last capture re-read vs. served from cache
+        self.last_refresh = {"refreshed": [], "reused": [], "removed": [], "partial": []}
+
+        # Per-window scans run on a bounded pool so one hung app cannot stall the step.
+        # Its threads are daemons: an abandoned scan must not block interpreter exit either.
+        self.deadline_ms = deadline_ms
+        self._pool = DaemonThreadPool(
+            max_workers=max_workers,
+            thread_name_prefix="perception",
+            initializer=self.backend.init_thread
+        )
+        # Scans still running from an earlier (or a concurrent) capture, keyed by window
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+        # Background-maintained installed/taskbar apps (skills/app_index.py)
+        self.app_index = app_index
+
+        # Deep scan for the focused window, title-only for the rest.
+        # Depth adapts to half the deadline so the focused scan fits inside it.
+        self.scan_policy = scan_policy or ScanPolicy(target_ms=(deadline_ms / 2) if deadline_ms else 350)
 
-    def capture_state(self):
-        """Captures the current OS state into structured JSON."""
+    def invalidate(self):
+        """Drops the window cache so the next capture re-reads every window."""
+        self.cache.clear()
+
+    def capture_state(self, deadline_ms=None):
+        """
+        Captures the current OS state as an immutable Snapshot.
+        Unchanged windows are shared with earlier snapshots. With a deadline,
+        windows whose scan has not finished in time are returned with their
+        last known controls (or none) and flagged "partial".
+        """
         logger.info("Capturing structured OS state...")
+        deadline_ms = deadline_ms or self.deadline_ms
+        start = time.monotonic()
+        deadline = start + deadline_ms / 1000.0 if deadline_ms else None
         
         try:
-            # 1. System Info
-            state = {
-                "system": {
-                    "os": self.os_info["os"],
-                    "time": datetime.datetime.now().strftime("%H:%M:%S"),
-                    "focused_app": self._get_focused_app()
-                },
-                "open_windows": self._get_open_windows(),
-                "taskbar_apps": self._get_taskbar_apps(), # Placeholder for now as this is tricky
-                "installed_apps": [] # Placeholder, scanning takes time
-            }
+            focused_window = self._get_focused_window()
+            focused_key = self._window_key(focused_window) if focused_window else None
+            state = Snapshot(
+                # 1. System Info
+                os=self.os_info["os"],
+                time=datetime.datetime.now().strftime("%H:%M:%S"),
+                focused_app=self._get_focused_app(focused_window),
+                open_windows=self._get_open_windows(deadline, focused_key),
+                taskbar_apps=self._get_taskbar_apps(),
+                installed_apps=self._get_installed_apps()
+            )
+            self.scan_policy.record_latency((time.monotonic() - start) * 1000)
             return state
         except Exception as e:
             logger.error(f"Error capturing state: {e}")
-            return {"error": str(e)}
+            return Snapshot.failed(e)
 
-    def _get_focused_app(self):
+    def _get_focused_window(self):
+        try:
+            return self.backend.get_focused_window()
+        except:
+            return None
+
+    def _get_focused_app(self, window):
         try:
-            window = auto.GetFocusedControl().GetTopLevelControl()
             return window.Name if window else "Unknown"
         except:
             return "Unknown"
 
-    def _get_open_windows(self):
+    def _get_open_windows(self, deadline=None, focused_key=None):
         windows = []
+        refresh = {"refreshed": [], "reused": [], "removed": [], "partial": []}
+        live_keys = set()
         try:
-            # Enumerate top-level windows
-            root = auto.GetRootControl()
-            for window in root.GetChildren():
+            # Enumerate top-level windows, fan the per-window scans out over the pool
+            pending = []
+            for window in self.backend.get_top_level_windows():
                 if window.ControlTypeName == "WindowControl" and window.Name: # Filter valid windows
-                     # Basic info
-                    win_info = {
-                        "title": window.Name,
-                        "process_id": window.ProcessId,
-                        "class_name": window.ClassName,
-                        "controls": self._get_simple_controls(window)
-                    }
+                    key = self._window_key(window)
+                    live_keys.add(key)
+                    with self._inflight_lock:
+                        future = self._inflight.get(key)
+                        if future is None or future.done():
+                            mode = self.scan_policy.mode_for(key == focused_key)
+                            future = self._pool.submit(self._scan_window, window, key, mode)
+                            self._inflight[key] = future
+                    pending.append((key, window.Name, future))
+
+            timeout = max(0.0, deadline - time.monotonic()) if deadline else None
+            wait([future for _, _, future in pending], timeout=timeout)
+
+            for key, title, future in pending:
+                if future.done() and not future.exception():
+                    self._forget_scan(key, future)
+                    win_info, refreshed = future.result()
+                    refresh["refreshed" if refreshed else "reused"].append(title)
                     windows.append(win_info)
+                else:
+                    if future.done():
+                        self._forget_scan(key, future)
+                        logger.debug(f"Scan of window '{title}' failed: {future.exception()}")
+                    # Timed out (or failed): fall back to whatever we knew about this window.
+                    # A late scan still lands in the cache for the next capture.
+                    stale = self.cache.peek(key)
+                    if stale:
+                        win_info = stale.replace(title=title, partial=True)
+                    else:
+                        win_info = WindowInfo(title, partial=True, handle=key)
+                    refresh["partial"].append(title)
+                    windows.append(win_info)
+
+            # Forget scans for windows that have since closed
+            with self._inflight_lock:
+                for key in list(self._inflight):
+                    if key not in live_keys:
+                        del self._inflight[key]
+            refresh["removed"] = self.cache.prune(live_keys)
         except Exception as e:
             logger.error(f"Error getting windows: {e}")
+
+        self.last_refresh = refresh
+        logger.debug(f"Perception cache: {len(refresh['refreshed'])} refreshed, "
+                     f"{len(refresh['reused'])} reused, {len(refresh['removed'])} removed, "
+                     f"{len(refresh['partial'])} partial")
+        if refresh["partial"]:
+            logger.warning(f"Perception deadline hit; partial windows: {refresh['partial']}")
         return windows
 
-    def _get_simple_controls(self, window_control):
+    def _forget_scan(self, key, future):
+        # Only if no newer scan of the window has replaced it meanwhile
+        with self._inflight_lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _scan_window(self, window, key, mode):
+        """Runs on a pool thread. Returns (win_info, refreshed)."""
+        kind, depth, node_budget = mode
+        children = None
+        max_age = None
+        # Only re-read the window if its handle, title, child count or scan mode changed
+        if kind == "title":
+            signature = (window.Name, kind)
+        else:
+            children = self._get_children(window)
+            signature = (window.Name, len(children), kind, depth)
+            if kind == "deep":
+                max_age = self.scan_policy.deep_max_age
+        win_info = self.cache.lookup(key, signature, max_age=max_age)
+        if win_info is not None:
+            return win_info, False
+
+        if kind == "deep":
+            controls = self._get_deep_controls(children, depth, node_budget)
+        elif kind == "shallow":
+            controls = self._get_simple_controls(children)
+        else:
+            controls = ()
+        win_info = WindowInfo(
+            title=window.Name,
+            process_id=window.ProcessId,
+            class_name=window.ClassName,
+            controls=controls,
+            handle=key
+        )
+        self.cache.store(key, signature, win_info)
+        return win_info, True
+
+    def _window_key(self, window):
+        # Native handle is the stable identity; fall back to process/class/title if missing
+        handle = getattr(window, "NativeWindowHandle", 0)
+        if handle:
+            return handle
+        return (window.ProcessId, window.ClassName, window.Name)
+
+    def _get_children(self, control):
+        try:
+            return control.GetChildren()
+        except:
+            return []
+
+    def _get_simple_controls(self, children):
         # Limited depth extraction to avoid performance hit
         controls = []
         try:
-            # Get first level children
-            for child in window_control.GetChildren():
-                if child.ControlTypeName in ["ButtonControl", "EditControl", "ListControl", "MenuItemControl"]:
-                    controls.append({
-                        "type": child.ControlTypeName.replace("Control", "").lower(),
-                        "label": child.Name,
-                        "automation_id": child.AutomationId
-                    })
+            # First level children of the window
+            for child in children:
+                if child.ControlTypeName in INTERACTIVE_CONTROL_TYPES:
+                    controls.append(self._control_info(child))
         except:
             pass
         return controls
 
+    def _get_deep_controls(self, children, max_depth, node_budget):
+        """Breadth-first walk below the window, bounded by depth and visited-node budget."""
+        controls = []
+        queue = deque((child, 1) for child in children)
+        visited = 0
+        while queue and visited < node_budget:
+            node, depth = queue.popleft()
+            visited += 1
+            try:
+                if node.ControlTypeName in INTERACTIVE_CONTROL_TYPES:
+                    controls.append(self._control_info(node))
+            except:
+                continue
+            if depth < max_depth:
+                queue.extend((child, depth + 1) for child in self._get_children(node))
+        return controls
+
+    def _control_info(self, control):
+        return ControlInfo(
+            type=control.ControlTypeName.replace("Control", "").lower(),
+            label=control.Name,
+            automation_id=control.AutomationId
+        )
+
     def _get_taskbar_apps(self):
+        if self.app_index:
+            return self.app_index.get_taskbar_apps()
         # Placeholder implementation
         return ["Explorer", "Chrome", "VS Code"]
 
+    def _get_installed_apps(self):
+        # Read from the background index; never scan on the hot path
+        if self.app_index:
+            return self.app_index.get_apps()
+        return ()
+
 if __name__ == "__main__":
     sp = StructuredPerception()
     print(sp.capture_state())
@@ -0,0 +1,151 @@
+import os
+import random
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.logger import logger
+
+class UIBackend(ABC):
+    """
+    The slice of the accessibility layer StructuredPerception depends on.
+    Nodes handed out by a backend behave like uiautomation Controls: they expose
+    Name, ControlTypeName, AutomationId, ClassName, ProcessId, NativeWindowHandle
+    and GetChildren().
+    """
+
+    @abstractmethod
+    def get_top_level_windows(self):
+        """Returns the direct children of the desktop root."""
+        pass
+
+    @abstractmethod
+    def get_focused_window(self):
+        """Returns the top-level window owning keyboard focus, or None."""
+        pass
+
+    def init_thread(self):
+        """Prepares the calling worker thread for UI queries. No-op by default."""
+        pass
+
+class UIAutomationBackend(UIBackend):
+    """Live Windows desktop via the uiautomation package."""
+
+    def __init__(self):
+        import uiautomation as auto
+        self.auto = auto
+        self._thread_state = threading.local()
+
+    def init_thread(self):
+        # COM must be initialized on every thread that talks to UI Automation.
+        # Keep the initializer alive for the life of the worker thread.
+        self._thread_state.initializer = self.auto.UIAutomationInitializerInThread(debug=False)
+
+    def get_top_level_windows(self):
+        return self.auto.GetRootControl().GetChildren()
+
+    def get_focused_window(self):
+        focused = self.auto.GetFocusedControl()
+        return focused.GetTopLevelControl() if focused else None
+
+class SyntheticControl:
+    """
+    In-memory stand-in for a uiautomation Control.
+    `latency` (seconds) is slept on every GetChildren call to mimic the cost of
+    a cross-process UI Automation query.
+    """
+
+    def __init__(self, name, control_type="WindowControl", automation_id="", class_name="",
+                 process_id=0, handle=0, children=None, latency=0.0):
+        self.Name = name
+        self.ControlTypeName = control_type
+        self.AutomationId = automation_id
+        self.ClassName = class_name
+        self.ProcessId = process_id
+        self.NativeWindowHandle = handle
+        self.children = list(children or [])
+        self.latency = latency
+
+    def GetChildren(self):
+        if self.latency:
+            time.sleep(self.latency)
+        return list(self.children)
+
+    def __repr__(self):
+        return f"SyntheticControl({self.ControlTypeName}, {self.Name!r})"
+
+class InMemoryUIBackend(UIBackend):
+    """
+    Serves a synthetic UI tree built from SyntheticControl nodes.
+    Callers mutate the tree (add/remove windows, rename, change children) between
+    captures to exercise the perception cache without a live desktop.
+    """
+
+    def __init__(self, windows=None, focused=None):
+        self.windows = list(windows or [])
+        self.focused = focused
+
+    def get_top_level_windows(self):
+        return list(self.windows)
+
+    def get_focused_window(self):
+        return self.focused
+
+SYNTHETIC_CONTROL_TYPES = [
+    "ButtonControl", "EditControl", "ListControl", "MenuItemControl", "TabItemControl",
+    "HyperlinkControl", "PaneControl", "GroupControl", "TextControl", "ImageControl"
+]
+SYNTHETIC_APPS = [
+    "Notepad", "Google Chrome", "Visual Studio Code", "Spotify", "File Explorer",
+    "WhatsApp", "Microsoft Word", "Excel", "Terminal", "Settings"
+]
+
+def build_synthetic_desktop(windows=10, fan_out=5, depth=2, latency_ms=0.0, seed=0):
+    """
+    Builds a deterministic synthetic desktop for benchmarks.
+    Every window has `fan_out` children per level down to `depth` levels, and
+    every GetChildren call sleeps `latency_ms`. The first window is focused.
+    """
+    rng = random.Random(seed)
+    latency = latency_ms / 1000.0
+
+    def build_children(prefix, level):
+        if level > depth:
+            return []
+        children = []
+        for i in range(fan_out):
+            control_type = rng.choice(SYNTHETIC_CONTROL_TYPES)
+            label = f"{control_type.replace('Control', '')} {prefix}.{i}"
+            children.append(SyntheticControl(
+                name=label,
+                control_type=control_type,
+                automation_id=f"{control_type[:-7].lower()}_{prefix.replace('.', '_')}_{i}",
+                children=build_children(f"{prefix}.{i}", level + 1),
+                latency=latency
+            ))
+        return children
+
+    top_level = []
+    for index in range(windows):
+        app = SYNTHETIC_APPS[index % len(SYNTHETIC_APPS)]
+        top_level.append(SyntheticControl(
+            name=f"Document {index} - {app}",
+            class_name=app.replace(" ", ""),
+            process_id=1000 + index,
+            handle=0x10000 + index,
+            children=build_children(str(index), 1),
+            latency=latency
+        ))
+    return InMemoryUIBackend(top_level, focused=top_level[0] if top_level else None)
+
+def create_default_backend():
+    """Returns the live uiautomation backend."""
+    try:
+        return UIAutomationBackend()
+    except ImportError as e:
+        logger.error(f"uiautomation unavailable ({e}). Falling back to an empty UI tree.")
+        return InMemoryUIBackend()
@@ -0,0 +1,227 @@
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.logger import logger
+
+class PollBackoff:
+    """Poll intervals in seconds: start at `initial`, grow by `factor`, capped at `maximum`."""
+
+    def __init__(self, initial=0.05, factor=1.5, maximum=0.5):
+        self.initial = initial
+        self.factor = factor
+        self.maximum = maximum
+
+    def intervals(self):
+        interval = self.initial
+        while True:
+            yield interval
+            interval = min(self.maximum, interval * self.factor)
+
+DEFAULT_BACKOFF = PollBackoff()
+# Process scans and deep control searches cost more per poll
+SLOW_BACKOFF = PollBackoff(initial=0.1, factor=1.5, maximum=1.0)
+
+def wait_until(predicate, timeout=5.0, poll_backoff=None, description=None):
+    """
+    Polls `predicate` until it returns something truthy or `timeout` seconds
+    pass, sleeping per `poll_backoff` in between. Returns the truthy value, or
+    None on timeout. Exceptions from the predicate count as "not yet" (UI
+    queries often fail while a window is still being created). With
+    timeout <= 0 the predicate is checked exactly once.
+    """
+    backoff = poll_backoff or DEFAULT_BACKOFF
+    label = description or getattr(predicate, "description", None) or getattr(predicate, "__name__", "condition")
+    start = time.monotonic()
+    deadline = start + max(0.0, timeout)
+    for interval in backoff.intervals():
+        try:
+            result = predicate()
+        except Exception as e:
+            logger.debug(f"Wait for {label}: check failed ({e})")
+            result = None
+        if result:
+            logger.debug(f"Waited {time.monotonic() - start:.2f}s for {label}")
+            return result
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            logger.debug(f"Gave up waiting for {label} after {timeout}s")
+            return None
+        time.sleep(min(interval, remaining))
+
+def _described(check, description):
+    check.description = description
+    return check
+
+_default_backend = None
+_default_backend_lock = threading.Lock()
+
+def get_default_backend():
+    """Shared live UI backend for predicates that weren't given one."""
+    global _default_backend
+    with _default_backend_lock:
+        if _default_backend is None:
+            from skills.ui_backend import create_default_backend
+            _default_backend = create_default_backend()
+        return _default_backend
+
+def _title(window):
+    return (getattr(window, "Name", "") or "").lower()
+
+# --- Ready-made predicates ---
+
+def window_appears(title, backend=None):
+    """Satisfied (returns the window) once a top-level window title contains `title`."""
+    needle = title.lower()
+    def check():
+        for window in (backend or get_default_backend()).get_top_level_windows():
+            if needle in _title(window):
+                return window
+        return None
+    return _described(check, f"window '{title}' to appear")
+
+def window_closed(title, backend=None):
+    """Satisfied once no top-level window title contains `title`."""
+    needle = title.lower()
+    def check():
+        return not any(needle in _title(w) for w in (backend or get_default_backend()).get_top_level_windows())
+    return _described(check, f"window '{title}' to close")
+
+def window_focused(title, backend=None):
+    """Satisfied (returns the window) once the focused top-level window's title contains `title`."""
+    needle = title.lower()
+    def check():
+        window = (backend or get_default_backend()).get_focused_window()
+        return window if window is not None and needle in _title(window) else None
+    return _described(check, f"'{title}' to be focused")
+
+def focus_changed(backend=None):
+    """Satisfied once keyboard focus moved to a different top-level window than when this was created."""
+    ui = backend or get_default_backend()
+
+    def identity(window):
+        if window is None:
+            return None
+        return (getattr(window, "NativeWindowHandle", None), _title(window))
+
+    try:
+        baseline = identity(ui.get_focused_window())
+    except Exception:
+        baseline = None
+
+    def check():
+        current = identity(ui.get_focused_window())
+        return current is not None and current != baseline
+    return _described(check, "focus to change")
+
+def process_exists(name, process_table=None):
+    """Satisfied once a process matching `name` (exact, alias or prefix) is running."""
+    def check():
+        from skills.process_table import get_process_table
+        table = process_table or get_process_table()
+        table.refresh(force=True)
+        return table.is_running(name)
+    return _described(check, f"process '{name}' to start")
+
+def _walk(windows, max_depth, max_nodes, within=None):
+    """Breadth-first (node, inside `within`) pairs under `windows`, bounded by depth and node count."""
+    queue = deque((w, 0, within is None) for w in windows)
+    visited = 0
+    while queue and visited < max_nodes:
+        node, depth, inside = queue.popleft()
+        visited += 1
+        inside = inside or getattr(node, "ControlTypeName", None) == within
+        yield node, inside
+        if depth < max_depth:
+            queue.extend((child, depth + 1, inside) for child in node.GetChildren())
+
+def _scoped_windows(backend, scope):
+    return [w for w in (backend or get_default_backend()).get_top_level_windows()
+            if scope is None or scope in _title(w)]
+
+def control_exists(name, control_type=None, window_title=None, backend=None, max_depth=12, max_nodes=2000,
+                   within=None, focused=False):
+    """
+    Satisfied (returns the control) once a control whose name contains `name`
+    (and of `control_type`, if given) exists in a window whose title contains
+    `window_title` (any window if None). `within` limits matches to the subtree
+    of a control of that type (e.g. "DocumentControl" for web page content, so
+    the browser's own address bar can't match); `focused` additionally requires
+    keyboard focus. The breadth-first search is bounded by `max_depth` and
+    `max_nodes` per poll (each node is a cross-process UIA call).
+    """
+    needle = name.lower()
+    scope = window_title.lower() if window_title else None
+    def check():
+        for node, inside in _walk(_scoped_windows(backend, scope), max_depth, max_nodes, within):
+            if (inside and needle in _title(node) and
+                    (control_type is None or getattr(node, "ControlTypeName", None) == control_type) and
+                    (not focused or getattr(node, "HasKeyboardFocus", False))):
+                return node
+        return None
+    return _described(check, f"control '{name}' to {'have focus' if focused else 'exist'}")
+
+def search_results_show(name, item_type="ListItemControl", window_title=None, backend=None, max_depth=12,
+                        max_nodes=2000, within=None):
+    """
+    Satisfied (returns the item) once the `item_type` controls in the scoped
+    window differ from what they were when this predicate was created, have
+    stayed the same for two polls, and one of them contains `name`. Create it
+    before typing a search query: a chat list that already shows `name` (a
+    recent chat) can't satisfy it until the search has actually filtered the
+    list, so Enter doesn't open whatever happened to be listed first.
+    `baseline` holds the item names seen at creation (empty if the list
+    isn't exposed as `item_type` controls, so the condition can't be judged).
+    """
+    needle = name.lower()
+    scope = window_title.lower() if window_title else None
+
+    def items():
+        return [node for node, inside in _walk(_scoped_windows(backend, scope), max_depth, max_nodes, within)
+                if inside and getattr(node, "ControlTypeName", None) == item_type]
+
+    baseline = tuple(_title(item) for item in items())
+    state = {"last": None}
+    def check():
+        current = items()
+        names = tuple(_title(item) for item in current)
+        previous, state["last"] = state["last"], names
+        if names == baseline or names != previous:
+            return None
+        return next((item for item in current if needle in _title(item)), None)
+    check.baseline = baseline
+    return _described(check, f"search results to show '{name}'")
+
+def screen_settled(change_detector):
+    """Satisfied once two consecutive screen fingerprints match (nothing is animating or loading)."""
+    state = {"last": change_detector.capture()}
+    def check():
+        current = change_detector.capture()
+        previous, state["last"] = state["last"], current
+        return current is None or not change_detector.changed(previous, current)
+    return _described(check, "screen to settle")
+
+def clipboard_contains(text):
+    """Satisfied once the clipboard holds `text`."""
+    def check():
+        import pyperclip
+        return pyperclip.paste() == text
+    return _described(check, "clipboard to update")
+
+def any_of(*predicates):
+    """Satisfied as soon as any of `predicates` is (returns its value)."""
+    def check():
+        for predicate in predicates:
+            try:
+                result = predicate()
+            except Exception:
+                result = None
+            if result:
+                return result
+        return None
+    return _described(check, " or ".join(getattr(p, "description", "condition") for p in predicates))
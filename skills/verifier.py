@@ -10,8 +10,8 @@ from utils.logger import logger
 from skills.structured_perception import StructuredPerception
 
 class Verifier:
-    def __init__(self):
-        self.perception = StructuredPerception()
+    def __init__(self, perception=None):
+        self.perception = perception or StructuredPerception()
 
     def verify(self, plan, initial_state, final_state):
         """Verifies if the plan execution was successful."""
@@ -82,6 +82,38 @@ class Verifier:
         # Default assume success for now unless explicit failure check implemented
         return True
 
+    def check_expectations(self, plan, final_state):
+        """
+        Checks the post-conditions a plan declares under "expect", e.g.
+        {"window_open": "Notepad", "focused": "Notepad", "window_closed": "Calculator"}.
+        Values may be a string or a list of strings; matching is a case-insensitive
+        substring test against window titles / the focused app. No "expect" = passes.
+        """
+        expect = plan.get("expect") or {}
+        if not isinstance(expect, dict):
+            return True
+
+        titles = [str(win.get("title", "")).lower() for win in final_state.get("open_windows", []) or []]
+        focused_app = str((final_state.get("system", {}) or {}).get("focused_app", "") or "").lower()
+
+        def values(key):
+            value = expect.get(key) or []
+            return [str(v).lower() for v in (value if isinstance(value, list) else [value])]
+
+        for name in values("window_open"):
+            if not any(name in title for title in titles):
+                logger.warning(f"Checkpoint failed: expected a window matching '{name}'.")
+                return False
+        for name in values("window_closed"):
+            if any(name in title for title in titles):
+                logger.warning(f"Checkpoint failed: '{name}' is still open.")
+                return False
+        for name in values("focused"):
+            if name not in focused_app:
+                logger.warning(f"Checkpoint failed: expected '{name}' to be focused, got '{focused_app}'.")
+                return False
+        return True
+
 if __name__ == "__main__":
     verifier = Verifier()
     # Test logic
@@ -1,14 +1,19 @@
 import os
-from google import genai
-import pyautogui
-from PIL import Image
 import json
 import sys
+import threading
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from utils.logger import logger
+from utils.lazy_import import lazy_import
+from skills.snapshot import dumps_state
+
+# Vision is a fallback: the Gemini SDK, Pillow and pyautogui load the first time it runs
+genai = lazy_import("google.genai")
+pyautogui = lazy_import("pyautogui")
+Image = lazy_import("PIL.Image")
 
 class VisionFallback:
     def __init__(self, config_path="d:/Ceaser-AI/openclaw/config.yaml"):
@@ -17,14 +22,27 @@ class VisionFallback:
             self.config = yaml.safe_load(f)
         
         self.api_key = os.getenv("GEMINI_API_KEY") or self.config['llm']['gemini']['api_key']
+        self._client = None
+        self._client_lock = threading.Lock()
         if self.api_key == "${GEMINI_API_KEY}":
             logger.warning("GEMINI_API_KEY not set. Vision fallback disabled.")
-            self.client = None
+            self.api_key = None
             self.model_name = None
         else:
-            self.client = genai.Client(api_key=self.api_key)
             self.model_name = self.config['llm']['gemini']['vision_model']
 
+    @property
+    def client(self):
+        """The Gemini client, created on first use (None when no API key is configured)."""
+        if self._client is None and self.api_key:
+            with self._client_lock:
+                if self._client is None:
+                    # Optional base_url points the client at a compatible endpoint (e.g. benchmarks/mock_llm_server.py)
+                    base_url = self.config['llm']['gemini'].get('base_url')
+                    http_options = {"base_url": base_url} if base_url else None
+                    self._client = genai.Client(api_key=self.api_key, http_options=http_options)
+        return self._client
+
     def fallback(self, goal, current_state, image_path=None):
         if not self.client:
             logger.warning("Vision fallback triggered but not configured.")
@@ -49,7 +67,7 @@ class VisionFallback:
 GOAL: {goal}
 
 The current structured state is:
-{json.dumps(current_state, indent=2)}
+{dumps_state(current_state, indent=2)}
 
 The execution of the last plan FAILED or is stuck.
 Analyze the screenshot to determine what went wrong and suggest a corrective action.
@@ -0,0 +1,65 @@
+import os
+import sys
+import threading
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from skills.action_scheduler import ActionScheduler, depends_on, is_ui_bound
+from skills.actions.base import INPUT, FOCUS, NETWORK, FILESYSTEM, scoped
+from skills.actions.implementations import WriteFileAction, FileParams
+
+def write(path):
+    return WriteFileAction(None).resources_for(FileParams(file_path=path, content="x"))
+
+def test_ui_bound():
+    assert is_ui_bound({INPUT, FOCUS})
+    assert is_ui_bound({FOCUS, NETWORK})
+    assert not is_ui_bound(write("a.txt"))
+    assert not is_ui_bound({NETWORK})
+
+def test_dependencies_follow_batch_order():
+    # Writes to different files, or independent API calls, may overlap
+    assert not depends_on(write("b.txt"), write("a.txt"))
+    assert not depends_on({NETWORK}, {NETWORK})
+    # A second write to the same file, or a network call after a write, may not
+    assert depends_on(write("a.txt"), write("a.txt"))
+    assert depends_on({NETWORK}, write("a.txt"))
+    # Writes don't wait for a network call before them
+    assert not depends_on(write("a.txt"), {NETWORK})
+
+def test_non_ui_work_runs_concurrently_and_ui_work_inline():
+    scheduler = ActionScheduler(max_workers=4)
+    caller = threading.current_thread()
+    threads = []
+
+    def task():
+        threads.append(threading.current_thread())
+        time.sleep(0.2)
+        return True
+
+    start = time.monotonic()
+    futures = [scheduler.submit(task, write(f"{i}.txt")) for i in range(3)]
+    assert all(f.result() for f in futures)
+    assert time.monotonic() - start < 0.5
+    assert caller not in threads
+
+    ui = scheduler.submit(task, {INPUT, FOCUS})
+    assert ui.done() and threads[-1] is caller
+
+def test_same_path_never_overlaps():
+    scheduler = ActionScheduler(max_workers=4)
+    events = []
+
+    def task(tag):
+        def run():
+            events.append(f"{tag}+")
+            time.sleep(0.1)
+            events.append(f"{tag}-")
+            return True
+        return run
+
+    futures = [scheduler.submit(task(tag), {FILESYSTEM, scoped(FILESYSTEM, "same.txt")}) for tag in "ab"]
+    assert all(f.result() for f in futures)
+    assert events in (["a+", "a-", "b+", "b-"], ["b+", "b-", "a+", "a-"])
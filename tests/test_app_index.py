@@ -0,0 +1,77 @@
+import os
+import shutil
+import sys
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from skills.app_index import InstalledAppIndex, SHORTCUT_EXTENSIONS
+from skills.ui_wait import wait_until
+from utils.database_manager import DatabaseManager
+
+def touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write("")
+
+def make_index(tmp_path, db, watch=True):
+    roots = [
+        {"path": str(tmp_path / "start_menu"), "source": "start_menu", "extensions": SHORTCUT_EXTENSIONS, "max_depth": 2},
+        {"path": str(tmp_path / "taskbar"), "source": "taskbar", "extensions": SHORTCUT_EXTENSIONS, "max_depth": 1},
+    ]
+    return InstalledAppIndex(db=db, roots=roots, watch=watch)
+
+def has_app(index, name, present=True):
+    return lambda: (name in index.get_apps()) == present
+
+def test_scan_persist_and_live_updates(tmp_path):
+    start_menu = tmp_path / "start_menu"
+    touch(str(start_menu / "Notepad.lnk"))
+    touch(str(start_menu / "Tools" / "Calculator.lnk"))
+    touch(str(start_menu / "Tools" / "Deep" / "Hidden.lnk"))  # beyond max_depth
+    touch(str(start_menu / "Tools" / "Uninstall Tools.lnk"))
+    touch(str(start_menu / "readme.txt"))
+    touch(str(tmp_path / "taskbar" / "Chrome.lnk"))
+    db = DatabaseManager(db_path=str(tmp_path / "history.db"))
+
+    # Initial scan
+    index = make_index(tmp_path, db)
+    index.start()
+    try:
+        assert index.ready.wait(10)
+        assert index.get_apps() == ("Calculator", "Notepad")
+        assert index.get_taskbar_apps() == ("Chrome",)
+
+        # Created / deleted shortcuts
+        touch(str(start_menu / "Paint.lnk"))
+        assert wait_until(has_app(index, "Paint"), timeout=5)
+        os.remove(str(start_menu / "Notepad.lnk"))
+        assert wait_until(has_app(index, "Notepad", present=False), timeout=5)
+
+        # A moved folder brings its shortcuts along, within the same depth limit as the scan
+        touch(str(tmp_path / "staging" / "Editor" / "Editor.lnk"))
+        touch(str(tmp_path / "staging" / "Editor" / "Deep" / "X.lnk"))
+        shutil.move(str(tmp_path / "staging" / "Editor"), str(start_menu / "Editor"))
+        assert wait_until(has_app(index, "Editor"), timeout=5)
+        os.rename(str(start_menu / "Tools"), str(start_menu / "Utilities"))
+        assert wait_until(has_app(index, "Calculator"), timeout=5)
+        too_deep = lambda: {"X", "Hidden"} & set(index.get_apps())
+        assert wait_until(too_deep, timeout=1) is None
+    finally:
+        index.stop()
+
+    # Persisted through DatabaseManager: a fresh index serves it before scanning
+    persisted = {row["name"] for row in db.load_installed_apps()}
+    assert persisted == {"Calculator", "Paint", "Editor", "Chrome"}
+    restarted = make_index(tmp_path, db, watch=False)
+    restarted.scan = lambda: 0
+    restarted.start()
+    assert restarted.get_apps() == ("Calculator", "Editor", "Paint")
+    assert restarted.get_taskbar_apps() == ("Chrome",)
+
+def test_add_path_respects_max_depth(tmp_path):
+    index = make_index(tmp_path, db=None, watch=False)
+    index.add_path(str(tmp_path / "start_menu" / "A" / "Ok.lnk"))
+    index.add_path(str(tmp_path / "start_menu" / "A" / "B" / "TooDeep.lnk"))
+    index.add_path(str(tmp_path / "elsewhere" / "Outside.lnk"))
+    assert index.get_apps() == ("Ok",)
@@ -0,0 +1,66 @@
+import os
+import sys
+import types
+
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from skills.fast_path_planner import FastPathPlanner, AppResolver
+from skills.ui_backend import InMemoryUIBackend, SyntheticControl
+from skills.actions.implementations import (
+    OpenAppAction, CloseAppAction, FocusAppAction, OpenUrlAction, PlayMediaAction, WriteFileAction
+)
+
+@pytest.fixture
+def planner():
+    installed = types.SimpleNamespace(get_apps=lambda: ("Notepad", "Google Chrome", "Spotify", "Calculator"),
+                                      get_taskbar_apps=lambda: ())
+    windows = InMemoryUIBackend([SyntheticControl("New Tab - Google Chrome"), SyntheticControl("Untitled - Notepad")])
+    resolver = AppResolver(app_index=installed, backend=windows)
+    return FastPathPlanner([OpenAppAction, CloseAppAction, FocusAppAction, OpenUrlAction, PlayMediaAction, WriteFileAction],
+                           app_resolver=resolver)
+
+@pytest.mark.parametrize("goal", [
+    "open notes.txt", "open main.py", "open report.pdf",
+    "run tests", "run notepad", "start timer", "close all windows",
+])
+def test_ambiguous_goals_go_to_the_llm(planner, goal):
+    assert planner.match(goal) is None
+    assert planner.plan(goal) is None
+
+@pytest.mark.parametrize("goal", [
+    "start over", "open a new window", "open new tab", "start menu", "exit full screen", "close the door",
+    "play next", "play it again",
+])
+def test_names_that_are_not_apps_go_to_the_llm(planner, goal):
+    assert planner.plan(goal) is None
+
+@pytest.mark.parametrize("goal, url", [
+    ("go to github.com", "https://github.com"),
+    ("open www.example.xyz", "https://www.example.xyz"),
+    ("visit docs.python.org/3/", "https://docs.python.org/3/"),
+    ("open http://localhost:8000", "http://localhost:8000"),
+])
+def test_urls(planner, goal, url):
+    assert planner.match(goal)[1] == {"action": "open_url", "parameters": {"url": url}}
+
+@pytest.mark.parametrize("goal, action, app", [
+    ("Open Notepad", "open_app", "Notepad"),
+    ("launch spotify", "open_app", "spotify"),
+    ("close chrome", "close_app", "chrome"),
+    ("switch to the calculator app", "focus_app", "calculator"),
+    ("open chrome please", "open_app", "chrome"),
+    ("open file explorer", "open_app", "file explorer"),
+])
+def test_single_app_goals(planner, goal, action, app):
+    assert planner.plan(goal)["parameters"] == {"app_name": app}
+    assert planner.match(goal)[1] == {"action": action, "parameters": {"app_name": app}}
+
+def test_compound_goal_is_not_fast_pathed(planner):
+    assert planner.plan("Open Notepad and type Hello World") is None
+
+def test_repeated_success_becomes_done(planner):
+    history = [{"status": "success", "log": {"plan": {"action": "open_app", "parameters": {"app_name": "Notepad"}}}}]
+    assert planner.plan("Open Notepad", history)["action"] == "done"
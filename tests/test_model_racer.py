@@ -0,0 +1,100 @@
+import os
+import sys
+import time
+
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from skills.groq_planner import GroqPlanner, StreamAbandoned
+from skills.model_scheduler import reset_model_scheduler
+from skills.structured_perception import StructuredPerception
+from skills.ui_backend import build_synthetic_desktop
+from benchmarks.mock_llm_server import MockLLMServer, ModelBehavior
+from benchmarks.planner_config import write_config
+
+PRIMARY, BACKUP = "llama-3.3-70b-versatile", "llama-3.1-70b-versatile"
+
+@pytest.fixture
+def race_against(tmp_path):
+    """Starts a mock server where PRIMARY behaves as given, returns (server, planner, calls)."""
+    servers, planners = [], []
+
+    def start(primary):
+        server = MockLLMServer(models={PRIMARY: primary}, default=ModelBehavior(latency_ms=50))
+        server.start()
+        servers.append(server)
+        config_path = write_config(server.url, str(tmp_path), {
+            "hedging": {"enabled": True, "initial_delay_ms": 200, "min_delay_ms": 100},
+            "plan_cache": {"enabled": False},
+            "decomposition_cache": {"enabled": False}
+        })
+        reset_model_scheduler()
+        planner = GroqPlanner(config_path=config_path)
+        planner.sub_plan = ["test"]  # skip decomposition
+        planner.current_goal = "test"
+        planners.append(planner)
+
+        # When each model's request started, and how it ended: "answered" or the exception it raised
+        calls = {"started": {}, "outcome": {}}
+        stream_plan = planner._stream_plan
+        def recording_stream_plan(model, *args):
+            calls["started"][model] = time.perf_counter()
+            try:
+                result = stream_plan(model, *args)
+            except Exception as e:
+                calls["outcome"][model] = e
+                raise
+            calls["outcome"][model] = "answered"
+            return result
+        planner._stream_plan = recording_stream_plan
+        return server, planner, calls
+
+    yield start
+    for planner in planners:
+        planner.model_racer.shutdown()
+    for server in servers:
+        server.stop()
+    reset_model_scheduler()
+
+@pytest.fixture(scope="module")
+def state():
+    return StructuredPerception(backend=build_synthetic_desktop(windows=3)).capture_state()
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return condition()
+
+def test_slow_primary_is_hedged_and_the_faster_model_wins(race_against, state):
+    server, planner, calls = race_against(ModelBehavior(latency_ms=2000))
+    start = time.perf_counter()
+    plan = planner.plan("test", state)
+    elapsed = time.perf_counter() - start
+
+    assert "action" in plan
+    assert planner.last_model == BACKUP
+    assert planner.model_racer.hedges == 1
+    assert elapsed < 1.5
+
+def test_rate_limited_primary_moves_on_to_the_next_model(race_against, state):
+    server, planner, calls = race_against(ModelBehavior(latency_ms=50, rate_limit=1.0))
+    plan = planner.plan("test", state)
+
+    assert "action" in plan
+    assert server.rate_limited == 1
+    assert isinstance(calls["outcome"][PRIMARY], Exception)
+    assert planner.last_model == BACKUP
+    # The 429 fired the next model right away, not after the 200 ms hedge delay
+    assert calls["started"][BACKUP] - calls["started"][PRIMARY] < 0.15
+
+def test_losing_request_is_cancelled(race_against, state):
+    server, planner, calls = race_against(ModelBehavior(latency_ms=800))
+    planner.plan("test", state)
+
+    assert calls["outcome"][BACKUP] == "answered"
+    # Once the primary starts streaming it sees the race is lost and closes its stream
+    assert wait_for(lambda: PRIMARY in calls["outcome"])
+    assert isinstance(calls["outcome"][PRIMARY], StreamAbandoned)
@@ -0,0 +1,65 @@
+import os
+import sys
+import types
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import psutil
+from skills import process_table, app_launcher
+from skills.process_table import ProcessTable
+from skills.app_launcher import AppLauncher
+
+class FakeProcesses:
+    """Stands in for psutil's process listing: pid -> (create time, name)."""
+
+    def __init__(self, processes):
+        self.processes = dict(processes)
+        self.killed = []
+        self.NoSuchProcess = psutil.NoSuchProcess
+        self.AccessDenied = psutil.AccessDenied
+        self.ZombieProcess = psutil.ZombieProcess
+
+    def pids(self):
+        return list(self.processes)
+
+    def Process(self, pid):
+        if pid not in self.processes:
+            raise psutil.NoSuchProcess(pid)
+        created, name = self.processes[pid]
+        return types.SimpleNamespace(create_time=lambda: created, name=lambda: name,
+                                     kill=lambda: self.killed.append(pid))
+
+def test_reused_pid_is_indexed_as_a_new_process(monkeypatch):
+    fake = FakeProcesses({100: (1.0, "notepad.exe")})
+    monkeypatch.setattr(process_table, "psutil", fake)
+    table = ProcessTable()
+    table.refresh(force=True)
+    assert table.find("notepad") == {100}
+
+    # Notepad exits and its PID goes to another process before the next refresh
+    fake.processes[100] = (2.0, "svchost.exe")
+    table.refresh(force=True)
+    assert table.find("notepad") == set()
+    assert table.find("svchost") == {100}
+
+def test_close_app_does_not_kill_a_reused_pid(monkeypatch):
+    fake = FakeProcesses({100: (1.0, "notepad.exe")})
+    monkeypatch.setattr(process_table, "psutil", fake)
+    monkeypatch.setattr(app_launcher, "psutil", fake)
+    table = ProcessTable()
+    launcher = AppLauncher(process_table=table)
+
+    # The PID is reused between the table's refresh and the kill
+    refresh = table.refresh
+    def refresh_then_reuse(force=False):
+        refresh(force)
+        fake.processes[100] = (2.0, "svchost.exe")
+    monkeypatch.setattr(table, "refresh", refresh_then_reuse)
+    assert not launcher.close_app("notepad")
+    assert fake.killed == []
+
+    monkeypatch.setattr(table, "refresh", refresh)
+    fake.processes[200] = (3.0, "notepad.exe")
+    assert launcher.close_app("notepad")
+    assert fake.killed == [200]
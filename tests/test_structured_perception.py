@@ -0,0 +1,114 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+
+from skills.ui_backend import InMemoryUIBackend, SyntheticControl
+from skills.structured_perception import StructuredPerception
+from skills.scan_policy import ScanPolicy
+
+def desktop():
+    """Three windows with a couple of first-level controls each."""
+    return InMemoryUIBackend([
+        SyntheticControl(name, handle=handle, children=[
+            SyntheticControl("OK", control_type="ButtonControl"),
+            SyntheticControl("Name", control_type="EditControl"),
+        ]) for handle, name in ((1, "Notepad"), (2, "Calculator"), (3, "Chrome"))
+    ])
+
+def counting_perception(backend, scan_delay=0.0):
+    """Shallow-scanning perception that records each window scan as (title, refreshed)."""
+    perception = StructuredPerception(backend=backend, scan_policy=ScanPolicy(background_mode="shallow"))
+    scans = []
+    scan = perception._scan_window
+    def counted_scan(window, key, mode):
+        time.sleep(scan_delay)
+        win_info, refreshed = scan(window, key, mode)
+        scans.append((window.Name, refreshed))
+        return win_info, refreshed
+    perception._scan_window = counted_scan
+    return perception, scans
+
+def refreshed(scans):
+    return sorted(title for title, was_read in scans if was_read)
+
+def test_unchanged_windows_are_reused():
+    perception, scans = counting_perception(desktop())
+    first = perception.capture_state()
+    second = perception.capture_state()
+
+    assert refreshed(scans) == ["Calculator", "Chrome", "Notepad"]
+    assert perception.last_refresh["refreshed"] == []
+    assert sorted(perception.last_refresh["reused"]) == ["Calculator", "Chrome", "Notepad"]
+    # The same WindowInfo objects are shared between snapshots
+    assert all(a is b for a, b in zip(first.open_windows, second.open_windows))
+
+def test_changed_windows_are_rescanned():
+    backend = desktop()
+    perception, scans = counting_perception(backend)
+    perception.capture_state()
+    scans.clear()
+
+    notepad, calculator, _ = backend.windows
+    notepad.Name = "notes.txt - Notepad"
+    calculator.children.append(SyntheticControl("Equals", control_type="ButtonControl"))
+    state = perception.capture_state()
+
+    assert refreshed(scans) == ["Calculator", "notes.txt - Notepad"]
+    assert perception.last_refresh["reused"] == ["Chrome"]
+    calculator_info = next(w for w in state.open_windows if w.title == "Calculator")
+    assert "Equals" in [c.label for c in calculator_info.controls]
+
+def test_concurrent_captures_share_in_flight_scans():
+    perception, scans = counting_perception(desktop(), scan_delay=0.2)
+    barrier = threading.Barrier(2)
+    states = []
+
+    def capture():
+        barrier.wait()
+        states.append(perception.capture_state())
+
+    threads = [threading.Thread(target=capture) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # One scan per window, not one per caller
+    assert sorted(title for title, _ in scans) == ["Calculator", "Chrome", "Notepad"]
+    assert [w.title for w in states[0].open_windows] == [w.title for w in states[1].open_windows]
+
+# One window whose scan hangs for 8 s; the capture must return on its deadline
+# and the interpreter must still exit right after.
+HUNG_SCAN_SCRIPT = """
+import time
+from skills.ui_backend import build_synthetic_desktop
+from skills.structured_perception import StructuredPerception
+backend = build_synthetic_desktop(windows=5)
+perception = StructuredPerception(backend=backend, deadline_ms=200)
+scan = perception._scan_window
+hung = backend.get_top_level_windows()[1].Name
+def hanging_scan(window, key, mode):
+    if window.Name == hung:
+        time.sleep(8)
+    return scan(window, key, mode)
+perception._scan_window = hanging_scan
+start = time.monotonic()
+perception.capture_state()
+print("CAPTURE_S", time.monotonic() - start, perception.last_refresh["partial"] == [hung])
+"""
+
+def test_hung_window_scan_does_not_block_exit():
+    start = time.monotonic()
+    result = subprocess.run([sys.executable, "-c", HUNG_SCAN_SCRIPT], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, timeout=30)
+    elapsed = time.monotonic() - start
+    assert result.returncode == 0, result.stderr
+    capture_s, partial = result.stdout.split()[-2:]
+    assert float(capture_s) < 1.0
+    assert partial == "True"
+    assert elapsed < 5.0
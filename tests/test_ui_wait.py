@@ -0,0 +1,69 @@
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from skills.ui_backend import InMemoryUIBackend, SyntheticControl
+from skills.ui_wait import wait_until, control_exists, search_results_show
+
+def whatsapp_tab(page_children):
+    """A browser window showing WhatsApp Web: toolbar controls plus the page document."""
+    toolbar = SyntheticControl("Address and search bar", control_type="EditControl")
+    document = SyntheticControl("WhatsApp", control_type="DocumentControl", children=page_children)
+    return SyntheticControl("WhatsApp - Google Chrome", children=[toolbar, document])
+
+def test_browser_controls_do_not_satisfy_page_waits():
+    backend = InMemoryUIBackend([whatsapp_tab([])])
+    assert control_exists("Search", control_type="EditControl", window_title="WhatsApp", backend=backend)()
+    page_search = control_exists("Search", control_type="EditControl", window_title="WhatsApp",
+                                 within="DocumentControl", backend=backend)
+    assert wait_until(page_search, timeout=0) is None
+
+    search_box = SyntheticControl("Search input textbox", control_type="EditControl")
+    backend.windows = [whatsapp_tab([search_box])]
+    assert wait_until(page_search, timeout=0) is search_box
+
+def test_focused_requires_keyboard_focus():
+    search_box = SyntheticControl("Search input textbox", control_type="EditControl")
+    backend = InMemoryUIBackend([whatsapp_tab([search_box])])
+    focused_search = control_exists("Search", control_type="EditControl", within="DocumentControl",
+                                    focused=True, backend=backend)
+    assert wait_until(focused_search, timeout=0) is None
+    search_box.HasKeyboardFocus = True
+    assert wait_until(focused_search, timeout=0) is search_box
+
+def test_node_budget_bounds_each_poll():
+    deep = SyntheticControl("Target", control_type="ButtonControl")
+    fillers = [SyntheticControl(f"Item {i}", control_type="ListItemControl") for i in range(50)]
+    window = SyntheticControl("App", children=fillers + [deep])
+    backend = InMemoryUIBackend([window])
+    assert control_exists("Target", backend=backend, max_nodes=20)() is None
+    assert control_exists("Target", backend=backend, max_nodes=100)() is deep
+
+def chat_list(*names):
+    return [SyntheticControl(name, control_type="ListItemControl") for name in names]
+
+def test_prelisted_chat_does_not_satisfy_search_wait():
+    # "Bob" is a recent chat, so it's listed before anything is searched
+    backend = InMemoryUIBackend([whatsapp_tab(chat_list("Alice", "Bob", "Carol"))])
+    assert control_exists("Bob", window_title="WhatsApp", within="DocumentControl", backend=backend)()
+    results = search_results_show("Bob", window_title="WhatsApp", within="DocumentControl", backend=backend)
+    assert wait_until(results, timeout=0.3) is None
+
+    filtered = chat_list("Bob", "Bobby")
+    backend.windows = [whatsapp_tab(filtered)]
+    assert wait_until(results, timeout=1) is filtered[0]
+
+def test_browser_search_wait_aborts_when_search_never_applies(monkeypatch):
+    from skills import ui_wait
+    from skills.browser_controller import BrowserController
+    backend = InMemoryUIBackend([whatsapp_tab(chat_list("Alice", "Bob"))])
+    monkeypatch.setattr(ui_wait, "_default_backend", backend)
+    controller = BrowserController()
+
+    assert not controller._wait_for_whatsapp_search(lambda: None, "Bob", timeout=0.5)
+
+    def search():
+        backend.windows = [whatsapp_tab(chat_list("Bob"))]
+    assert controller._wait_for_whatsapp_search(search, "Bob", timeout=2)
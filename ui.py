@@ -1,5 +1,4 @@
 import streamlit as st
-import speech_recognition as sr
 import threading
 import time
 import queue
@@ -14,6 +13,9 @@ sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
 from main import Agent
 from utils.logger import logger
+from utils.lazy_import import lazy_import
+
+sr = lazy_import("speech_recognition")  # loaded when voice input is first used
 
 # --- Configuration ---
 st.set_page_config(
@@ -273,4 +275,4 @@ with col2:
     st.subheader("System State")
     if st.button("Get System Info"):
         state = st.session_state.agent.perception.capture_state()
-        st.json(state)
\ No newline at end of file
+        st.json(state.to_dict())
\ No newline at end of file
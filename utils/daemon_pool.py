@@ -0,0 +1,56 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+from utils.logger import logger
+
+class DaemonThreadPool:
+    """
+    Minimal thread pool whose workers are daemon threads. concurrent.futures'
+    ThreadPoolExecutor joins its workers at interpreter exit, so a single hung
+    task (a window that never answers UI Automation) would keep the process
+    alive forever; abandoned tasks here are simply dropped on exit.
+    submit() returns a regular Future, so wait()/as_completed() work as usual.
+    """
+
+    def __init__(self, max_workers=8, thread_name_prefix="worker", initializer=None):
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self.initializer = initializer
+        self._tasks = queue.Queue()
+        self._threads = []
+        self._idle = 0
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        self._tasks.put((future, fn, args, kwargs))
+        with self._lock:
+            # Workers are started on demand, up to max_workers
+            if self._idle == 0 and len(self._threads) < self.max_workers:
+                thread = threading.Thread(
+                    target=self._work,
+                    name=f"{self.thread_name_prefix}_{len(self._threads)}",
+                    daemon=True
+                )
+                self._threads.append(thread)
+                thread.start()
+            elif self._idle:
+                self._idle -= 1  # an idle worker will pick it up
+        return future
+
+    def _work(self):
+        if self.initializer:
+            try:
+                self.initializer()
+            except Exception as e:
+                logger.error(f"Worker initializer failed: {e}")
+        while True:
+            future, fn, args, kwargs = self._tasks.get()
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+            with self._lock:
+                self._idle += 1
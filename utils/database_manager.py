@@ -3,6 +3,12 @@ import json
 import time
 from utils.logger import logger
 
+def _to_jsonable(obj):
+    # Perception snapshots (and anything else with a cached dict form)
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    return str(obj)
+
 class DatabaseManager:
     def __init__(self, db_path="d:/Ceaser-AI/logs/aegis_history.db"):
         self.db_path = db_path
@@ -24,7 +30,16 @@ class DatabaseManager:
                     details TEXT
                 )
             ''')
-            
+
+            # Installed applications index (see skills/app_index.py)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS installed_apps (
+                    path TEXT PRIMARY KEY,
+                    name TEXT,
+                    source TEXT
+                )
+            ''')
+
             conn.commit()
             conn.close()
             logger.info(f"Database initialized at {self.db_path}")
@@ -37,8 +52,9 @@ class DatabaseManager:
             cursor = conn.cursor()
             
             # Convert dicts to JSON strings for storage
+            # Snapshots embedded in the step log reuse their cached dict form
             plan_str = json.dumps(plan) if isinstance(plan, (dict, list)) else str(plan)
-            details_str = json.dumps(details) if isinstance(details, (dict, list)) else str(details)
+            details_str = json.dumps(details, default=_to_jsonable) if isinstance(details, (dict, list)) else str(details)
             
             cursor.execute('''
                 INSERT INTO execution_history (timestamp, goal, plan, status, details)
@@ -75,6 +91,57 @@ class DatabaseManager:
             logger.error(f"Failed to fetch history: {e}")
             return []
 
+    def load_installed_apps(self):
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute('SELECT path, name, source FROM installed_apps')
+            rows = [dict(row) for row in cursor.fetchall()]
+            conn.close()
+            return rows
+        except Exception as e:
+            logger.error(f"Failed to load installed apps: {e}")
+            return []
+
+    def save_installed_apps(self, apps):
+        """Replaces the persisted installed apps index."""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM installed_apps')
+            cursor.executemany(
+                'INSERT OR REPLACE INTO installed_apps (path, name, source) VALUES (?, ?, ?)',
+                [(app["path"], app["name"], app["source"]) for app in apps]
+            )
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Failed to save installed apps: {e}")
+
+    def upsert_installed_app(self, path, name, source):
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute(
+                'INSERT OR REPLACE INTO installed_apps (path, name, source) VALUES (?, ?, ?)',
+                (path, name, source)
+            )
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Failed to update installed app {path}: {e}")
+
+    def delete_installed_app(self, path):
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM installed_apps WHERE path = ?', (path,))
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Failed to remove installed app {path}: {e}")
+
     def clear_history(self):
         """Clears all records from the execution_history table."""
         try:
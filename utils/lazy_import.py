@@ -0,0 +1,58 @@
+import importlib
+import threading
+import time
+
+from utils.logger import logger
+
+class LazyModule:
+    """
+    Stand-in for a heavy module that is only imported on first attribute
+    access, so `auto = lazy_import("uiautomation")` keeps `auto.Control(...)`
+    call sites unchanged while startup skips the import.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    start = time.perf_counter()
+                    self._module = importlib.import_module(self._name)
+                    logger.debug(f"Imported {self._name} on first use in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+def lazy_import(name):
+    """Returns a LazyModule for `name` (dotted names like "PIL.Image" work too)."""
+    return LazyModule(name)
+
+def warm_up(module_names, delay_seconds=0.0):
+    """
+    Imports `module_names` on a daemon thread, so deferred modules are usually
+    loaded by the time a skill needs them without blocking startup.
+    Failures (e.g. an optional package that isn't installed) are only logged.
+    """
+    def run():
+        if delay_seconds:
+            time.sleep(delay_seconds)
+        start = time.perf_counter()
+        for name in module_names:
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                logger.debug(f"Warm-up import of {name} failed: {e}")
+        logger.debug(f"Warm-up imported {len(module_names)} modules in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    thread = threading.Thread(target=run, name="import-warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,136 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from utils.logger import logger
+
+class PersistentLRUCache:
+    """
+    Size-bounded LRU cache with optional TTL, mirrored to a SQLite table so it
+    survives restarts. Values must be JSON-serializable. Reads are served from
+    memory; every write (and the recency bump on a hit) is persisted.
+    """
+
+    def __init__(self, db_path, table, max_entries=256, ttl_seconds=None):
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", table):
+            raise ValueError(f"Invalid cache table name: {table}")
+        self.db_path = db_path
+        self.table = table
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (value, stored_at)
+        self._lock = threading.Lock()
+        self._init_db()
+        self._load()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path)
+
+    def _init_db(self):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            conn = self._connect()
+            conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    key TEXT PRIMARY KEY,
+                    value TEXT,
+                    stored_at REAL,
+                    last_used REAL
+                )
+            ''')
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Failed to initialize cache table {self.table}: {e}")
+
+    def _load(self):
+        try:
+            conn = self._connect()
+            rows = conn.execute(
+                f'SELECT key, value, stored_at FROM {self.table} ORDER BY last_used DESC LIMIT ?',
+                (self.max_entries,)
+            ).fetchall()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Failed to load cache table {self.table}: {e}")
+            return
+        # Oldest first, so the most recently used entry ends up at the MRU end
+        for key, value, stored_at in reversed(rows):
+            if self._expired(stored_at):
+                continue
+            self._entries[key] = (json.loads(value), stored_at)
+
+    def _expired(self, stored_at):
+        return self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds
+
+    def _execute(self, sql, params):
+        try:
+            conn = self._connect()
+            conn.execute(sql, params)
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Cache write to {self.table} failed: {e}")
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, stored_at = entry
+            if self._expired(stored_at):
+                del self._entries[key]
+                self.misses += 1
+                expired = True
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                expired = False
+        if expired:
+            self._execute(f'DELETE FROM {self.table} WHERE key = ?', (key,))
+            return None
+        self._execute(f'UPDATE {self.table} SET last_used = ? WHERE key = ?', (time.time(), key))
+        return value
+
+    def put(self, key, value):
+        now = time.time()
+        evicted = []
+        with self._lock:
+            self._entries[key] = (value, now)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+        self._execute(
+            f'INSERT OR REPLACE INTO {self.table} (key, value, stored_at, last_used) VALUES (?, ?, ?, ?)',
+            (key, json.dumps(value), now, now)
+        )
+        for old_key in evicted:
+            self._execute(f'DELETE FROM {self.table} WHERE key = ?', (old_key,))
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+        self._execute(f'DELETE FROM {self.table} WHERE key = ?', (key,))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self._execute(f'DELETE FROM {self.table}', ())
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+    def __len__(self):
+        return len(self._entries)
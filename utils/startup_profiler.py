@@ -0,0 +1,71 @@
+import os
+import re
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Builds the Agent the same way `python main.py` does and reports when it is ready
+READY_SCRIPT = (
+    "import time; start = time.perf_counter()\n"
+    "import main\n"
+    "agent = main.Agent()\n"
+    "print('READY_MS', round((time.perf_counter() - start) * 1000, 1))\n"
+)
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+
+def parse_importtime(stderr):
+    """Rows of (module, self_ms, cumulative_ms) from `python -X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, module = match.groups()
+            rows.append((module, int(self_us) / 1000, int(cumulative_us) / 1000))
+    return rows
+
+def profile_startup(script=READY_SCRIPT):
+    """
+    Runs `script` in a fresh interpreter with -X importtime (so nothing is
+    already imported) and returns (import rows, ready_ms).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    ready = re.search(r"READY_MS ([\d.]+)", result.stdout)
+    if result.returncode != 0 and not ready:
+        raise RuntimeError(f"Startup profiling failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr), float(ready.group(1)) if ready else None
+
+def _table(headers, rows):
+    widths = [max(len(str(v)) for v in column) for column in zip(headers, *rows)]
+    lines = ["  ".join(str(v).rjust(w) for v, w in zip(headers, widths)),
+             "  ".join("-" * w for w in widths)]
+    lines += ["  ".join(str(v).rjust(w) for v, w in zip(row, widths)) for row in rows]
+    return "\n".join(lines)
+
+def format_report(rows, ready_ms, top=25):
+    """Import time per top-level package and the slowest individual modules."""
+    packages = {}
+    for module, self_ms, _ in rows:
+        package = module.split(".")[0]
+        total, count = packages.get(package, (0.0, 0))
+        packages[package] = (total + self_ms, count + 1)
+    by_package = sorted(packages.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    slowest = sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+    total_ms = sum(row[1] for row in rows)
+
+    return "\n".join([
+        f"Agent ready in {ready_ms} ms; {len(rows)} modules imported in {total_ms:.1f} ms (self time).",
+        "",
+        _table(["package", "modules", "self_ms"],
+               [[name, count, round(ms, 1)] for name, (ms, count) in by_package]),
+        "",
+        _table(["module", "self_ms", "cumulative_ms"],
+               [[module, round(self_ms, 1), round(cumulative_ms, 1)] for module, self_ms, cumulative_ms in slowest]),
+    ])
+
+if __name__ == "__main__":
+    print(format_report(*profile_startup()))